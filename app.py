@@ -1,3 +1,10 @@
+import pandas as pd
+
+# Copy-on-write: filtros y selecciones devuelven vistas perezosas y una tabla solo se
+# copia cuando se modifica, en lugar de copiar por defensa en cada paso.
+# Debe activarse antes de importar los módulos que procesan datos.
+pd.set_option("mode.copy_on_write", True)
+
 from moduls.carga import load_data_from_gitlab
 import streamlit as st
 import moduls.carga as carga
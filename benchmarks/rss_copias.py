@@ -0,0 +1,146 @@
+# benchmarks/rss_copias.py
+"""
+Pico de memoria (RSS) de una simulación sintética de la secuencia de copias de las
+pestañas GLOBAL/RECUPERO del Banco de la Gente, con copias profundas (pandas sin
+copy-on-write) y con copias perezosas (copy-on-write, como corre app.py).
+
+Es una simulación: no ejecuta las funciones del tablero ni usa datos reales. Reproduce
+con una nómina sintética las copias, filtros y columnas calculadas de un rerun (ver
+_rerun), así que el resultado indica el orden de magnitud del ahorro, no el consumo
+exacto de la aplicación.
+
+Método: cada modo corre en un proceso aparte. Se arma una nómina sintética, se
+reinicia el pico de RSS escribiendo "5" en /proc/self/clear_refs y, tras simular
+varios reruns, se lee VmHWM de /proc/self/status. Se informa el pico por encima del
+RSS previo a los reruns.
+
+Solo funciona en Linux (usa /proc). Uso:
+
+    python benchmarks/rss_copias.py [--filas 400000] [--reruns 3]
+"""
+import argparse
+import gc
+import os
+import subprocess
+import sys
+
+MODOS = ('profundo', 'perezoso')
+
+def _leer_status(campo):
+    """Devuelve un campo de /proc/self/status en MB (ej: VmHWM, VmRSS)."""
+    with open('/proc/self/status') as f:
+        for linea in f:
+            if linea.startswith(campo + ':'):
+                return int(linea.split()[1]) / 1024
+    raise RuntimeError(f"No se encontró {campo} en /proc/self/status")
+
+def _reiniciar_pico():
+    """Reinicia VmHWM al RSS actual (clear_refs = 5)."""
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+def _nomina_sintetica(filas):
+    """Arma una nómina de `filas` filas y 27 columnas con tipos parecidos a los reales."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'N_DEPARTAMENTO': rng.choice([f"DEPARTAMENTO {i}" for i in range(27)], filas),
+        'N_LOCALIDAD': rng.choice([f"LOCALIDAD {i}" for i in range(400)], filas),
+        'N_LINEA_PRESTAMO': rng.choice(['INICIAR EMPRENDIMIENTO', 'POTENCIAR EMPRENDIMIENTO', 'Otras Lineas'], filas),
+        'N_ESTADO_PRESTAMO': rng.choice([f"ESTADO {i}" for i in range(20)], filas),
+        'CATEGORIA': rng.choice(['Pagados', 'Pagados-Finalizados', 'En Evaluación', 'Rechazados - Bajas'], filas),
+        'CUIL': rng.integers(20_000_000_000, 27_999_999_999, filas),
+        'NRO_SOLICITUD': np.arange(filas),
+        'FEC_FORM': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 2000, filas), unit='D'),
+        'FEC_NACIMIENTO': pd.Timestamp('1960-01-01') + pd.to_timedelta(rng.integers(0, 15000, filas), unit='D'),
+        'LATITUD': np.where(rng.random(filas) < 0.1, np.nan, -31.4),
+        'LONGITUD': np.where(rng.random(filas) < 0.1, np.nan, -64.2),
+    })
+    for i in range(8):
+        df[f"MONTO_{i}"] = rng.random(filas) * 1e6
+    for i in range(8):
+        df[f"ATRIBUTO_{i}"] = rng.choice([f"VALOR {j}" for j in range(50)], filas)
+    return df
+
+def _rerun(df_global, profundo):
+    """
+    Simula un rerun de las pestañas GLOBAL/RECUPERO: copia de la tabla compartida,
+    filtros territoriales, subconjuntos por categoría y columnas calculadas.
+
+    Devuelve los objetos vivos al final del rerun, como los retiene Streamlit
+    mientras dibuja la página.
+    """
+    copiar = (lambda df: df.copy()) if profundo else (lambda df: df.copy(deep=False))
+    subconjunto = (lambda df: df.copy()) if profundo else (lambda df: df)
+
+    df = copiar(df_global)                       # ensure_dataframe
+    df_filtrado_global = copiar(df)              # pestaña GLOBAL
+    df_filtrado_recupero = copiar(df)            # pestaña RECUPERO
+
+    df_linea = subconjunto(df_filtrado_global[df_filtrado_global['N_LINEA_PRESTAMO'] != 'Otras Lineas'])
+    df_categoria_estados = subconjunto(df_filtrado_global[['N_ESTADO_PRESTAMO', 'CATEGORIA', 'MONTO_0']])
+    df_pagados = subconjunto(df_filtrado_recupero[df_filtrado_recupero['CATEGORIA'].isin(['Pagados', 'Pagados-Finalizados'])])
+    df_muestra = subconjunto(df_filtrado_global.head(1000))
+
+    # Columnas calculadas: con copy-on-write solo se materializan estas
+    df_pagados['DEUDA_A_RECUPERAR'] = df_pagados['MONTO_1'] + df_pagados['MONTO_2']
+    df_filtrado_recupero['RECUPERADO'] = df_filtrado_recupero['MONTO_0'] - df_filtrado_recupero['MONTO_1']
+
+    return df, df_filtrado_global, df_filtrado_recupero, df_linea, df_categoria_estados, df_pagados, df_muestra
+
+def medir(modo, filas, reruns):
+    """
+    Mide el pico de RSS de `reruns` reruns en el proceso actual.
+
+    Args:
+        modo: 'profundo' (sin copy-on-write, copias completas) o 'perezoso'
+        filas: Filas de la nómina sintética
+        reruns: Cantidad de reruns simulados
+
+    Returns:
+        tuple: (RSS antes de los reruns, pico por encima de ese RSS), en MB
+    """
+    import pandas as pd
+    pd.set_option('mode.copy_on_write', modo == 'perezoso')
+
+    df_global = _nomina_sintetica(filas)
+    gc.collect()
+    _reiniciar_pico()
+    base = _leer_status('VmRSS')
+
+    for _ in range(reruns):
+        objetos = _rerun(df_global, modo == 'profundo')
+        del objetos
+        gc.collect()
+
+    return base, _leer_status('VmHWM') - base
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--filas', type=int, default=400_000)
+    parser.add_argument('--reruns', type=int, default=3)
+    parser.add_argument('--modo', choices=MODOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/clear_refs'):
+        sys.exit("Este benchmark necesita Linux (/proc/self/clear_refs).")
+
+    if args.modo:
+        # Proceso hijo: un modo por proceso, para que el pico de uno no afecte al otro
+        base, pico = medir(args.modo, args.filas, args.reruns)
+        print(f"{base:.0f} {pico:.0f}")
+        return
+
+    print(f"Simulación sintética (no ejecuta el tablero): nómina de {args.filas:,} filas, {args.reruns} reruns")
+    for modo in MODOS:
+        salida = subprocess.run(
+            [sys.executable, __file__, '--modo', modo, '--filas', str(args.filas), '--reruns', str(args.reruns)],
+            check=True, capture_output=True, text=True
+        ).stdout.split()
+        base, pico = float(salida[0]), float(salida[1])
+        print(f"  {modo:<9} RSS base {base:6.0f} MB   pico +{pico:.0f} MB")
+
+if __name__ == '__main__':
+    main()
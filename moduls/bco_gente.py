@@ -4,7 +4,13 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from utils.ui_components import display_kpi_row
 from utils.styles import COLORES_IDENTIDAD, COLOR_PRIMARY, COLOR_SECONDARY, COLOR_ACCENT_1, COLOR_ACCENT_2, COLOR_ACCENT_3, COLOR_ACCENT_4, COLOR_ACCENT_5, COLOR_TEXT_DARK
-from utils.kpi_tooltips import ESTADO_CATEGORIAS, TOOLTIPS_DESCRIPTIVOS
+from utils.kpi_tooltips import ESTADO_CATEGORIAS, TOOLTIPS_DESCRIPTIVOS, CATEGORIAS_AGREGADAS, categorizar_estados, estados_de_categorias
+from utils.data_cleaning import calcular_edad, rango_edad, formatear_cuil_cuit
+from utils.territorio import adjuntar_territorio, dimension_localidades, adjuntar_localidades
+from utils.filtros import IndiceFiltros, OpcionesFiltros, opciones_filtros
+from utils.cubo import COLUMNA_CANTIDAD, construir_cubo, filtrar_cubo, sumar_cubo
+from utils.conteo_distinto import DESCRIPCION_ERROR_HLL, ConteoAproximado, ConteoDistinto, formatear_conteo
+from moduls.carga import preprocesar_incremental, version_dataset, materializar_tabla
 
 # Crear diccionario para tooltips de categorías (técnico, lista de estados)
 tooltips_categorias = {k: ", ".join(v) for k, v in ESTADO_CATEGORIAS.items()}
@@ -82,7 +88,7 @@ def mostrar_kpis_fiscales(df_global):
     df_categoria_estados = df_global[
         (df_global["N_LINEA_PRESTAMO"].isin(lineas)) &
         (df_global["CATEGORIA"].isin(categorias))
-    ].copy()
+    ]
 
     if df_categoria_estados.empty:
         st.info("No se encontraron registros para las líneas y categorías seleccionadas.")
@@ -114,34 +120,37 @@ def mostrar_kpis_fiscales(df_global):
             st.dataframe(group, use_container_width=True, hide_index=True)
 
 # --- RESUMEN DE CREDITOS: Tabla de conteo de campos fiscales para líneas seleccionadas ---
-def mostrar_resumen_creditos(df_global):
+def mostrar_resumen_creditos(df_global, personas=None):
     """
     Muestra dos gráficos de barras apiladas, uno para cada línea de préstamo ('INICIAR EMPRENDIMIENTO' y 'POTENCIAR EMPRENDIMIENTO'),
     filtrando por CATEGORIA en ['Pagados', 'Pagados-Finalizados'].
     En cada barra: el total de CUIL únicos y el total de CUIL únicos con MONOTRIBUTO not null (apilado).
+
+    Args:
+        df_global: DataFrame filtrado con datos globales
+        personas: ConteoDistinto (o ConteoAproximado) de CUIL con los mismos filtros
+            (None = se arma a partir de df_global)
     """
     if df_global is None or df_global.empty:
         st.warning("No hay datos disponibles en el recupero para el resumen de créditos.")
         return
+    if personas is None:
+        personas = construir_conteo_personas(df_global)
 
     # Filtrar por líneas y categorías
     lineas = ["INICIAR EMPRENDIMIENTO", "POTENCIAR EMPRENDIMIENTO"]
     categorias = ["Pagados", "Pagados-Finalizados"]
-    df_filtrado = df_global[
-        (df_global["N_LINEA_PRESTAMO"].isin(lineas)) &
-        (df_global["CATEGORIA"].isin(categorias))
-    ].copy()
+    personas_filtrado = personas.filtrar({'N_LINEA_PRESTAMO': lineas, 'CATEGORIA': categorias})
 
-    if df_filtrado.empty:
+    if personas_filtrado.celdas.empty:
         st.info("No se encontraron registros para las líneas y categorías seleccionadas.")
         return
 
-    # Calcular resumen por línea
+    # Calcular resumen por línea (unión exacta de CUIL de las celdas de cada línea)
     resumen = []
     for linea in lineas:
-        df_linea = df_filtrado[df_filtrado["N_LINEA_PRESTAMO"] == linea]
-        total_cuils = df_linea["CUIL"].nunique()
-        cuils_monotributo = df_linea[df_linea["MONOTRIBUTO"].notnull()]["CUIL"].nunique()
+        total_cuils = personas_filtrado.contar({'N_LINEA_PRESTAMO': linea})
+        cuils_monotributo = personas_filtrado.contar({'N_LINEA_PRESTAMO': linea, 'CON_ARCA': True})
         resumen.append({
             "Línea de Crédito": linea,
             "Personas (Total)": total_cuils,
@@ -157,14 +166,16 @@ def mostrar_resumen_creditos(df_global):
         linea = row["Línea de Crédito"]
         total = row["Personas (Total)"]
         con_arca = row["Personas con ARCA"]
-        sin_arca = total - con_arca
+        # Con conteos estimados la diferencia podría quedar apenas por debajo de cero
+        sin_arca = max(total - con_arca, 0)
+        prefijo = "≈ " if personas.estimado else ""
         fig = go.Figure()
         fig.add_trace(go.Bar(
             name="Personas con ARCA",
             x=[linea],
             y=[con_arca],
             marker_color="#66c2a5",
-            text=[con_arca],
+            text=[f"{prefijo}{con_arca}"],
             textposition="inside"
         ))
         fig.add_trace(go.Bar(
@@ -172,7 +183,7 @@ def mostrar_resumen_creditos(df_global):
             x=[linea],
             y=[sin_arca],
             marker_color="#fc8d62",
-            text=[sin_arca],
+            text=[f"{prefijo}{sin_arca}"],
             textposition="inside"
         ))
         fig.update_layout(
@@ -180,7 +191,7 @@ def mostrar_resumen_creditos(df_global):
             showlegend=True,
             xaxis_title=None,
             yaxis_title="Cantidad de personas",
-            title=f"Distribución de personas en {linea}",
+            title=f"Distribución de personas en {linea}" + (" (estimado)" if personas.estimado else ""),
             height=350,
             margin=dict(l=10, r=10, t=40, b=10)
         )
@@ -197,6 +208,8 @@ def mostrar_resumen_creditos(df_global):
     with cols[2]:
         st.markdown("**Tabla resumen**")
         st.dataframe(resumen_df, use_container_width=True, hide_index=True)
+        if personas.estimado:
+            st.caption(f"≈ Cantidades de personas estimadas (HyperLogLog, {DESCRIPCION_ERROR_HLL}).")
         import io
         csv_buffer = io.StringIO()
         resumen_df.to_csv(csv_buffer, index=False, encoding='utf-8')
@@ -210,16 +223,412 @@ def mostrar_resumen_creditos(df_global):
 
 # mostrar_resumen_creditos(df_global)
 
+def _preprocesar_nomina(df_global, dim_localidades, avisos=None):
+    """
+    Aplica las transformaciones fila a fila de la nómina de préstamos
+    (VT_NOMINA_REP_RECUPERO_X_ANIO): categoría, línea, departamento, zona,
+    montos y cruce con localidades.
+
+    Args:
+        df_global: DataFrame crudo de la nómina
+        dim_localidades: Dimensión de localidades indexada por ID_LOCALIDAD (ver utils/territorio.py)
+        avisos: Lista donde se agregan los avisos (nivel, mensaje) para mostrar en la UI;
+            no se muestran aquí porque la tabla resultante se materializa
+
+    Returns:
+        DataFrame preprocesado (nuevo, no modifica el original)
+    """
+    if avisos is None:
+        avisos = []
+    # Copia superficial: aquí solo se asignan columnas completas (nunca se escribe dentro
+    # de una columna existente), así que la tabla de origen no cambia aunque
+    # copy-on-write esté desactivado
+    df_global = df_global.copy(deep=False)
+
+    # Agregar columna de CATEGORIA a df_global si está disponible
+    if 'N_ESTADO_PRESTAMO' in df_global.columns:
+        # Asignar la categoría de cada estado en una sola pasada (se reutiliza en todas las secciones)
+        df_global['CATEGORIA'] = categorizar_estados(df_global['N_ESTADO_PRESTAMO'])
+
+        # Reemplazar "L4." por "INICIAR EMPRENDIMIENTO" usando un método alternativo
+        df_global['N_LINEA_PRESTAMO'] = df_global['N_LINEA_PRESTAMO'].apply(
+            lambda x: "INICIAR EMPRENDIMIENTO" if x == "L4." else x
+        )
+
+    # Normalizar N_DEPARTAMENTO (los no válidos pasan a 'OTROS'), agregar ZONA
+    # y corregir la localidad de CAPITAL con la dimensión territorial compartida
+    df_global = adjuntar_territorio(df_global, id_localidad_capital=1)
+
+    if 'N_DEPARTAMENTO' in df_global.columns and 'N_LOCALIDAD' in df_global.columns:
+        # Renombrar DEUDA como DEUDA_VENCIDA
+        df_global  = df_global.rename(columns={'DEUDA': 'DEUDA_VENCIDA'})
+
+        # Convertir columnas numéricas a tipo float
+        for col in ['DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA', 'MONTO_OTORGADO']:
+            df_global[col] = pd.to_numeric(df_global[col], errors='coerce')
+
+
+
+        # Rellenar valores NaN con 0 en df_global
+        for col in ['DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA', 'MONTO_OTORGADO']:
+            df_global[col] = pd.to_numeric(df_global[col], errors='coerce').fillna(0)
+
+        # Añadir campos calculados a df_global
+        df_global['DEUDA_A_RECUPERAR'] = df_global['DEUDA_VENCIDA'] + df_global['DEUDA_NO_VENCIDA']
+        df_global['RECUPERADO'] = df_global['MONTO_OTORGADO'] - df_global['DEUDA_A_RECUPERAR']
+
+
+
+        # --- Atributos de localidad (gobierno local, circuito electoral, coordenadas) ---
+        # Búsqueda posicional contra la dimensión de localidades indexada por ID_LOCALIDAD
+        if dim_localidades is not None:
+            df_global = adjuntar_localidades(
+                df_global,
+                dim_localidades,
+                clave='ID_LOCALIDAD',
+                columnas=['ID_GOBIERNO_LOCAL', 'TIPO', 'Gestion 2023-2027', 'FUERZAS', 'ESTADO',
+                          'LEGISLADOR DEPARTAMENTAL', 'LATITUD', 'LONGITUD']
+            )
+        else:
+            avisos.append(('info', "df_localidad_municipio no está disponible o está vacío, se omite el segundo cruce."))
+
+
+    # Filtrar líneas de préstamo que no deben ser consideradas
+    if 'N_LINEA_PRESTAMO' in df_global.columns:
+        # Lista de líneas de préstamo a agrupar como 'Otras Lineas'
+        lineas_a_agrupar = ["L1", "L3", "L4", "L6"]
+
+        # Crear una máscara para identificar las filas con estas líneas
+        mask_otras_lineas = df_global['N_LINEA_PRESTAMO'].isin(lineas_a_agrupar)
+
+        # Renombrar el valor en la columna 'N_LINEA_PRESTAMO' para esas filas
+        df_global['N_LINEA_PRESTAMO'] = df_global['N_LINEA_PRESTAMO'].mask(mask_otras_lineas, "Otras Lineas")
+
+        # Ya no se eliminan filas, así que no es necesario re-evaluar has_global_data aquí
+        # # Verificar si todavía hay datos después del filtrado
+        # has_global_data = not df_global.empty
+
+
+    # Convertir cualquier columna que sea Series a valores nativos
+    if not df_global.empty:
+        for col in df_global.columns:
+            try:
+                if len(df_global) > 0 and isinstance(df_global[col].iloc[0], pd.Series):
+                    # Si la columna contiene Series, convertirla a valores nativos
+                    df_global[col] = df_global[col].apply(lambda x: x.values[0] if isinstance(x, pd.Series) else x)
+            except Exception as e:
+                avisos.append(('warning', f"Error al procesar columna {col}: {str(e)}"))
+                # Intentar convertir la columna completa si es una Serie
+                if isinstance(df_global[col], pd.Series):
+                    try:
+                        df_global[col] = df_global[col].apply(lambda x: x if not isinstance(x, pd.Series) else x.iloc[0] if len(x) > 0 else None)
+                    except:
+                        pass
+
+    # Edad a la fecha de solicitud y su rango, calculadas una sola vez
+    if 'FEC_NACIMIENTO' in df_global.columns and 'FEC_FORM' in df_global.columns:
+        df_global['EDAD'] = calcular_edad(df_global['FEC_NACIMIENTO'], df_global['FEC_FORM'])
+        df_global['RANGO_EDAD'] = rango_edad(df_global['EDAD'])
+
+    return df_global
+
+def _construir_pagados(df_global, df_cumplimiento):
+    """
+    Arma la tabla de préstamos pagados cruzada con los datos de cumplimiento
+    (NRO_SOLICITUD con NRO_FORMULARIO).
+
+    Args:
+        df_global: Nómina preprocesada
+        df_cumplimiento: DataFrame de VT_CUMPLIMIENTO_FORMULARIOS
+
+    Returns:
+        tuple: (DataFrame de préstamos pagados con PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO,
+        lista de avisos (nivel, mensaje) para mostrar en la UI)
+    """
+    avisos = []
+    has_cumplimiento_data = not df_cumplimiento.empty
+
+    # Crear un DataFrame adicional que contenga solo las categorías 'Pagados' y 'Pagados-Finalizados'
+    # para operaciones específicas que requieren solo estos datos
+    categorias_validas = ['Pagados', 'Pagados-Finalizados']
+    df_global_pagados = df_global[df_global['CATEGORIA'].isin(categorias_validas)]
+    # Realizar el merge con df_cumplimiento directamente en df_global si está disponible
+    if has_cumplimiento_data and 'NRO_FORMULARIO' in df_cumplimiento.columns:
+        try:
+            # Columnas a obtener del DataFrame de cumplimiento
+            columnas_cumplimiento = [
+                'NRO_FORMULARIO',
+                'PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO'
+            ]
+
+            # Verificar que todas las columnas existan
+            missing_cols_cumplimiento = [col for col in columnas_cumplimiento if col not in df_cumplimiento.columns]
+
+            if not missing_cols_cumplimiento:
+                # Seleccionar solo las columnas necesarias
+                df_cumplimiento_subset = df_cumplimiento[columnas_cumplimiento]
+
+                # Convertir columna numérica a tipo float
+                df_cumplimiento_subset['PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO'] = pd.to_numeric(
+                    df_cumplimiento_subset['PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO'], 
+                    errors='coerce'
+                )
+
+                # Realizar el merge (left join) con df_global_pagados
+                df_global_pagados = pd.merge(
+                    df_global_pagados,
+                    df_cumplimiento_subset,
+                    left_on='NRO_SOLICITUD',  # Clave en df_global_pagados
+                    right_on='NRO_FORMULARIO',  # Clave en df_cumplimiento
+                    how='left'
+                )
+                # Eliminar la columna duplicada NRO_FORMULARIO si existe
+                if 'NRO_FORMULARIO' in df_global_pagados.columns:
+                    df_global_pagados = df_global_pagados.drop('NRO_FORMULARIO', axis=1)
+            else:
+                avisos.append(('warning', f"No se pudo realizar el merge con datos de cumplimiento. Faltan columnas: {', '.join(missing_cols_cumplimiento)}"))
+        except Exception as e_cumplimiento:
+            avisos.append(('warning', f"Error al realizar el merge con datos de cumplimiento: {str(e_cumplimiento)}"))
+    else:
+        avisos.append(('info', "Los datos de cumplimiento no están disponibles o no contienen la columna NRO_FORMULARIO."))
+    # Rellenar valores NaN con 0 en df_global_pagados
+    for col in ['DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA', 'MONTO_OTORGADO']:
+        if col in df_global_pagados.columns:
+            df_global_pagados[col] = pd.to_numeric(df_global_pagados[col], errors='coerce').fillna(0)
+            
+    # Añadir campos calculados a df_global_pagados
+    if all(col in df_global_pagados.columns for col in ['DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA']):
+        df_global_pagados['DEUDA_A_RECUPERAR'] = df_global_pagados['DEUDA_VENCIDA'] + df_global_pagados['DEUDA_NO_VENCIDA']
+        
+    if all(col in df_global_pagados.columns for col in ['MONTO_OTORGADO', 'DEUDA_A_RECUPERAR']):
+        df_global_pagados['RECUPERADO'] = df_global_pagados['MONTO_OTORGADO'] - df_global_pagados['DEUDA_A_RECUPERAR']
+    
+    return df_global_pagados, avisos
+
+# Dimensiones del cubo financiero: territorio, línea, estado y categoría, si la fila tiene
+# coordenadas (departamento "Otros" de los filtros) y los atributos de la localidad que
+# se exportan en las descargas
+DIMENSIONES_CUBO = [
+    'N_DEPARTAMENTO', 'N_LOCALIDAD', 'N_LINEA_PRESTAMO', 'N_ESTADO_PRESTAMO', 'CATEGORIA', 'CON_COORDENADAS',
+    'ID_GOBIERNO_LOCAL', 'TIPO', 'Gestion 2023-2027', 'FUERZAS', 'ESTADO', 'LEGISLADOR DEPARTAMENTAL'
+]
+# Medidas sumadas en cada celda del cubo
+MEDIDAS_CUBO = ['MONTO_OTORGADO', 'DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA', 'DEUDA_A_RECUPERAR', 'RECUPERADO']
+
+def construir_cubo_bco_gente(df):
+    """
+    Arma el cubo financiero de una tabla de préstamos: una celda por combinación de
+    DIMENSIONES_CUBO con la cantidad de filas, la cantidad de solicitudes
+    (NRO_SOLICITUD no nulo) y la suma de MEDIDAS_CUBO.
+
+    Args:
+        df: Nómina o préstamos pagados ya preprocesados
+
+    Returns:
+        DataFrame del cubo, o None si no hay datos
+    """
+    if df is None:
+        return None
+    con_coordenadas = df['LATITUD'].notna() if 'LATITUD' in df.columns else True
+    return construir_cubo(
+        df.assign(CON_COORDENADAS=con_coordenadas),
+        DIMENSIONES_CUBO,
+        sumas=MEDIDAS_CUBO,
+        conteos={'SOLICITUDES': 'NRO_SOLICITUD'}
+    )
+
+# Dimensiones del conteo de personas distintas (CUIL): las de los filtros de la pestaña,
+# el estado y categoría del préstamo y si la persona tiene condición ante ARCA
+DIMENSIONES_PERSONAS = [
+    'N_DEPARTAMENTO', 'N_LOCALIDAD', 'N_LINEA_PRESTAMO', 'N_ESTADO_PRESTAMO', 'CATEGORIA',
+    'CON_COORDENADAS', 'CON_ARCA'
+]
+
+# Dimensiones de los sketches HyperLogLog de CUIL (modo aproximado). Cada celda ocupa un
+# sketch denso de 64 KB, así que solo se usan las dimensiones gruesas; el estado del
+# préstamo se filtra por su CATEGORIA. Las vistas por localidad o del departamento
+# "Otros" usan siempre el conteo exacto (ver usa_conteo_aproximado)
+DIMENSIONES_PERSONAS_APROXIMADO = ['N_DEPARTAMENTO', 'N_LINEA_PRESTAMO', 'CATEGORIA', 'CON_ARCA']
+
+def construir_conteo_personas(df, aproximado=False):
+    """
+    Arma el conteo de CUIL distintos por celda de DIMENSIONES_PERSONAS.
+
+    Args:
+        df: Nómina o préstamos pagados ya preprocesados
+        aproximado: True para estimar con sketches HyperLogLog sobre las celdas de
+            DIMENSIONES_PERSONAS_APROXIMADO en lugar de contar exacto
+
+    Returns:
+        ConteoDistinto (o ConteoAproximado), o None si no hay datos
+    """
+    if df is None or 'CUIL' not in df.columns:
+        return None
+    if aproximado:
+        return ConteoAproximado(
+            df.assign(CON_ARCA=df['MONOTRIBUTO'].notna() if 'MONOTRIBUTO' in df.columns else False),
+            'CUIL',
+            DIMENSIONES_PERSONAS_APROXIMADO
+        )
+    return ConteoDistinto(
+        df.assign(
+            CON_COORDENADAS=df['LATITUD'].notna() if 'LATITUD' in df.columns else True,
+            CON_ARCA=df['MONOTRIBUTO'].notna() if 'MONOTRIBUTO' in df.columns else False
+        ),
+        'CUIL',
+        DIMENSIONES_PERSONAS
+    )
+
+def usa_conteo_aproximado(filtros):
+    """
+    Indica si los filtros de la pestaña se pueden resolver con los sketches de
+    DIMENSIONES_PERSONAS_APROXIMADO (sin localidad ni departamento "Otros").
+
+    Args:
+        filtros: Diccionario devuelto por filtros_cubo_territorio
+
+    Returns:
+        bool
+    """
+    return all(
+        valor is None or columna in DIMENSIONES_PERSONAS_APROXIMADO
+        for columna, valor in filtros.items()
+    )
+
+def filtros_cubo_territorio(departamento=None, localidad=None, lineas=None, sin_coordenadas=False):
+    """
+    Traduce la selección de los filtros de la pestaña al diccionario de filtrar_cubo.
+
+    Args:
+        departamento: Departamento elegido (None = todos)
+        localidad: Localidad elegida (None = todas)
+        lineas: Línea o lista de líneas elegidas (None o vacía = todas)
+        sin_coordenadas: True para el departamento "Otros" (filas sin LATITUD)
+
+    Returns:
+        Diccionario {dimensión: valor o lista}
+    """
+    return {
+        'CON_COORDENADAS': False if sin_coordenadas else None,
+        'N_DEPARTAMENTO': departamento,
+        'N_LOCALIDAD': localidad,
+        'N_LINEA_PRESTAMO': lineas or None,
+    }
+
+# Fechas con serie histórica mensual y dimensiones de su cubo (las de los filtros de la pestaña)
+COLUMNAS_SERIE = ['FEC_FORM', 'FEC_INICIO_PAGO']
+DIMENSIONES_SERIE = ['N_DEPARTAMENTO', 'N_LOCALIDAD', 'N_LINEA_PRESTAMO', 'CON_COORDENADAS']
+
+def construir_cubo_mensual(df, columna_fecha):
+    """
+    Arma el cubo mensual de una fecha: una celda por mes (<COL>_MES, precalculado en la
+    carga) y combinación de DIMENSIONES_SERIE, con la cantidad de préstamos y la
+    primera y última fecha de la celda.
+
+    Args:
+        df: Nómina ya preprocesada
+        columna_fecha: Fecha de la serie (FEC_FORM o FEC_INICIO_PAGO)
+
+    Returns:
+        DataFrame con MES, las dimensiones, CANTIDAD, FECHA_MIN y FECHA_MAX, o None si
+        no está la fecha
+    """
+    columna_mes = f"{columna_fecha}_MES"
+    if df is None or columna_fecha not in df.columns or columna_mes not in df.columns:
+        return None
+    df_fechas = df[df[columna_fecha].notna()]
+    con_coordenadas = df_fechas['LATITUD'].notna() if 'LATITUD' in df_fechas.columns else True
+    cubo = construir_cubo(
+        df_fechas.assign(CON_COORDENADAS=con_coordenadas),
+        [columna_mes] + DIMENSIONES_SERIE,
+        extremos=[columna_fecha]
+    )
+    return cubo.rename(columns={
+        columna_mes: 'MES',
+        f"{columna_fecha}_MIN": 'FECHA_MIN',
+        f"{columna_fecha}_MAX": 'FECHA_MAX'
+    })
+
+def serie_mensual(cubo_mensual, mes_inicio, mes_fin):
+    """
+    Suma las celdas de un cubo mensual entre dos meses (inclusive).
+
+    Args:
+        cubo_mensual: Cubo devuelto por construir_cubo_mensual (ya filtrado)
+        mes_inicio: Primer día del mes inicial
+        mes_fin: Primer día del mes final
+
+    Returns:
+        DataFrame con FECHA (primer día del mes) y Cantidad, ordenado por FECHA
+    """
+    seleccion = cubo_mensual[(cubo_mensual['MES'] >= mes_inicio) & (cubo_mensual['MES'] <= mes_fin)]
+    return (
+        sumar_cubo(seleccion, ['MES'])
+        .rename(columns={'MES': 'FECHA', COLUMNA_CANTIDAD: 'Cantidad'})
+        .sort_values('FECHA')
+    )
+
+# Archivos que componen el dataset del Banco de la Gente
+ARCHIVOS_BCO_GENTE = [
+    'VT_NOMINA_REP_RECUPERO_X_ANIO.parquet',
+    'VT_CUMPLIMIENTO_FORMULARIOS.parquet',
+    'capa_departamentos_2010.geojson',
+    'LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - USAR.txt'
+]
+
 def load_and_preprocess_data(data):
     """
     Carga y preprocesa los datos para el dashboard.
+
+    El preprocesamiento se calcula una vez por versión del dataset y se comparte
+    entre reruns y sesiones (ver _preprocesar_bco_gente).
     
     Args:
         data (dict): Diccionario con los datos cargados.
         
     Returns:
-        tuple: (df_global, geojson_data, df_localidad_municipio, df_global_pagados)
+        tuple: (df_global, geojson_data, df_localidad_municipio, df_global_pagados,
+        cubo_global, cubo_pagados)
     """
+    version = version_dataset(data, ARCHIVOS_BCO_GENTE)
+    (df_global, geojson_data, df_localidad_municipio, df_global_pagados,
+     cubo_global, cubo_pagados, avisos) = _preprocesar_bco_gente(version, data)
+
+    # Los avisos del preprocesamiento se muestran en cada ejecución, aunque el
+    # resultado provenga del caché o de las tablas materializadas
+    for nivel, mensaje in avisos:
+        getattr(st, nivel, st.info)(mensaje)
+
+    # Verificar la estructura final para diagnóstico
+    if not df_global.empty and st.session_state.get('debug_mode', False):
+        st.write("Estructura final de df_global:")
+        st.write(f"Tipo: {type(df_global)}")
+        st.write(f"Columnas: {df_global.columns.tolist()}")
+        st.write(f"Tipos de datos: {df_global.dtypes}")
+
+    return df_global, geojson_data, df_localidad_municipio, df_global_pagados, cubo_global, cubo_pagados
+
+@st.cache_resource(show_spinner="Cargando y procesando datos...", max_entries=4)
+def _preprocesar_bco_gente(version, _data):
+    """
+    Preprocesa los datos del Banco de la Gente para una versión del dataset.
+
+    Está cacheada con st.cache_resource: el resultado se calcula una sola vez por
+    `version` y los mismos objetos se comparten entre reruns y sesiones, por lo
+    que los DataFrames devueltos son de solo lectura.
+
+    Args:
+        version: Versión del dataset (version_dataset sobre ARCHIVOS_BCO_GENTE), clave del caché
+        _data (dict): Diccionario con los datos cargados (no se usa para la clave del caché)
+
+    Returns:
+        tuple: (df_global, geojson_data, df_localidad_municipio, df_global_pagados,
+        cubo_global, cubo_pagados, avisos), con avisos la lista de pares (nivel, mensaje)
+        a mostrar en la UI
+    """
+    data = _data
+    avisos = []
+
     # Función auxiliar para verificar y corregir el DataFrame
     def ensure_dataframe(df):
         """Asegura que el objeto sea un DataFrame y no una Serie"""
@@ -228,277 +637,56 @@ def load_and_preprocess_data(data):
         if isinstance(df, pd.Series):
             return pd.DataFrame([df])
         if not isinstance(df, pd.DataFrame):
-            st.warning(f"Tipo de dato inesperado: {type(df)}. Convirtiendo a DataFrame vacío.")
+            avisos.append(('warning', f"Tipo de dato inesperado: {type(df)}. Convirtiendo a DataFrame vacío."))
             return pd.DataFrame()
-        return df.copy()  # Devolver una copia para evitar modificaciones no deseadas
-    with st.spinner("Cargando y procesando datos..."):
-        # Extraer los dataframes necesarios y asegurar que sean DataFrames válidos
-        df_global = ensure_dataframe(data.get('VT_NOMINA_REP_RECUPERO_X_ANIO.parquet'))
-        df_cumplimiento = ensure_dataframe(data.get('VT_CUMPLIMIENTO_FORMULARIOS.parquet'))
-        geojson_data = data.get('capa_departamentos_2010.geojson')  # Este es un GeoJSON, no un DataFrame
-        df_localidad_municipio = ensure_dataframe(data.get('LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - USAR.txt'))
-        
-        
-        has_global_data = not df_global.empty
-        has_cumplimiento_data = not df_cumplimiento.empty
-        
-        # Verificar la estructura del DataFrame para diagnóstico
-        if has_global_data and st.session_state.get('debug_mode', False):
-            st.write("Estructura de df_global al inicio:")
-            st.write(f"Tipo: {type(df_global)}")
-            st.write(f"Columnas: {df_global.columns.tolist()}")
-            st.write(f"Tipos de datos: {df_global.dtypes}")
- 
-
-        # Agregar columna de CATEGORIA a df_global si está disponible y filtrar solo por 'Pagados' y 'Pagados-Finalizados'
-        
-        if has_global_data and 'N_ESTADO_PRESTAMO' in df_global.columns:
-            # Crear una copia para evitar modificaciones que puedan alterar la estructura
-            df_global = df_global.copy()
-            
-            # Inicializar la columna CATEGORIA con un valor predeterminado
-            df_global['CATEGORIA'] = 'Otros'
-            
-            # Método alternativo para asignar categorías sin usar .loc
-            # Crear una función para mapear estados a categorías
-            def asignar_categoria(estado):
-                for categoria, estados in ESTADO_CATEGORIAS.items():
-                    if estado in estados:
-                        return categoria
-                return 'Otros'
-            
-            # Aplicar la función a cada fila
-            df_global['CATEGORIA'] = df_global['N_ESTADO_PRESTAMO'].apply(asignar_categoria)
-            
-            # Verificar que df_global sigue siendo un DataFrame después de la asignación
-            df_global = ensure_dataframe(df_global)
-            
-
-                
-            # Reemplazar "L4." por "INICIAR EMPRENDIMIENTO" usando un método alternativo
-            df_global['N_LINEA_PRESTAMO'] = df_global['N_LINEA_PRESTAMO'].apply(
-                lambda x: "INICIAR EMPRENDIMIENTO" if x == "L4." else x
+        return df.copy(deep=False)  # Copia perezosa: con copy-on-write no se duplican los datos
+
+    # Extraer los dataframes necesarios y asegurar que sean DataFrames válidos
+    df_global = ensure_dataframe(data.get('VT_NOMINA_REP_RECUPERO_X_ANIO.parquet'))
+    df_cumplimiento = ensure_dataframe(data.get('VT_CUMPLIMIENTO_FORMULARIOS.parquet'))
+    geojson_data = data.get('capa_departamentos_2010.geojson')  # Este es un GeoJSON, no un DataFrame
+    df_localidad_municipio = ensure_dataframe(data.get('LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - USAR.txt'))
+    # Dimensión de localidades tipada e indexada, construida una vez por versión del archivo
+    dim_localidades = dimension_localidades(data.get('LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - USAR.txt'))
+    
+    
+    has_global_data = not df_global.empty
+
+    if has_global_data:
+        # Solo se reprocesan las filas de la nómina que cambiaron desde la última carga
+        # (la tabla resultante se materializa en el snapshot local por versión del dataset)
+        df_nomina = df_global
+        avisos_nomina = []
+
+        def construir_nomina():
+            df = preprocesar_incremental(
+                'VT_NOMINA_REP_RECUPERO_X_ANIO.parquet',
+                df_nomina,
+                lambda df: _preprocesar_nomina(df, dim_localidades, avisos_nomina),
+                dependencias=version_dataset(data, ['LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - USAR.txt'])
             )
+            # Cada lote reprocesado repite los mismos avisos: se conservan una sola vez
+            return df, list(dict.fromkeys(avisos_nomina))
 
-        # --- Normalizar N_DEPARTAMENTO: dejar solo los válidos, el resto 'OTROS' ---
-        departamentos_validos = [
-            "CAPITAL",
-            "CALAMUCHITA",
-            "COLON",
-            "CRUZ DEL EJE",
-            "GENERAL ROCA",
-            "GENERAL SAN MARTIN",
-            "ISCHILIN",
-            "JUAREZ CELMAN",
-            "MARCOS JUAREZ",
-            "MINAS",
-            "POCHO",
-            "PRESIDENTE ROQUE SAENZ PEÑA",
-            "PUNILLA",
-            "RIO CUARTO",
-            "RIO PRIMERO",
-            "RIO SECO",
-            "RIO SEGUNDO",
-            "SAN ALBERTO",
-            "SAN JAVIER",
-            "SAN JUSTO",
-            "SANTA MARIA",
-            "SOBREMONTE",
-            "TERCERO ARRIBA",
-            "TOTORAL",
-            "TULUMBA",
-            "UNION"
-        ]
-        if has_global_data and 'N_DEPARTAMENTO' in df_global.columns:
-            df_global['N_DEPARTAMENTO'] = df_global['N_DEPARTAMENTO'].apply(lambda x: x if x in departamentos_validos else 'OTROS')
-
-        # Corregir localidades del departamento CAPITAL
-        if has_global_data and 'N_DEPARTAMENTO' in df_global.columns and 'N_LOCALIDAD' in df_global.columns:
-            # Crear una máscara para identificar registros del departamento CAPITAL
-            capital_mask = df_global['N_DEPARTAMENTO'] == 'CAPITAL'
-            
-            # Aplicar la corrección de localidad
-            df_global.loc[capital_mask, 'N_LOCALIDAD'] = 'CORDOBA'
-            
-            # Si existe la columna ID_LOCALIDAD, corregirla también
-            if 'ID_LOCALIDAD' in df_global.columns:
-                df_global.loc[capital_mask, 'ID_LOCALIDAD'] = 1
-            
-            # Añadir columna de ZONA FAVORECIDA
-            zonas_favorecidas = [
-                'PRESIDENTE ROQUE SAENZ PEÑA', 'GENERAL ROCA', 'RIO SECO', 'TULUMBA', 
-                'POCHO', 'SAN JAVIER', 'SAN ALBERTO', 'MINAS', 'CRUZ DEL EJE', 
-                'TOTORAL', 'SOBREMONTE', 'ISCHILIN'
-            ]
-            
-            # Crear la columna ZONA
-            df_global['ZONA'] = df_global['N_DEPARTAMENTO'].apply(
-                lambda x: 'ZONA NOC Y SUR' if x in zonas_favorecidas else 'ZONA REGULAR'
-            )
-        
-            # Renombrar DEUDA como DEUDA_VENCIDA
-            df_global  = df_global.rename(columns={'DEUDA': 'DEUDA_VENCIDA'})
-                    
-            # Convertir columnas numéricas a tipo float
-            for col in ['DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA', 'MONTO_OTORGADO']:
-                df_global[col] = pd.to_numeric(df_global[col], errors='coerce')
-                   
-            
-                
-            # Rellenar valores NaN con 0 en df_global
-            for col in ['DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA', 'MONTO_OTORGADO']:
-                df_global[col] = pd.to_numeric(df_global[col], errors='coerce').fillna(0)
-                    
-            # Añadir campos calculados a df_global
-            df_global['DEUDA_A_RECUPERAR'] = df_global['DEUDA_VENCIDA'] + df_global['DEUDA_NO_VENCIDA']
-            df_global['RECUPERADO'] = df_global['MONTO_OTORGADO'] - df_global['DEUDA_A_RECUPERAR']
-            
-            
-                    
-            # --- INICIO: Nuevo Merge con df_localidad_municipio ---
-            if df_localidad_municipio is not None and not df_localidad_municipio.empty:
-                # Definir columnas a traer desde df_localidad_municipio (incluyendo la clave)
-                cols_to_merge = [
-                            'ID_LOCALIDAD', # Clave del merge (asumimos mismo nombre en ambos DFs)
-                            'ID_GOBIERNO_LOCAL',
-                            'TIPO', 
-                            'Gestion 2023-2027', 
-                            'FUERZAS', 
-                            'ESTADO', 
-                            'LEGISLADOR DEPARTAMENTAL', 
-                            'LATITUD', 
-                            'LONGITUD'
-                ]
-                        
-                try:
-                    # Seleccionar solo las columnas necesarias (incluida la clave)
-                    df_localidad_subset = df_localidad_municipio[cols_to_merge].copy()
-                    
-                    # Realizar el segundo merge (left join) usando la misma clave
-                    df_global = pd.merge(
-                        df_global,
-                        df_localidad_subset,
-                        on='ID_LOCALIDAD', # Usar 'on' ya que la clave tiene el mismo nombre
-                        how='left'
-                    )
-                                
-                    # --- Limpieza de LATITUD y LONGITUD SOLO después del merge con df_localidad_municipio ---
-                    def limpiar_lat_lon(valor):
-                        if isinstance(valor, str):
-                            # Si tiene más de un punto, eliminar todos menos el último
-                            if valor.count('.') > 1:
-                                partes = valor.split('.')
-                                valor = ''.join(partes[:-1]) + '.' + partes[-1]
-                                valor = valor.replace(',', '.')  # Por si viene con coma decimal
-                            return valor
-
-                    for col in ['LATITUD', 'LONGITUD']:
-                        if col in df_global.columns:
-                            df_global[col] = df_global[col].astype(str).apply(limpiar_lat_lon)
-                            df_global[col] = pd.to_numeric(df_global[col], errors='coerce')
-
-                except Exception as e_merge2:
-                    st.warning(f"Error durante el segundo merge con df_localidad_municipio: {str(e_merge2)}")
-                # No es necesario un 'else' aquí, las advertencias ya se mostraron si can_merge es False
-            else:
-                st.info("df_localidad_municipio no está disponible o está vacío, se omite el segundo cruce.")
-            # --- FIN: Nuevo Merge con df_localidad_municipio ---
-
-        
-        # Filtrar líneas de préstamo que no deben ser consideradas
-        if has_global_data and 'N_LINEA_PRESTAMO' in df_global.columns:
-            # Lista de líneas de préstamo a agrupar como 'Otras Lineas'
-            lineas_a_agrupar = ["L1", "L3", "L4", "L6"]
-            
-            # Crear una máscara para identificar las filas con estas líneas
-            mask_otras_lineas = df_global['N_LINEA_PRESTAMO'].isin(lineas_a_agrupar)
-            
-            # Renombrar el valor en la columna 'N_LINEA_PRESTAMO' para esas filas
-            df_global.loc[mask_otras_lineas, 'N_LINEA_PRESTAMO'] = "Otras Lineas"
-            
-            # Ya no se eliminan filas, así que no es necesario re-evaluar has_global_data aquí
-            # # Verificar si todavía hay datos después del filtrado
-            # has_global_data = not df_global.empty
-
-        
-        # Verificar la estructura final para diagnóstico
-        if has_global_data and st.session_state.get('debug_mode', False):
-            st.write("Estructura final de df_global:")
-            st.write(f"Tipo: {type(df_global)}")
-            st.write(f"Columnas: {df_global.columns.tolist()}")
-            st.write(f"Tipos de datos: {df_global.dtypes}")
-        
-        # Convertir cualquier columna que sea Series a valores nativos
-        if has_global_data and not df_global.empty:
-            for col in df_global.columns:
-                try:
-                    if len(df_global) > 0 and isinstance(df_global[col].iloc[0], pd.Series):
-                        # Si la columna contiene Series, convertirla a valores nativos
-                        df_global[col] = df_global[col].apply(lambda x: x.values[0] if isinstance(x, pd.Series) else x)
-                except Exception as e:
-                    st.warning(f"Error al procesar columna {col}: {str(e)}")
-                    # Intentar convertir la columna completa si es una Serie
-                    if isinstance(df_global[col], pd.Series):
-                        try:
-                            df_global[col] = df_global[col].apply(lambda x: x if not isinstance(x, pd.Series) else x.iloc[0] if len(x) > 0 else None)
-                        except:
-                            pass
-                    # Crear un DataFrame adicional que contenga solo las categorías 'Pagados' y 'Pagados-Finalizados'
-            # para operaciones específicas que requieren solo estos datos
-        categorias_validas = ['Pagados', 'Pagados-Finalizados']
-        df_global_pagados = df_global[df_global['CATEGORIA'].isin(categorias_validas)].copy()
-        # Realizar el merge con df_cumplimiento directamente en df_global si está disponible
-        if has_cumplimiento_data and 'NRO_FORMULARIO' in df_cumplimiento.columns:
-            try:
-                # Columnas a obtener del DataFrame de cumplimiento
-                columnas_cumplimiento = [
-                    'NRO_FORMULARIO',
-                    'PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO'
-                ]
-
-                # Verificar que todas las columnas existan
-                missing_cols_cumplimiento = [col for col in columnas_cumplimiento if col not in df_cumplimiento.columns]
+        df_global, avisos_tabla = materializar_tabla(
+            'HECHOS_BCO_GENTE_NOMINA', version, construir_nomina, con_avisos=True
+        )
+        avisos.extend(avisos_tabla)
 
-                if not missing_cols_cumplimiento:
-                    # Seleccionar solo las columnas necesarias
-                    df_cumplimiento_subset = df_cumplimiento[columnas_cumplimiento].copy()
+    # Tabla de hechos de préstamos pagados cruzada con cumplimiento
+    df_global_pagados, avisos_tabla = materializar_tabla(
+        'HECHOS_BCO_GENTE_PAGADOS',
+        version,
+        lambda: _construir_pagados(df_global, df_cumplimiento),
+        con_avisos=True
+    )
+    avisos.extend(avisos_tabla)
 
-                    # Convertir columna numérica a tipo float
-                    df_cumplimiento_subset['PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO'] = pd.to_numeric(
-                        df_cumplimiento_subset['PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO'], 
-                        errors='coerce'
-                    )
+    # Cubos financieros pre-agregados de la nómina y de los pagados (tablas y KPIs)
+    cubo_global = construir_cubo_bco_gente(df_global)
+    cubo_pagados = construir_cubo_bco_gente(df_global_pagados)
 
-                    # Realizar el merge (left join) con df_global_pagados
-                    df_global_pagados = pd.merge(
-                        df_global_pagados,
-                        df_cumplimiento_subset,
-                        left_on='NRO_SOLICITUD',  # Clave en df_global_pagados
-                        right_on='NRO_FORMULARIO',  # Clave en df_cumplimiento
-                        how='left'
-                    )
-                    # Eliminar la columna duplicada NRO_FORMULARIO si existe
-                    if 'NRO_FORMULARIO' in df_global_pagados.columns:
-                        df_global_pagados = df_global_pagados.drop('NRO_FORMULARIO', axis=1)
-                else:
-                    st.warning(f"No se pudo realizar el merge con datos de cumplimiento. Faltan columnas: {', '.join(missing_cols_cumplimiento)}")
-            except Exception as e_cumplimiento:
-                st.warning(f"Error al realizar el merge con datos de cumplimiento: {str(e_cumplimiento)}")
-        else:
-            st.info("Los datos de cumplimiento no están disponibles o no contienen la columna NRO_FORMULARIO.")
-        # Rellenar valores NaN con 0 en df_global_pagados
-        for col in ['DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA', 'MONTO_OTORGADO']:
-            if col in df_global_pagados.columns:
-                df_global_pagados[col] = pd.to_numeric(df_global_pagados[col], errors='coerce').fillna(0)
-                
-        # Añadir campos calculados a df_global_pagados
-        if all(col in df_global_pagados.columns for col in ['DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA']):
-            df_global_pagados['DEUDA_A_RECUPERAR'] = df_global_pagados['DEUDA_VENCIDA'] + df_global_pagados['DEUDA_NO_VENCIDA']
-            
-        if all(col in df_global_pagados.columns for col in ['MONTO_OTORGADO', 'DEUDA_A_RECUPERAR']):
-            df_global_pagados['RECUPERADO'] = df_global_pagados['MONTO_OTORGADO'] - df_global_pagados['DEUDA_A_RECUPERAR']
-        
-        return df_global, geojson_data, df_localidad_municipio, df_global_pagados
+    return df_global, geojson_data, df_localidad_municipio, df_global_pagados, cubo_global, cubo_pagados, avisos
 
 def render_filters(df_filtrado_global):
     """
@@ -580,7 +768,8 @@ def show_bco_gente_dashboard(data, dates, is_development=False):
     df_global_pagados = None
     
      # Cargar y preprocesar datos
-    df_global, geojson_data, df_localidad_municipio, df_global_pagados = load_and_preprocess_data(data)
+    df_global, geojson_data, df_localidad_municipio, df_global_pagados, cubo_global, cubo_pagados = load_and_preprocess_data(data)
+    version_global = version_dataset(data, ARCHIVOS_BCO_GENTE)
     
     if is_development:
         st.write("Datos Globales ya cruzados (después de load_and_preprocess_data):")
@@ -600,7 +789,7 @@ def show_bco_gente_dashboard(data, dates, is_development=False):
                 
             # Mover el código de descarga dentro del bloque condicional
             import io
-            csv = df_to_download.to_csv(index=False).encode('utf-8')
+            csv = formatear_cuil_cuit(df_to_download).to_csv(index=False).encode('utf-8')
             st.download_button(
                 label="Descargar CSV de Datos Globales",
                 data=csv,
@@ -609,8 +798,8 @@ def show_bco_gente_dashboard(data, dates, is_development=False):
             )
 
     
-    # Crear una copia del DataFrame para trabajar con él
-    df_filtrado_global = df_global.copy()
+    # Referencia propia al DataFrame (copy-on-write: no se duplican los datos)
+    df_filtrado_global = df_global.copy(deep=False)
     
     # Mostrar última actualización
     from utils.ui_components import show_last_update
@@ -624,72 +813,85 @@ def show_bco_gente_dashboard(data, dates, is_development=False):
         if df_filtrado_global is not None and not df_filtrado_global.empty:
             st.markdown('<h3 style="font-size: 18px; margin-top: 0;">Filtros - GLOBAL</h3>', unsafe_allow_html=True)
             
+            # Índice de bitmaps por valor de filtro, construido una vez por versión del dataset:
+            # cada combinación de filtros se resuelve con AND entre bitmaps, sin recorrer la tabla
+            indice = _indice_filtros('HECHOS_BCO_GENTE_NOMINA', version_global, df_global)
+
             # Crear tres columnas para los filtros
             col1, col2, col3 = st.columns(3)
             
             # Filtro de departamento en la primera columna
             with col1:
-                # DataFrame con LATITUD NO nulo
-                df_lat_notnull = df_filtrado_global[df_filtrado_global['LATITUD'].notnull()]
-                # DataFrame con LATITUD nulo
-                df_lat_null = df_filtrado_global[df_filtrado_global['LATITUD'].isnull()]
-
-                # Departamentos: los de lat_notnull + "Otros" si hay filas en lat_null
-                departamentos = sorted(df_lat_notnull['N_DEPARTAMENTO'].dropna().unique().tolist())
-                if not df_lat_null.empty:
+                # Departamentos de las filas con LATITUD + "Otros" si hay filas sin coordenadas
+                departamentos = indice.valores('N_DEPARTAMENTO', indice.con_coordenadas)
+                if indice.sin_coordenadas.any():
                     departamentos.append("Otros")
                 all_dpto_option = "Todos los departamentos"
                 selected_dpto = st.selectbox("Departamento:", [all_dpto_option] + list(departamentos), key="global_dpto_filter")
 
             # Filtrar por departamento seleccionado
-            if selected_dpto != all_dpto_option:
-                if selected_dpto == "Otros":
-                    df_filtrado_global_tab = df_lat_null.copy()
-                    localidades = sorted(df_filtrado_global_tab['N_LOCALIDAD'].dropna().unique())
-                else:
-                    df_filtrado_global_tab = df_filtrado_global[df_filtrado_global['N_DEPARTAMENTO'] == selected_dpto]
-                    # Filtro de localidad (dependiente del departamento)
-                    df_latitud_notnull = df_filtrado_global_tab[df_filtrado_global_tab['LATITUD'].notnull()]
-                    df_latitud_null = df_filtrado_global_tab[df_filtrado_global_tab['LATITUD'].isnull()]
-                    localidades = sorted(
-                        pd.concat([
-                            df_latitud_notnull['N_LOCALIDAD'].dropna(),
-                            df_latitud_null['N_LOCALIDAD'].dropna()
-                        ]).unique()
-                    )
-                all_loc_option = "Todas las localidades"
-
-                # Mostrar filtro de localidad en la segunda columna
-                with col2:
-                    selected_loc = st.selectbox("Localidad:", [all_loc_option] + list(localidades), key="global_loc_filter")
-
-                if selected_loc != all_loc_option:
-                    df_filtrado_global_tab = df_filtrado_global_tab[df_filtrado_global_tab['N_LOCALIDAD'] == selected_loc]
-            else:
-                # Si no se seleccionó departamento, mostrar todas las localidades
-                localidades = sorted(df_filtrado_global['N_LOCALIDAD'].dropna().unique())
-                all_loc_option = "Todas las localidades"
-                df_filtrado_global_tab = df_filtrado_global
-
-                # Mostrar filtro de localidad en la segunda columna
-                with col2:
-                    selected_loc = st.selectbox("Localidad:", [all_loc_option] + list(localidades), key="global_loc_filter")
+            filas_global = indice.todas
+            if selected_dpto == "Otros":
+                filas_global = indice.sin_coordenadas
+            elif selected_dpto != all_dpto_option:
+                filas_global = indice.mascara('N_DEPARTAMENTO', selected_dpto)
+
+            # Filtro de localidad (dependiente del departamento) en la segunda columna
+            localidades = indice.valores('N_LOCALIDAD', filas_global)
+            all_loc_option = "Todas las localidades"
+            with col2:
+                selected_loc = st.selectbox("Localidad:", [all_loc_option] + list(localidades), key="global_loc_filter")
 
-                if selected_loc != all_loc_option:
-                    df_filtrado_global_tab = df_filtrado_global_tab[df_filtrado_global_tab['N_LOCALIDAD'] == selected_loc]
+            if selected_loc != all_loc_option:
+                filas_global = filas_global & indice.mascara('N_LOCALIDAD', selected_loc)
             
             # Filtro de línea de préstamo en la tercera columna
             with col3:
-                lineas_prestamo = sorted(df_filtrado_global_tab['N_LINEA_PRESTAMO'].dropna().unique())
+                lineas_prestamo = indice.valores('N_LINEA_PRESTAMO', filas_global)
                 selected_lineas = st.multiselect("Línea de préstamo:", lineas_prestamo, default=lineas_prestamo, key="global_linea_filter")
             
             if selected_lineas:
-                df_filtrado_global_tab = df_filtrado_global_tab[df_filtrado_global_tab['N_LINEA_PRESTAMO'].isin(selected_lineas)]
+                filas_global = filas_global & indice.mascara('N_LINEA_PRESTAMO', selected_lineas)
+
+            df_filtrado_global_tab = indice.seleccionar(df_filtrado_global, filas_global)
+
+            # Celdas del cubo financiero y del conteo de personas con los mismos filtros
+            filtros_tab = filtros_cubo_territorio(
+                departamento=selected_dpto if selected_dpto not in (all_dpto_option, "Otros") else None,
+                localidad=selected_loc if selected_loc != all_loc_option else None,
+                lineas=list(selected_lineas),
+                sin_coordenadas=selected_dpto == "Otros"
+            )
+            cubo_global_tab = None
+            if cubo_global is not None:
+                cubo_global_tab = filtrar_cubo(cubo_global, filtros_tab)
+            conteo_aproximado = st.checkbox(
+                "Conteo rápido de personas (aproximado)",
+                value=False,
+                key="global_conteo_aproximado",
+                help=f"Estima las personas distintas (CUIL) con sketches HyperLogLog ({DESCRIPCION_ERROR_HLL}). "
+                     "Los valores estimados se muestran como '≈ … (estimado)'. Con una localidad o el "
+                     "departamento 'Otros' seleccionados se cuenta siempre exacto."
+            )
+            aproximado = conteo_aproximado and usa_conteo_aproximado(filtros_tab)
+            if conteo_aproximado and not aproximado:
+                st.caption("Con localidad o departamento 'Otros' las personas se cuentan en forma exacta.")
+            personas_global_tab = None
+            personas_global = _conteo_personas('HECHOS_BCO_GENTE_NOMINA', version_global, df_global, aproximado)
+            if personas_global is not None:
+                personas_global_tab = personas_global.filtrar(filtros_tab)
+            # Cubos mensuales de la serie histórica con los mismos filtros
+            series_global_tab = {}
+            for columna_fecha in COLUMNAS_SERIE:
+                cubo_mensual = _cubo_mensual('HECHOS_BCO_GENTE_NOMINA', version_global, df_global, columna_fecha)
+                if cubo_mensual is not None:
+                    series_global_tab[columna_fecha] = filtrar_cubo(cubo_mensual, filtros_tab)
             
 
             # Mostrar los datos filtrados en la pestaña GLOBAL
             with st.spinner("Cargando visualizaciones globales..."):
-                mostrar_global(df_filtrado_global_tab, TOOLTIPS_DESCRIPTIVOS)
+                token_filtros = (version_global, selected_dpto, selected_loc, tuple(selected_lineas))
+                mostrar_global(df_filtrado_global_tab, TOOLTIPS_DESCRIPTIVOS, token_filtros, cubo_global_tab, personas_global_tab, series_global_tab)
 
             
 
@@ -700,8 +902,8 @@ def show_bco_gente_dashboard(data, dates, is_development=False):
         if df_global_pagados is not None and not df_global_pagados.empty:
             st.markdown('<h3 style="font-size: 18px; margin-top: 0;">Filtros - RECUPERO</h3>', unsafe_allow_html=True)
             
-            # Crear una copia del DataFrame para trabajar con él
-            df_filtrado_recupero = df_global_pagados.copy()
+            # Copia perezosa (copy-on-write): solo se copian las columnas que se modifican
+            df_filtrado_recupero = df_global_pagados.copy(deep=False)
             
             # Asegurar que df_filtrado_recupero tenga todas las columnas calculadas necesarias
             # Rellenar valores NaN con 0
@@ -717,72 +919,229 @@ def show_bco_gente_dashboard(data, dates, is_development=False):
             if 'RECUPERADO' not in df_filtrado_recupero.columns and all(col in df_filtrado_recupero.columns for col in ['MONTO_OTORGADO', 'DEUDA_A_RECUPERAR']):
                 df_filtrado_recupero['RECUPERADO'] = df_filtrado_recupero['MONTO_OTORGADO'] - df_filtrado_recupero['DEUDA_A_RECUPERAR']
             
+            # Índice de bitmaps de los préstamos pagados (mismo orden de filas que df_global_pagados)
+            indice_rec = _indice_filtros('HECHOS_BCO_GENTE_PAGADOS', version_global, df_global_pagados)
+
             # Crear tres columnas para los filtros
             col1, col2, col3 = st.columns(3)
             
             # Filtro de departamento en la primera columna
             with col1:
-                departamentos = sorted(df_filtrado_recupero['N_DEPARTAMENTO'].dropna().unique())
+                departamentos = indice_rec.valores('N_DEPARTAMENTO')
                 all_dpto_option = "Todos los departamentos"
                 selected_dpto_rec = st.selectbox("Departamento:", [all_dpto_option] + list(departamentos), key="recupero_dpto_filter")
             
             # Filtrar por departamento seleccionado
+            filas_recupero = indice_rec.todas
             if selected_dpto_rec != all_dpto_option:
-                df_filtrado_recupero_tab = df_filtrado_recupero[df_filtrado_recupero['N_DEPARTAMENTO'] == selected_dpto_rec]
-                # Filtro de localidad (dependiente del departamento)
-                localidades = sorted(df_filtrado_recupero_tab['N_LOCALIDAD'].dropna().unique())
-                all_loc_option = "Todas las localidades"
-                
-                # Mostrar filtro de localidad en la segunda columna
-                with col2:
-                    selected_loc_rec = st.selectbox("Localidad:", [all_loc_option] + list(localidades), key="recupero_loc_filter")
-                
-                if selected_loc_rec != all_loc_option:
-                    df_filtrado_recupero_tab = df_filtrado_recupero_tab[df_filtrado_recupero_tab['N_LOCALIDAD'] == selected_loc_rec]
-            else:
-                # Si no se seleccionó departamento, mostrar todas las localidades
-                localidades = sorted(df_filtrado_recupero['N_LOCALIDAD'].dropna().unique())
-                all_loc_option = "Todas las localidades"
-                df_filtrado_recupero_tab = df_filtrado_recupero
-                
-                # Mostrar filtro de localidad en la segunda columna
-                with col2:
-                    selected_loc_rec = st.selectbox("Localidad:", [all_loc_option] + list(localidades), key="recupero_loc_filter")
-                
-                if selected_loc_rec != all_loc_option:
-                    df_filtrado_recupero_tab = df_filtrado_recupero_tab[df_filtrado_recupero_tab['N_LOCALIDAD'] == selected_loc_rec]
+                filas_recupero = indice_rec.mascara('N_DEPARTAMENTO', selected_dpto_rec)
+
+            # Filtro de localidad (dependiente del departamento) en la segunda columna
+            localidades = indice_rec.valores('N_LOCALIDAD', filas_recupero)
+            all_loc_option = "Todas las localidades"
+            with col2:
+                selected_loc_rec = st.selectbox("Localidad:", [all_loc_option] + list(localidades), key="recupero_loc_filter")
+            
+            if selected_loc_rec != all_loc_option:
+                filas_recupero = filas_recupero & indice_rec.mascara('N_LOCALIDAD', selected_loc_rec)
             
             # Filtro de línea de préstamo en la tercera columna
             with col3:
-                lineas_prestamo = sorted(df_filtrado_recupero_tab['N_LINEA_PRESTAMO'].dropna().unique())
+                lineas_prestamo = indice_rec.valores('N_LINEA_PRESTAMO', filas_recupero)
                 all_lineas_option = "Todas las líneas"
                 selected_linea_rec = st.selectbox("Línea de préstamo:", [all_lineas_option] + list(lineas_prestamo), key="recupero_linea_filter")
             
             if selected_linea_rec != all_lineas_option:
-                df_filtrado_recupero_tab = df_filtrado_recupero_tab[df_filtrado_recupero_tab['N_LINEA_PRESTAMO'] == selected_linea_rec]
+                filas_recupero = filas_recupero & indice_rec.mascara('N_LINEA_PRESTAMO', selected_linea_rec)
+
+            df_filtrado_recupero_tab = indice_rec.seleccionar(df_filtrado_recupero, filas_recupero)
+
+            # Celdas del cubo de pagados con los mismos filtros
+            cubo_recupero_tab = None
+            if cubo_pagados is not None:
+                cubo_recupero_tab = filtrar_cubo(cubo_pagados, filtros_cubo_territorio(
+                    departamento=selected_dpto_rec if selected_dpto_rec != all_dpto_option else None,
+                    localidad=selected_loc_rec if selected_loc_rec != all_loc_option else None,
+                    lineas=selected_linea_rec if selected_linea_rec != all_lineas_option else None
+                ))
             
             # Mostrar los datos de recupero en la pestaña RECUPERO
             with st.spinner("Cargando visualizaciones de recupero..."):
-                mostrar_recupero( df_filtrado_recupero_tab, is_development)
+                mostrar_recupero(df_filtrado_recupero_tab, is_development, cubo_recupero_tab)
         else:
             st.info("No hay datos de recupero disponibles para mostrar.")
 
-def mostrar_global(df_filtrado_global, tooltips_categorias):
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _indice_filtros(nombre, version, _df):
+    """
+    Construye el índice de filtros (bitmaps por valor) de una tabla una vez por versión.
+
+    Args:
+        nombre: Nombre de la tabla indexada (distingue nómina y pagados en la clave)
+        version: Versión del dataset, clave del caché
+        _df: DataFrame a indexar (no se hashea)
+
+    Returns:
+        IndiceFiltros compartido, de solo lectura
+    """
+    return IndiceFiltros(_df)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _conteo_personas(nombre, version, _df, aproximado=False):
+    """
+    Construye el conteo de CUIL distintos por celda de una tabla una vez por versión.
+
+    Args:
+        nombre: Nombre de la tabla (distingue nómina y pagados en la clave)
+        version: Versión del dataset, clave del caché
+        _df: DataFrame de préstamos (no se hashea)
+        aproximado: True para sketches HyperLogLog (se cachea aparte del exacto)
+
+    Returns:
+        ConteoDistinto o ConteoAproximado compartido, de solo lectura (None si no hay columna CUIL)
+    """
+    return construir_conteo_personas(_df, aproximado)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cubo_mensual(nombre, version, _df, columna_fecha):
+    """
+    Construye el cubo mensual de una fecha de una tabla una vez por versión.
+
+    Args:
+        nombre: Nombre de la tabla (distingue nómina y pagados en la clave)
+        version: Versión del dataset, clave del caché
+        _df: DataFrame de préstamos (no se hashea)
+        columna_fecha: Fecha de la serie (FEC_FORM o FEC_INICIO_PAGO)
+
+    Returns:
+        DataFrame compartido, de solo lectura (None si no está la fecha)
+    """
+    return construir_cubo_mensual(_df, columna_fecha)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def prepare_linea_data(token, _cubo, categorias_mostrar):
+    """
+    Arma la tabla de conteo de préstamos por línea y categoría.
+
+    La clave del caché es `token` (versión del dataset + estado de filtros), así
+    Streamlit no necesita hashear el cubo en cada llamada.
+
+    Args:
+        token: Tupla (versión del dataset, filtros) que identifica a `_cubo`
+        _cubo: Celdas del cubo financiero con los filtros aplicados (no se hashea)
+        categorias_mostrar: Lista de categorías a incluir
+
+    Returns:
+        DataFrame pivot con una fila por línea y una fila de totales
+    """
+    # Incluir solo las celdas de las categorías seleccionadas
+    cubo_conteo = filtrar_cubo(_cubo, {'CATEGORIA': categorias_mostrar})
+
+    # Crear pivot table: Línea de préstamo vs Categoría (suma de solicitudes por celda)
+    pivot_linea = pd.pivot_table(
+        cubo_conteo,
+        index=['N_LINEA_PRESTAMO'],
+        columns='CATEGORIA',
+        values='SOLICITUDES',
+        aggfunc='sum',
+        fill_value=0
+    ).reset_index()
+
+    # Asegurar que todas las categorías estén en la tabla
+    for categoria in categorias_mostrar:
+        if categoria not in pivot_linea.columns:
+            pivot_linea[categoria] = 0
+
+    # Calcular totales por línea
+    pivot_linea['Total'] = pivot_linea[categorias_mostrar].sum(axis=1)
+
+    # Agregar fila de totales
+    totales = pivot_linea[categorias_mostrar + ['Total']].sum()
+    totales_row = pd.DataFrame([['Total'] + totales.values.tolist()], 
+                              columns=['N_LINEA_PRESTAMO'] + categorias_mostrar + ['Total'])
+    return pd.concat([pivot_linea, totales_row], ignore_index=True)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def prepare_categoria_data(token, _cubo, categorias):
+    """
+    Arma la tabla de conteo de préstamos por localidad y categoría de estado.
+
+    Igual que prepare_linea_data, el caché se indexa por `token` y no por el
+    contenido de `_cubo`.
+
+    Args:
+        token: Tupla (versión del dataset, filtros) que identifica a `_cubo`
+        _cubo: Celdas del cubo financiero con los filtros aplicados (no se hashea)
+        categorias: Lista ordenada de categorías a incluir como columnas
+
+    Returns:
+        DataFrame pivot con una fila por departamento y localidad
+    """
+    # Crear pivot table sumando las solicitudes de las celdas por categoría
+    pivot_df = _cubo.pivot_table(
+        index=['N_DEPARTAMENTO', 'N_LOCALIDAD'],
+        columns='CATEGORIA',
+        values='SOLICITUDES',
+        aggfunc='sum',
+        fill_value=0
+    ).reset_index()
+    
+    # Las categorías agregadas (p. ej. PAGOS GESTIONADOS) se cuentan por sus estados,
+    # ya que cada préstamo tiene asignada una única categoría excluyente
+    for categoria in categorias:
+        if categoria in CATEGORIAS_AGREGADAS:
+            conteo = (
+                sumar_cubo(filtrar_cubo(_cubo, {'N_ESTADO_PRESTAMO': ESTADO_CATEGORIAS[categoria]}),
+                           ['N_DEPARTAMENTO', 'N_LOCALIDAD'], ['SOLICITUDES'])
+                .rename(columns={'SOLICITUDES': categoria})
+            )
+            pivot_df = pivot_df.drop(columns=categoria, errors='ignore').merge(conteo, how='left', on=['N_DEPARTAMENTO', 'N_LOCALIDAD'])
+            pivot_df[categoria] = pivot_df[categoria].fillna(0).astype(int)
+
+    # Asegurar que todas las categorías seleccionadas estén en la tabla
+    for categoria in categorias:
+        if categoria not in pivot_df.columns:
+            pivot_df[categoria] = 0
+    
+    # Reordenar columnas para mostrar en orden consistente
+    return pivot_df.reindex(columns=['N_DEPARTAMENTO', 'N_LOCALIDAD'] + categorias)
+
+def mostrar_global(df_filtrado_global, tooltips_categorias, token_filtros=None, cubo=None, personas=None, series=None):
     """
     Muestra los datos globales del Banco de la Gente.
     
     Args:
         df_filtrado_global: DataFrame filtrado con datos globales
         tooltips_categorias: Diccionario con tooltips para cada categoría
+        token_filtros: Tupla (versión del dataset, filtros aplicados) usada como clave de caché
+        cubo: Celdas del cubo financiero con los mismos filtros (None = se arma a partir
+            de df_filtrado_global)
+        personas: ConteoDistinto (o ConteoAproximado) de CUIL con los mismos filtros
+            (None = se arma a partir de df_filtrado_global)
+        series: Diccionario {fecha: cubo mensual} de COLUMNAS_SERIE con los mismos filtros
+            (None = se arman a partir de df_filtrado_global)
     """
-    # Crear el conteo de estados
+    if token_filtros is None:
+        # Sin token conocido: versionar por contenido
+        token_filtros = (version_dataset({'df': df_filtrado_global}, ['df']),)
+    if cubo is None:
+        cubo = construir_cubo_bco_gente(df_filtrado_global)
+    if personas is None:
+        personas = construir_conteo_personas(df_filtrado_global)
+    if series is None:
+        series = {}
+        for columna_fecha in COLUMNAS_SERIE:
+            cubo_mensual = construir_cubo_mensual(df_filtrado_global, columna_fecha)
+            if cubo_mensual is not None:
+                series[columna_fecha] = cubo_mensual
+    # Crear el conteo de estados (sumando las celdas del cubo)
+    conteo_por_estado = {}
     try:
         conteo_estados = (
-            df_filtrado_global.groupby("N_ESTADO_PRESTAMO")
-            .size()
-            .rename("conteo")
-            .reset_index()
+            sumar_cubo(cubo, ['N_ESTADO_PRESTAMO'])
+            .rename(columns={COLUMNA_CANTIDAD: 'conteo'})
         )
+        conteo_por_estado = dict(zip(conteo_estados['N_ESTADO_PRESTAMO'], conteo_estados['conteo']))
         
         # Crear el diccionario de resultados con los totales para cada categoría
         resultados = {
@@ -811,41 +1170,25 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
             estados = ESTADO_CATEGORIAS.get(categoria, [])
             total_formularios = resultados.get(categoria, 0)
             
-            # Calcular personas únicas solo para esta categoría
-            if estados:
-                mask = df_filtrado_global["N_ESTADO_PRESTAMO"].isin(estados)
-                # Verificar cuántas filas cumplen con la condición
-                filas_coincidentes = mask.sum()
-                
-                if filas_coincidentes > 0:
-                    # Extraer el subconjunto de datos para análisis
-                    df_subset = df_filtrado_global.loc[mask].copy()
-                    
-                    # Verificar si hay valores no nulos en la columna CUIL y contar personas únicas
-                    df_cuil_no_nulos = df_subset.dropna(subset=['CUIL'])
-                    
-                    # Si hay CUILs no nulos, contar personas únicas; si no, usar el número de filas
-                    if not df_cuil_no_nulos.empty:
-                        total_personas = df_cuil_no_nulos['CUIL'].nunique()
-                    else:
-                        # Si todos los CUILs son nulos, usar el número de filas como aproximación
-                        total_personas = filas_coincidentes
-                else:
-                    total_personas = 0
-            else:
-                total_personas = 0
+            # Calcular personas únicas solo para esta categoría (unión de CUIL de sus estados).
+            # Los estados de una categoría no se repiten en otra, así que filtrar por
+            # CATEGORIA equivale a filtrar por sus estados y también sirve en el modo aproximado
+            total_personas = 0
+            estimado = False
+            if estados and personas is not None:
+                total_personas = personas.contar({'CATEGORIA': categoria})
+                estimado = personas.estimado
+            if total_personas == 0:
+                # Si todos los CUILs son nulos, usar el número de formularios como aproximación
+                total_personas = total_formularios
+                estimado = False
                 
             kpi["value_form"] = total_formularios
-            kpi["value_pers"] = f"{total_personas:,}".replace(',', '.')
+            kpi["value_pers"] = formatear_conteo(total_personas, estimado)
         # Si en el futuro quieres aplicar a más KPIs, puedes agregar estas claves para otros casos aquí.
 
     display_kpi_row(kpi_data, num_columns=6)
 
-    # DEBUG VISUAL: Mostrar info de CUIL únicos para 'En Evaluación'
-    estados_eval = ESTADO_CATEGORIAS["En Evaluación"]
-    mask_eval = df_filtrado_global["N_ESTADO_PRESTAMO"].isin(estados_eval)
-    df_eval = df_filtrado_global[mask_eval][["N_ESTADO_PRESTAMO", "CUIL"]]
-    cuils_unicos_eval = df_filtrado_global.loc[mask_eval, "CUIL"].nunique()
     st.markdown("<hr>", unsafe_allow_html=True)
    
 
@@ -865,7 +1208,7 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
         if estados:
             estados_detalle = []
             for estado in estados:
-                cantidad = int(df_filtrado_global[df_filtrado_global["N_ESTADO_PRESTAMO"] == estado].shape[0])
+                cantidad = int(conteo_por_estado.get(estado, 0))
                 estados_detalle.append(f"<b>{estado}:</b> {cantidad}")
             
             # Obtener el color para esta categoría o usar un color por defecto
@@ -896,48 +1239,8 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
             # Definir las categorías a mostrar
             categorias_mostrar = ["A Pagar - Convocatoria", "Pagados", "En proceso de pago", "Pagados-Finalizados"]
 
-            # Usar @st.cache_data para evitar recalcular si los datos no cambian
-            @st.cache_data
-            def prepare_linea_data(df, categorias_mostrar):
-                    # Crear copia del DataFrame para manipulación
-                    df_conteo = df.copy()
-
-                    # Agregar columna de categoría basada en N_ESTADO_PRESTAMO
-                    df_conteo['CATEGORIA'] = 'Otros'
-                    for categoria in categorias_mostrar:
-                        estados = ESTADO_CATEGORIAS.get(categoria, [])
-                        mask = df_conteo['N_ESTADO_PRESTAMO'].isin(estados)
-                        df_conteo.loc[mask, 'CATEGORIA'] = categoria
-
-                    # Filtrar para incluir solo las categorías seleccionadas
-                    df_conteo = df_conteo[df_conteo['CATEGORIA'].isin(categorias_mostrar)]
-
-                    # Crear pivot table: Línea de préstamo vs Categoría
-                    pivot_linea = pd.pivot_table(
-                        df_conteo,
-                        index=['N_LINEA_PRESTAMO'],
-                        columns='CATEGORIA',
-                        values='NRO_SOLICITUD',
-                        aggfunc='count',
-                        fill_value=0
-                    ).reset_index()
-
-                    # Asegurar que todas las categorías estén en la tabla
-                    for categoria in categorias_mostrar:
-                        if categoria not in pivot_linea.columns:
-                            pivot_linea[categoria] = 0
-
-                    # Calcular totales por línea
-                    pivot_linea['Total'] = pivot_linea[categorias_mostrar].sum(axis=1)
-
-                    # Agregar fila de totales
-                    totales = pivot_linea[categorias_mostrar + ['Total']].sum()
-                    totales_row = pd.DataFrame([['Total'] + totales.values.tolist()], 
-                                              columns=['N_LINEA_PRESTAMO'] + categorias_mostrar + ['Total'])
-                    return pd.concat([pivot_linea, totales_row], ignore_index=True)
-
-                # Obtener el DataFrame procesado usando caché
-            pivot_df = prepare_linea_data(df_filtrado_global, categorias_mostrar)
+            # Obtener el DataFrame procesado usando caché (clave: versión + filtros)
+            pivot_df = prepare_linea_data(token_filtros, cubo, categorias_mostrar)
 
                 # Crear HTML personalizado para la tabla de conteo por línea
             html_table_linea = """
@@ -1024,7 +1327,7 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
     st.subheader("Condición ante ARCA de Préstamos de las líneas de emprendimientos", 
                  help="Muestra la cantidad de personas con condición ante ARCA de los préstamos de las líneas de emprendimientos, estado pagados y finalizados, basado en los datos filtrados.")
 
-    mostrar_resumen_creditos(df_filtrado_global)
+    mostrar_resumen_creditos(df_filtrado_global, personas)
     with st.expander("Detalle de condición ante ARCA", expanded=False):
         mostrar_kpis_fiscales(df_filtrado_global)
     # Línea divisoria para separar secciones
@@ -1041,10 +1344,11 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
         try:
             import plotly.express as px  # Importación local para asegurar que px esté definido
             
-            df_filtrado_torta = df_filtrado_global[df_filtrado_global['CATEGORIA'].isin(categorias_mostrar)]
-            
-            # Agrupar el DataFrame filtrado por línea de préstamo
-            grafico_torta = df_filtrado_torta.groupby('N_LINEA_PRESTAMO').size().reset_index(name='Cantidad')
+            # Agrupar por línea de préstamo las celdas del cubo de las categorías mostradas
+            grafico_torta = (
+                sumar_cubo(filtrar_cubo(cubo, {'CATEGORIA': categorias_mostrar}), ['N_LINEA_PRESTAMO'])
+                .rename(columns={COLUMNA_CANTIDAD: 'Cantidad'})
+            )
             
             if grafico_torta.empty:
                 st.info("No hay datos en las categorías seleccionadas para mostrar en el gráfico.")
@@ -1080,7 +1384,7 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                 df_sexo = df_filtrado_global[
                     (df_filtrado_global['CATEGORIA'].isin(categorias_incluidas)) & 
                     (df_filtrado_global['N_SEXO'].notna())
-                ].copy()
+                ]
                 
                 if df_sexo.empty:
                     st.warning("No hay datos disponibles para el gráfico de sexo después de filtrar NaNs.")
@@ -1149,7 +1453,7 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                 df_empleado = df_filtrado_global[
                     (df_filtrado_global['CATEGORIA'] == 'Pagados') & 
                     (df_filtrado_global['EMPLEADO'].notna())
-                ].copy()
+                ]
                 if df_empleado.empty:
                     st.warning("No hay datos disponibles para el gráfico de empleo después de filtrar NaNs.")
                 else:
@@ -1201,31 +1505,12 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                 default=categorias_estado,
                 key="filtro_categoria_edades"
             )
-            if df_filtrado_global is not None and 'FEC_NACIMIENTO' in df_filtrado_global.columns and 'N_ESTADO_PRESTAMO' in df_filtrado_global.columns and 'FEC_FORM' in df_filtrado_global.columns:
-                df_edades = df_filtrado_global[['FEC_NACIMIENTO', 'N_ESTADO_PRESTAMO', 'FEC_FORM']].copy()
-                # Mapear N_ESTADO_PRESTAMO a CATEGORIA
-                df_edades['CATEGORIA'] = 'Otros'
-                for categoria, estados in ESTADO_CATEGORIAS.items():
-                    mask = df_edades['N_ESTADO_PRESTAMO'].isin(estados)
-                    df_edades.loc[mask, 'CATEGORIA'] = categoria
-                # Filtrar por las categorías seleccionadas
+            if df_filtrado_global is not None and 'RANGO_EDAD' in df_filtrado_global.columns and 'N_ESTADO_PRESTAMO' in df_filtrado_global.columns:
+                # EDAD (a la fecha de solicitud) y RANGO_EDAD se calculan en la carga
+                df_edades = df_filtrado_global[['RANGO_EDAD', 'N_ESTADO_PRESTAMO']]
+                # Filtrar por los estados que abarcan las categorías seleccionadas
                 if selected_categorias_edades:
-                    df_edades = df_edades[df_edades['CATEGORIA'].isin(selected_categorias_edades)]
-                # Convertir a datetime y quitar hora
-                df_edades['FEC_NACIMIENTO'] = pd.to_datetime(df_edades['FEC_NACIMIENTO'], errors='coerce').dt.date
-                df_edades['FEC_FORM'] = pd.to_datetime(df_edades['FEC_FORM'], errors='coerce').dt.date
-                # Calcular edad usando FEC_FORM en lugar de la fecha actual
-                df_edades['EDAD'] = df_edades.apply(
-                    lambda row: row['FEC_FORM'].year - row['FEC_NACIMIENTO'].year - 
-                    ((row['FEC_FORM'].month, row['FEC_FORM'].day) < 
-                     (row['FEC_NACIMIENTO'].month, row['FEC_NACIMIENTO'].day)) 
-                    if pd.notnull(row['FEC_NACIMIENTO']) and pd.notnull(row['FEC_FORM']) else None, 
-                    axis=1
-                )
-                # Definir rangos de edad
-                bins = [0, 17, 29, 39, 49, 59, 69, 200]
-                labels = ['<18', '18-29', '30-39', '40-49', '50-59', '60-69','70+']
-                df_edades['RANGO_EDAD'] = pd.cut(df_edades['EDAD'], bins=bins, labels=labels, right=True)
+                    df_edades = df_edades[df_edades['N_ESTADO_PRESTAMO'].isin(estados_de_categorias(selected_categorias_edades))]
                 conteo_edades = df_edades['RANGO_EDAD'].value_counts(sort=False).reset_index()
                 conteo_edades.columns = ['Rango de Edad', 'Cantidad']
                 fig_edades = px.bar(
@@ -1269,10 +1554,11 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                 st.session_state.selected_categorias = categorias_orden
             
             # Obtener líneas de crédito disponibles
-            if 'N_LINEA_PRESTAMO' in df_filtrado_global.columns:
-                lineas_credito = sorted(df_filtrado_global['N_LINEA_PRESTAMO'].dropna().unique())
+            # (calculadas una vez por combinación de filtros de la pestaña)
+            if token_filtros is not None:
+                lineas_credito = list(opciones_filtros(token_filtros, df_filtrado_global, ('N_LINEA_PRESTAMO',)).valores('N_LINEA_PRESTAMO'))
             else:
-                lineas_credito = []
+                lineas_credito = OpcionesFiltros(df_filtrado_global, ('N_LINEA_PRESTAMO',)).valores('N_LINEA_PRESTAMO')
             
             
             # Inicializar selected_lineas en session_state si no existe
@@ -1298,19 +1584,15 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                 )
 
             # Aplicar filtros al DataFrame para la tabla de Estados de Préstamos por Categoría
-            df_categoria_estados = df_filtrado_global.copy()
+            df_categoria_estados = df_filtrado_global.copy(deep=False)
             
-            # Agregar columna de categoría basada en N_ESTADO_PRESTAMO
-            df_categoria_estados['CATEGORIA'] = 'Otros'
-            for categoria, estados in ESTADO_CATEGORIAS.items():
-                mask = df_categoria_estados['N_ESTADO_PRESTAMO'].isin(estados)
-                df_categoria_estados.loc[mask, 'CATEGORIA'] = categoria
+            # CATEGORIA ya viene asignada desde la carga
             
             # --- Filtro de rango de fechas FEC_INICIO_PAGO (solo para categorías que tienen esta fecha) ---
+            rango_fecha = None
             aplicar_filtro_fecha = st.checkbox('Aplicar filtro por Fecha de Inicio de Pago', value=False, help="Este filtro solo afecta a préstamos que tienen fecha de inicio de pago (principalmente categoría 'Pagados')")
             
             if aplicar_filtro_fecha and 'FEC_INICIO_PAGO' in df_categoria_estados.columns:
-                df_categoria_estados['FEC_INICIO_PAGO'] = pd.to_datetime(df_categoria_estados['FEC_INICIO_PAGO'], errors='coerce')
                 fechas_validas = df_categoria_estados['FEC_INICIO_PAGO'].dropna().dt.date.unique()
                 fechas_validas = sorted(fechas_validas)
                 if fechas_validas:
@@ -1322,6 +1604,7 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                         value=(min_fecha, max_fecha),
                         key='filtro_fecha_inicio_pago_categoria'
                     )
+                    rango_fecha = (fecha_inicio, fecha_fin)
                     
                     # Crear una máscara para filtrar solo registros con fecha válida en el rango seleccionado
                     mask_fecha = ((df_categoria_estados['FEC_INICIO_PAGO'].dt.date >= fecha_inicio) & 
@@ -1333,30 +1616,27 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                     # Aplicar ambas máscaras para mantener registros que cumplen con el rango de fechas O no tienen fecha
                     df_categoria_estados = df_categoria_estados[mask_fecha | mask_sin_fecha]
             
-            # Filtrar por categorías seleccionadas
-            if selected_categorias:
-                df_categoria_estados = df_categoria_estados[df_categoria_estados['CATEGORIA'].isin(selected_categorias)]
+            # El cubo no tiene la fecha como dimensión: con filtro de fechas se arma un cubo
+            # de las filas filtradas; sin él se usan las celdas ya agregadas
+            cubo_categoria = construir_cubo_bco_gente(df_categoria_estados) if rango_fecha else cubo
+
+            # Filtrar por categorías seleccionadas (por estados, para incluir también las
+            # categorías agregadas) y por líneas de crédito seleccionadas
+            cubo_categoria = filtrar_cubo(cubo_categoria, {
+                'N_ESTADO_PRESTAMO': estados_de_categorias(selected_categorias) if selected_categorias else None,
+                'N_LINEA_PRESTAMO': selected_lineas or None,
+            })
             
-            # Filtrar por líneas de crédito seleccionadas
-            if selected_lineas:
-                df_categoria_estados = df_categoria_estados[df_categoria_estados['N_LINEA_PRESTAMO'].isin(selected_lineas)]
-            
-            # Asegurarse de que los montos sean numéricos y reemplazar NaN por 0
-            if 'MONTO_OTORGADO' in df_categoria_estados.columns:
-                df_categoria_estados['MONTO_OTORGADO'] = pd.to_numeric(df_categoria_estados['MONTO_OTORGADO'], errors='coerce').fillna(0)
-            
-            # Continuar con el agrupamiento solo si hay datos filtrados
-            if not df_categoria_estados.empty:
-                # Realizar el agrupamiento
-                df_grouped = df_categoria_estados.groupby(
-                    ['N_DEPARTAMENTO', 'N_LOCALIDAD', 'CATEGORIA', 'N_LINEA_PRESTAMO']
-                ).agg({
-                    'NRO_SOLICITUD': 'count',
-                    'MONTO_OTORGADO': 'sum'
-                }).reset_index()
-            else:
+            if cubo_categoria.empty:
                 st.warning("No hay datos para mostrar con los filtros seleccionados.")
 
+            # Estado de filtros que determina cubo_categoria
+            token_categorias = token_filtros + (
+                tuple(selected_categorias),
+                tuple(selected_lineas),
+                rango_fecha
+            )
+
             # Actualizar session_state
             if selected_categorias != st.session_state.selected_categorias:
                 st.session_state.selected_categorias = selected_categorias
@@ -1367,36 +1647,12 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
             if not selected_categorias:
                 selected_categorias = categorias_orden
                 
-            # Crear copia del DataFrame para manipulación
-            # Usar @st.cache_data para evitar recalcular si los datos no cambian
-            @st.cache_data
-            def prepare_categoria_data(df, categorias):
-                # La categoría ya está asignada en df_categoria_estados, no necesitamos hacerlo de nuevo
-                df_copy = df.copy()
-
-                # Crear pivot table con conteo agrupado por categorías
-                pivot_df = df_copy.pivot_table(
-                    index=['N_DEPARTAMENTO', 'N_LOCALIDAD'],
-                    columns='CATEGORIA',
-                    values='NRO_SOLICITUD',
-                    aggfunc='count',
-                    fill_value=0
-                ).reset_index()
-                
-                # Asegurar que todas las categorías seleccionadas estén en la tabla
-                for categoria in categorias:
-                    if categoria not in pivot_df.columns:
-                        pivot_df[categoria] = 0
-                
-                # Reordenar columnas para mostrar en orden consistente
-                return pivot_df.reindex(columns=['N_DEPARTAMENTO', 'N_LOCALIDAD'] + categorias)
-            
-            # Obtener el DataFrame procesado usando caché
-            pivot_df = prepare_categoria_data(df_categoria_estados, categorias_orden)
+            # Obtener el DataFrame procesado usando caché (clave: versión + filtros de la tabla)
+            pivot_df = prepare_categoria_data(token_categorias, cubo_categoria, categorias_orden)
             
             # Filtrar solo las columnas seleccionadas
             columnas_mostrar = ['N_DEPARTAMENTO', 'N_LOCALIDAD'] + selected_categorias
-            pivot_df_filtered = pivot_df[columnas_mostrar].copy()
+            pivot_df_filtered = pivot_df[columnas_mostrar]
             
             # Agregar columna de total para las categorías seleccionadas
             pivot_df_filtered['Total'] = pivot_df_filtered[selected_categorias].sum(axis=1)
@@ -1422,28 +1678,18 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
             
             # --- Generar DataFrame extendido para descarga (con columnas extra, pero sin renderizarlas en pantalla) ---
             columnas_extra = [
-                col for col in ['ID_GOBIERNO_LOCAL','TIPO', 'Gestion 2023-2027', 'FUERZAS', 'ESTADO', 'LEGISLADOR DEPARTAMENTAL'] if col in df_filtrado_global.columns
+                col for col in ['ID_GOBIERNO_LOCAL','TIPO', 'Gestion 2023-2027', 'FUERZAS', 'ESTADO', 'LEGISLADOR DEPARTAMENTAL'] if col in cubo_categoria.columns
             ]
-            # Unir las columnas extra al DataFrame original (antes del agrupado)
-            df_descarga = df_categoria_estados[
-                ['N_DEPARTAMENTO', 'N_LOCALIDAD','N_LINEA_PRESTAMO'] + columnas_extra + ['NRO_SOLICITUD', 'N_ESTADO_PRESTAMO','MONTO_OTORGADO']
-            ].copy()
-            # Agregar columna de categoría
-            df_descarga['CATEGORIA'] = 'Otros'
-            for categoria, estados in ESTADO_CATEGORIAS.items():
-                mask = df_descarga['N_ESTADO_PRESTAMO'].isin(estados)
-                df_descarga.loc[mask, 'CATEGORIA'] = categoria
-            # Agrupar para obtener el conteo y la suma de montos por las columnas extra y categoría
-            df_descarga_grouped = df_descarga.groupby(
-                ['N_DEPARTAMENTO', 'N_LOCALIDAD','N_LINEA_PRESTAMO'] + columnas_extra + ['CATEGORIA']
-            ).agg({
-                'NRO_SOLICITUD': 'count',
-                'MONTO_OTORGADO': 'sum'
-            }).reset_index()
+            # Las columnas extra son dimensiones del cubo: sumar las celdas por ellas y la categoría
+            df_descarga_grouped = sumar_cubo(
+                cubo_categoria,
+                ['N_DEPARTAMENTO', 'N_LOCALIDAD','N_LINEA_PRESTAMO'] + columnas_extra + ['CATEGORIA'],
+                ['SOLICITUDES', 'MONTO_OTORGADO']
+            )
             
             # Renombrar las columnas para mayor claridad
             df_descarga_grouped = df_descarga_grouped.rename(columns={
-                'NRO_SOLICITUD': 'Cantidad',
+                'SOLICITUDES': 'Cantidad',
                 'MONTO_OTORGADO': 'Monto Total'
             })
             # --- Botón de descarga Excel con ícono ---
@@ -1488,39 +1734,35 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                 st.warning("La columna 'FEC_FORM' necesaria para la serie histórica no se encuentra en los datos de recupero.") 
             else: 
                 # Verificar si existe la columna FEC_INICIO_PAGO
-                tiene_fecha_inicio_pago = 'FEC_INICIO_PAGO' in df_filtrado_global.columns
+                tiene_fecha_inicio_pago = 'FEC_INICIO_PAGO' in series
                 
-                # Preparar DataFrame de fechas de formulario
-                df_fechas = df_filtrado_global[['FEC_FORM']].copy()
-                df_fechas['FEC_FORM'] = pd.to_datetime(df_fechas['FEC_FORM'], errors='coerce')
-                df_fechas.dropna(subset=['FEC_FORM'], inplace=True)
+                # Celdas de los cubos mensuales (mes x filtros de la pestaña) sin fechas futuras
+                # (las fechas llegan parseadas y validadas desde la carga, con <COL>_MES precalculado)
                 fecha_actual = datetime.now()
-                df_fechas = df_fechas[df_fechas['FEC_FORM'] <= fecha_actual]
-                fecha_min_valida = pd.to_datetime('1678-01-01')
-                df_fechas_filtrado_rango = df_fechas[df_fechas['FEC_FORM'] >= fecha_min_valida].copy()
+                cubo_form = series.get('FEC_FORM')
+                if cubo_form is not None:
+                    cubo_form = cubo_form[cubo_form['FECHA_MIN'] <= fecha_actual]
                 
-                # Preparar DataFrame de fechas de inicio de pago si existe la columna
+                # Celdas de fechas de inicio de pago si existe la columna
                 if tiene_fecha_inicio_pago:
-                    df_fechas_pago = df_filtrado_global[['FEC_INICIO_PAGO']].copy()
-                    df_fechas_pago['FEC_INICIO_PAGO'] = pd.to_datetime(df_fechas_pago['FEC_INICIO_PAGO'], errors='coerce')
-                    df_fechas_pago.dropna(subset=['FEC_INICIO_PAGO'], inplace=True)
-                    df_fechas_pago = df_fechas_pago[df_fechas_pago['FEC_INICIO_PAGO'] <= fecha_actual]
-                    df_fechas_pago = df_fechas_pago[df_fechas_pago['FEC_INICIO_PAGO'] >= fecha_min_valida].copy()
-                    tiene_datos_pago = not df_fechas_pago.empty
+                    cubo_pago = series['FEC_INICIO_PAGO']
+                    cubo_pago = cubo_pago[cubo_pago['FECHA_MIN'] <= fecha_actual]
+                    tiene_datos_pago = not cubo_pago.empty
                 else:
                     tiene_datos_pago = False
                     st.info("La columna 'FEC_INICIO_PAGO' no está disponible para mostrar la segunda serie.")
 
-                if df_fechas_filtrado_rango.empty:
+                if cubo_form is None or cubo_form.empty:
                     st.info("No hay datos disponibles dentro del rango de fechas válido para la serie histórica.")
                 else:
-                    fecha_min = df_fechas_filtrado_rango['FEC_FORM'].min().date()
-                    fecha_max = df_fechas_filtrado_rango['FEC_FORM'].max().date()
+                    # Rango disponible a partir de la primera y última fecha de cada celda
+                    fecha_min = cubo_form['FECHA_MIN'].min().date()
+                    fecha_max = min(cubo_form['FECHA_MAX'].max(), fecha_actual).date()
                     
                     # Ajustar rango de fechas si hay datos de inicio de pago
                     if tiene_datos_pago:
-                        fecha_min_pago = df_fechas_pago['FEC_INICIO_PAGO'].min().date()
-                        fecha_max_pago = df_fechas_pago['FEC_INICIO_PAGO'].max().date()
+                        fecha_min_pago = cubo_pago['FECHA_MIN'].min().date()
+                        fecha_max_pago = min(cubo_pago['FECHA_MAX'].max(), fecha_actual).date()
                         fecha_min = min(fecha_min, fecha_min_pago)
                         fecha_max = max(fecha_max, fecha_max_pago)
                     
@@ -1532,38 +1774,24 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                     if start_date > end_date:
                         st.error("La fecha de inicio debe ser anterior a la fecha de fin.")
                     else:
-                        # Filtrar datos de formularios por rango de fechas
-                        df_fechas_seleccionado = df_fechas_filtrado_rango[
-                            (df_fechas_filtrado_rango['FEC_FORM'].dt.date >= start_date) &
-                            (df_fechas_filtrado_rango['FEC_FORM'].dt.date <= end_date)
-                        ].copy()
+                        # El cubo es mensual: el rango se toma por meses completos
+                        mes_inicio = pd.Timestamp(start_date).to_period('M').to_timestamp()
+                        mes_fin = pd.Timestamp(end_date).to_period('M').to_timestamp()
+                        st.caption("La serie se arma por meses completos: se incluyen todos los préstamos de los meses de las fechas elegidas.")
+
+                        # Serie histórica de formularios: suma de las celdas de los meses del rango
+                        serie_historica = serie_mensual(cubo_form, mes_inicio, mes_fin)
                         
-                        # Filtrar datos de inicio de pago por rango de fechas (si existen)
+                        # Serie histórica de inicio de pagos (si existen)
                         if tiene_datos_pago:
-                            df_fechas_pago_seleccionado = df_fechas_pago[
-                                (df_fechas_pago['FEC_INICIO_PAGO'].dt.date >= start_date) &
-                                (df_fechas_pago['FEC_INICIO_PAGO'].dt.date <= end_date)
-                            ].copy()
-                            tiene_datos_pago_filtrados = not df_fechas_pago_seleccionado.empty
+                            serie_historica_pago = serie_mensual(cubo_pago, mes_inicio, mes_fin)
+                            tiene_datos_pago_filtrados = not serie_historica_pago.empty
                         else:
                             tiene_datos_pago_filtrados = False
 
-                        if df_fechas_seleccionado.empty and (not tiene_datos_pago_filtrados):
+                        if serie_historica.empty and (not tiene_datos_pago_filtrados):
                             st.info("No hay datos para el período seleccionado.")
                         else:
-                            # Preparar serie histórica de formularios
-                            if not df_fechas_seleccionado.empty:
-                                df_fechas_seleccionado['AÑO_MES'] = df_fechas_seleccionado['FEC_FORM'].dt.to_period('M')
-                                serie_historica = df_fechas_seleccionado.groupby('AÑO_MES').size().reset_index(name='Cantidad')
-                                serie_historica['FECHA'] = serie_historica['AÑO_MES'].dt.to_timestamp()
-                                serie_historica = serie_historica.sort_values('FECHA')
-                            
-                            # Preparar serie histórica de inicio de pagos
-                            if tiene_datos_pago_filtrados:
-                                df_fechas_pago_seleccionado['AÑO_MES'] = df_fechas_pago_seleccionado['FEC_INICIO_PAGO'].dt.to_period('M')
-                                serie_historica_pago = df_fechas_pago_seleccionado.groupby('AÑO_MES').size().reset_index(name='Cantidad')
-                                serie_historica_pago['FECHA'] = serie_historica_pago['AÑO_MES'].dt.to_timestamp()
-                                serie_historica_pago = serie_historica_pago.sort_values('FECHA')
 
                             try:
                                 # Crear figura con Plotly Graph Objects para mayor control
@@ -1579,7 +1807,7 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                                     color_rojo = COLORES_IDENTIDAD.get('rojo', color_rojo)
                                 
                                 # Añadir línea de formularios si hay datos
-                                if not df_fechas_seleccionado.empty:
+                                if not serie_historica.empty:
                                     fig_historia.add_trace(go.Scatter(
                                         x=serie_historica['FECHA'],
                                         y=serie_historica['Cantidad'],
@@ -1627,8 +1855,8 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                                 resumen_anual = {}
                                 
                                 # Procesar datos de Formularios Presentados
-                                if not df_fechas_seleccionado.empty:
-                                    tabla_data_form = serie_historica[['FECHA', 'Cantidad']].copy()
+                                if not serie_historica.empty:
+                                    tabla_data_form = serie_historica[['FECHA', 'Cantidad']]
                                     tabla_data_form['Año'] = tabla_data_form['FECHA'].dt.year
                                     tabla_data_form_agrupada = tabla_data_form.groupby('Año', as_index=False)['Cantidad'].sum()
                                     
@@ -1641,7 +1869,7 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
                                 
                                 # Procesar datos de Inicio de Pagos
                                 if tiene_datos_pago_filtrados:
-                                    tabla_data_pago = serie_historica_pago[['FECHA', 'Cantidad']].copy()
+                                    tabla_data_pago = serie_historica_pago[['FECHA', 'Cantidad']]
                                     tabla_data_pago['Año'] = tabla_data_pago['FECHA'].dt.year
                                     tabla_data_pago_agrupada = tabla_data_pago.groupby('Año', as_index=False)['Cantidad'].sum()
                                     
@@ -1703,13 +1931,15 @@ def mostrar_global(df_filtrado_global, tooltips_categorias):
     except Exception as e:
         st.error(f"Error inesperado en la sección Serie Histórica: {e}")
 
-def mostrar_recupero(df_filtrado_recupero=None, is_development=False):
+def mostrar_recupero(df_filtrado_recupero=None, is_development=False, cubo=None):
     """
     Muestra la sección de recupero de deudas, utilizando datos ya filtrados.
     
     Args:
         df_filtrado_recupero: DataFrame con datos de recupero completos (basado en df_global_pagados).
         is_development: Indica si se está en modo desarrollo.
+        cubo: Celdas del cubo financiero con los mismos filtros (None = se arma a partir
+            de df_filtrado_recupero)
     """
     # Importar bibliotecas necesarias
     import numpy as np
@@ -1742,7 +1972,7 @@ def mostrar_recupero(df_filtrado_recupero=None, is_development=False):
         
         # Botón de descarga - solo mostrar si df_filtrado_recupero no es None
         if df_filtrado_recupero is not None and not df_filtrado_recupero.empty:
-            csv = convert_df_to_csv(df_filtrado_recupero)
+            csv = convert_df_to_csv(formatear_cuil_cuit(df_filtrado_recupero))
             st.download_button(
                 label="⬇️ Descargar datos de recupero",
             data=csv,
@@ -1766,8 +1996,8 @@ def mostrar_recupero(df_filtrado_recupero=None, is_development=False):
         st.subheader("Análisis de Distribución de Cumplimiento de Formularios")
         st.markdown("<div class='info-box'>Para cuotas pagadas, se calcula la diferencia entre la fecha de vencimiento (FEC_CUOTA) y la fecha de pago (FEC_PAGO), donde un valor positivo indica atraso en el pago y un valor negativo refleja un pago anticipado. En el caso de cuotas vencidas no pagadas, se mide la diferencia entre la fecha de vencimiento y la fecha actual (SYSDATE), representando el atraso acumulado. Las cuotas futuras o sin vencimiento se registran como 0 para no afectar el promedio. A mayor número de días, menor es el cumplimiento del cliente, ya que valores altos señalan demoras prolongadas en los pagos.</div>", unsafe_allow_html=True)
         
-        # Crear una copia del DataFrame para trabajar con él
-        df_cumplimiento = df_filtrado_recupero.copy()
+        # Copia perezosa (copy-on-write): solo se copian las columnas que se modifican
+        df_cumplimiento = df_filtrado_recupero.copy(deep=False)
         
         # Primero asegurarse de que la columna sea numérica y eliminar nulos de PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO
         df_cumplimiento['PROMEDIO_DIAS_CUMPLIMIENTO_FORMULARIO'] = pd.to_numeric(
@@ -1998,24 +2228,28 @@ def mostrar_recupero(df_filtrado_recupero=None, is_development=False):
     # --- Nueva Sección: Tabla Agrupada de Pagados (usando datos ya filtrados) ---
     st.subheader("Detalle de Préstamos Pagados por Localidad", help="Muestra la suma de préstamos pagados, no finalizados, con planes de cuotas, por localidad")
     
-    # Filtrar solo por la categoría "Pagados" sobre el DataFrame ya filtrado
-    df_filtrado_pagados = df_filtrado_recupero[
-        (df_filtrado_recupero['CATEGORIA'] == "Pagados")
-    ].copy()
+    if cubo is None:
+        cubo = construir_cubo_bco_gente(df_filtrado_recupero)
+
+    # Filtrar solo las celdas de la categoría "Pagados" del cubo ya filtrado
+    cubo_pagados = filtrar_cubo(cubo, {'CATEGORIA': "Pagados"})
     
-    if df_filtrado_pagados.empty:
+    if cubo_pagados.empty:
         st.info("No se encontraron préstamos 'Pagados' con los filtros seleccionados.")
     else:
-        # Agrupar y agregar (usando el df_filtrado_pagados)
-        # Agrupamos por Departamento y Localidad para el desglose.
-        df_agrupado = df_filtrado_pagados.groupby(['N_DEPARTAMENTO', 'N_LOCALIDAD']).agg(
-            Cantidad_Solicitudes=('NRO_SOLICITUD', 'count'),
-            Total_Deuda_Vencida=('DEUDA_VENCIDA', 'sum'),
-            Total_Deuda_No_Vencida=('DEUDA_NO_VENCIDA', 'sum'),
-            Total_Monto_Otorgado=('MONTO_OTORGADO', 'sum'),
-            Total_Deuda_A_Recuperar=('DEUDA_A_RECUPERAR', 'sum'),
-            Total_Recuperado=('RECUPERADO', 'sum')
-        ).reset_index()
+        # Sumar las celdas por Departamento y Localidad para el desglose.
+        df_agrupado = sumar_cubo(
+            cubo_pagados,
+            ['N_DEPARTAMENTO', 'N_LOCALIDAD'],
+            ['SOLICITUDES', 'DEUDA_VENCIDA', 'DEUDA_NO_VENCIDA', 'MONTO_OTORGADO', 'DEUDA_A_RECUPERAR', 'RECUPERADO']
+        ).rename(columns={
+            'SOLICITUDES': 'Cantidad_Solicitudes',
+            'DEUDA_VENCIDA': 'Total_Deuda_Vencida',
+            'DEUDA_NO_VENCIDA': 'Total_Deuda_No_Vencida',
+            'MONTO_OTORGADO': 'Total_Monto_Otorgado',
+            'DEUDA_A_RECUPERAR': 'Total_Deuda_A_Recuperar',
+            'RECUPERADO': 'Total_Recuperado'
+        })
         
         # Formatear columnas de moneda
         currency_cols = ['Total_Deuda_Vencida', 'Total_Deuda_No_Vencida', 
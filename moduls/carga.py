@@ -10,6 +10,46 @@ import subprocess
 import sys
 import os
 import glob
+import hashlib
+import tempfile
+import threading
+import json
+import functools
+from collections import OrderedDict
+from utils.data_cleaning import optimizar_tipos_numericos, normalizar_fechas, normalizar_coordenadas, codificar_cuil_cuit
+
+# Carpeta donde se guardan las copias locales (snapshot) de los archivos parquet
+SNAPSHOT_DIR = os.environ.get('REPORTE_SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), 'reporte_gob_snapshot'))
+
+# Columnas por las que se agrupan físicamente las filas del snapshot
+COLUMNAS_TERRITORIALES = ['N_DEPARTAMENTO', 'N_LOCALIDAD']
+
+# Filas por row group: grupos chicos permiten descartar más bloques por estadísticas
+FILAS_POR_ROW_GROUP = 16384
+
+# Clave primaria de las tablas que se actualizan de forma incremental
+CLAVES_PRIMARIAS = {
+    'VT_NOMINA_REP_RECUPERO_X_ANIO.parquet': ['NRO_SOLICITUD'],
+    'VT_REPORTES_PPP_MAS26.parquet': ['ID_FICHA'],
+    'VT_INSCRIPCIONES_PRG129.parquet': ['CUIL', 'ID_CERTIFICACION'],
+}
+
+# Código del que dependen todas las tablas materializadas (HECHOS_*), además del
+# módulo que define cada constructor (ver version_codigo)
+CARPETA_UTILS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'utils')
+
+# Columna auxiliar con el hash de la clave primaria de cada fila
+_COLUMNA_CLAVE_DELTA = '__CLAVE_DELTA'
+
+# Última versión preprocesada de cada tabla incremental (compartida entre sesiones).
+# Costo en memoria por tabla: la tabla preprocesada (el mismo objeto que devuelve
+# preprocesar_incremental, así que no se duplica mientras el caché de Streamlit la
+# retenga; si el caché la descarta, la copia queda solo acá) más dos hashes de 8 bytes
+# por fila. Se conservan a lo sumo ESTADOS_INCREMENTALES_MAXIMOS tablas (se descarta
+# la usada hace más tiempo)
+ESTADOS_INCREMENTALES_MAXIMOS = int(os.environ.get('REPORTE_ESTADOS_INCREMENTALES', '3'))
+_estado_incremental = OrderedDict()
+_lock_incremental = threading.Lock()
 
 def obtener_archivo_gitlab(repo_id, file_path, branch='main', token=None):
     """Obtiene un archivo de GitLab"""
@@ -89,6 +129,67 @@ def obtener_lista_archivos(repo_id, branch='main', token=None):
     
     return []
 
+@st.cache_data(ttl=600, show_spinner=False)
+def obtener_fechas_commit(repo_id, archivos, branch='main', token=None):
+    """
+    Obtiene la fecha del último commit de cada archivo con una sola consulta GraphQL.
+
+    Cada archivo se pide como un alias de `tree(path:)` dentro de la misma consulta,
+    de modo que la frescura de todos los archivos cuesta una única llamada a la API.
+    El resultado se cachea por 10 minutos.
+
+    Args:
+        repo_id: Ruta completa del proyecto en GitLab (ej: grupo/proyecto)
+        archivos: Tupla con las rutas de los archivos dentro del repositorio
+        branch: Rama del repositorio
+        token: Token de GitLab
+
+    Returns:
+        Diccionario {ruta: datetime (UTC, sin zona horaria)}. Vacío si la consulta falla.
+    """
+    if not token or not archivos:
+        return {}
+
+    variables = {'fullPath': str(repo_id), 'ref': branch}
+    declaraciones = ['$fullPath: ID!', '$ref: String!']
+    campos = []
+    for i, archivo in enumerate(archivos):
+        variables[f"p{i}"] = archivo
+        declaraciones.append(f"$p{i}: String")
+        campos.append(f"f{i}: tree(path: $p{i}, ref: $ref) {{ lastCommit {{ committedDate }} }}")
+
+    consulta = (
+        f"query({', '.join(declaraciones)}) {{ project(fullPath: $fullPath) {{ repository {{ "
+        + " ".join(campos)
+        + " } } }"
+    )
+
+    try:
+        response = requests.post(
+            'https://gitlab.com/api/graphql',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'query': consulta, 'variables': variables},
+            timeout=30
+        )
+        if response.status_code != 200:
+            return {}
+        proyecto = (response.json().get('data') or {}).get('project') or {}
+        repositorio = proyecto.get('repository') or {}
+    except Exception:
+        return {}
+
+    fechas = {}
+    for i, archivo in enumerate(archivos):
+        commit = (repositorio.get(f"f{i}") or {}).get('lastCommit') or {}
+        fecha = commit.get('committedDate')
+        if fecha:
+            # Guardar en UTC sin zona, como espera show_last_update
+            marca = pd.Timestamp(fecha)
+            if marca.tzinfo is not None:
+                marca = marca.tz_convert('UTC').tz_localize(None)
+            fechas[archivo] = marca.to_pydatetime()
+    return fechas
+
 def convert_numpy_types(df):
     """
     Convierte tipos de datos numpy a tipos Python nativos en un DataFrame.
@@ -245,20 +346,387 @@ def safe_read_parquet(file_path_or_buffer, is_buffer=False):
                 else:
                     raise
         
-        # Procesar columnas de fecha para manejar casos extremos
-        for col in df.columns:
-            if pd.api.types.is_datetime64_any_dtype(df[col]):
-                # Convertir fechas extremas a objetos datetime de Python
-                try:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                except:
-                    # Si falla, convertir a strings
-                    df[col] = df[col].astype(str)
+        # Las columnas de fecha se normalizan una sola vez en normalizar_tipos()
         
         return df, None  # Devolver el DataFrame y None como mensaje de error
     except Exception as e:
         return None, str(e)  # Devolver None como DataFrame y el mensaje de error
 
+def calcular_version(contenido, es_buffer=False):
+    """
+    Calcula un identificador de versión a partir del contenido de un archivo.
+
+    Args:
+        contenido: Ruta local (si es_buffer=False) o buffer de bytes (si es_buffer=True)
+        es_buffer: True si el contenido es un buffer de bytes
+
+    Returns:
+        Hash hexadecimal (16 caracteres) del contenido
+    """
+    hasher = hashlib.sha1()
+    if es_buffer:
+        hasher.update(contenido)
+    else:
+        with open(contenido, 'rb') as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(bloque)
+    return hasher.hexdigest()[:16]
+
+def _ruta_snapshot(nombre, version):
+    """Devuelve la ruta del snapshot parquet de un archivo para una versión dada."""
+    base = os.path.splitext(nombre)[0]
+    return os.path.join(SNAPSHOT_DIR, f"{base}-{version}.parquet")
+
+def guardar_snapshot_parquet(nombre, df):
+    """
+    Guarda una copia local del DataFrame ordenada por departamento y localidad,
+    escrita con estadísticas por row group para poder filtrar sin leer todo el archivo.
+
+    Solo aplica a tablas que tienen N_DEPARTAMENTO. Si ya existe un snapshot para la
+    misma versión no se vuelve a escribir.
+
+    Args:
+        nombre: Nombre del archivo original (ej: VT_REPORTES_PPP_MAS26.parquet)
+        df: DataFrame cargado (con df.attrs['version'])
+
+    Returns:
+        Ruta del snapshot o None si no se pudo/no corresponde guardarlo
+    """
+    version = df.attrs.get('version') if df is not None else None
+    if version is None or df.empty or 'N_DEPARTAMENTO' not in df.columns:
+        return None
+
+    ruta = _ruta_snapshot(nombre, version)
+    if os.path.exists(ruta):
+        return ruta
+
+    try:
+        import pyarrow as pa
+
+        columnas_orden = [c for c in COLUMNAS_TERRITORIALES if c in df.columns]
+        df_ordenado = df.sort_values(columnas_orden, na_position='last', kind='stable')
+        tabla = pa.Table.from_pandas(df_ordenado, preserve_index=False)
+        _escribir_snapshot(nombre, ruta, tabla, write_statistics=columnas_orden)
+        return ruta
+    except Exception:
+        # El snapshot es una optimización: si falla, se sigue trabajando con el DataFrame en memoria
+        return None
+
+def _escribir_snapshot(nombre, ruta, tabla, **opciones):
+    """
+    Escribe una tabla pyarrow en el directorio de snapshots y elimina las versiones
+    anteriores del mismo nombre.
+
+    Se escribe en un temporal y se renombra para que otra sesión nunca lea un
+    archivo a medio escribir.
+    """
+    import pyarrow.parquet as pq
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    ruta_tmp = f"{ruta}.{os.getpid()}.tmp"
+    pq.write_table(tabla, ruta_tmp, row_group_size=FILAS_POR_ROW_GROUP, **opciones)
+    os.replace(ruta_tmp, ruta)
+
+    # Eliminar snapshots de versiones anteriores del mismo archivo
+    base = os.path.splitext(nombre)[0]
+    for anterior in glob.glob(os.path.join(SNAPSHOT_DIR, f"{glob.escape(base)}-*.parquet")):
+        if anterior != ruta:
+            try:
+                os.remove(anterior)
+            except OSError:
+                pass
+
+@functools.lru_cache(maxsize=None)
+def _hash_fuentes(rutas):
+    """Devuelve un hash corto del contenido de una tupla de archivos fuente."""
+    hasher = hashlib.sha1()
+    for ruta in rutas:
+        hasher.update(os.path.basename(ruta).encode())
+        try:
+            with open(ruta, 'rb') as f:
+                hasher.update(f.read())
+        except OSError:
+            hasher.update(b'ausente')
+    return hasher.hexdigest()[:8]
+
+def version_codigo(construir):
+    """
+    Devuelve la versión del código que arma una tabla materializada: un hash del
+    módulo que define `construir`, de este módulo y de utils/.
+
+    Así un despliegue que cambia la lógica de construcción invalida las tablas
+    persistidas sin tener que incrementar una constante a mano.
+
+    Args:
+        construir: Función que arma la tabla
+
+    Returns:
+        Hash hexadecimal corto
+    """
+    modulo = sys.modules.get(getattr(construir, '__module__', None))
+    rutas = [getattr(modulo, '__file__', None), os.path.abspath(__file__)]
+    rutas += sorted(glob.glob(os.path.join(CARPETA_UTILS, '*.py')))
+    return _hash_fuentes(tuple(ruta for ruta in rutas if ruta))
+
+def _ruta_tabla(nombre, version, construir):
+    """Devuelve la ruta de una tabla materializada para la versión de datos y de código."""
+    return _ruta_snapshot(nombre, f"{version}-c{version_codigo(construir)}")
+
+def materializar_tabla(nombre, version, construir, con_avisos=False):
+    """
+    Devuelve la tabla de hechos de un módulo (ya cruzada con sus dimensiones) para
+    una versión del dataset, construyéndola y persistiéndola en el snapshot local
+    solo si todavía no existe.
+
+    Así, tras reiniciar la aplicación, los cruces no se recalculan mientras los
+    archivos de origen ni el código que los arma (version_codigo) cambien. El orden
+    de las filas se conserva.
+
+    Args:
+        nombre: Nombre de la tabla materializada (ej: HECHOS_BCO_GENTE_NOMINA)
+        version: Versión del dataset del que se deriva la tabla
+        construir: Función sin argumentos que arma la tabla si no está materializada
+        con_avisos: Si es True, `construir` devuelve (tabla, avisos), con avisos una lista
+            de pares (nivel, mensaje); los avisos se guardan junto a la tabla y se
+            devuelven también al leerla, para mostrarlos fuera del constructor
+
+    Returns:
+        DataFrame de la tabla de hechos (compartido, de solo lectura), o la tupla
+        (DataFrame, avisos) si con_avisos es True
+    """
+    ruta = _ruta_tabla(nombre, version, construir)
+    if os.path.exists(ruta):
+        try:
+            import pyarrow.parquet as pq
+            df = pd.read_parquet(ruta)
+            if not con_avisos:
+                return df
+            metadatos = pq.read_schema(ruta).metadata or {}
+            return df, [tuple(aviso) for aviso in json.loads(metadatos.get(b'avisos', b'[]'))]
+        except Exception:
+            pass
+
+    if con_avisos:
+        df, avisos = construir()
+    else:
+        df, avisos = construir(), []
+    if isinstance(df, pd.DataFrame) and not isinstance(df, gpd.GeoDataFrame) and not df.empty:
+        try:
+            import pyarrow as pa
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if avisos:
+                metadatos = dict(tabla.schema.metadata or {})
+                metadatos[b'avisos'] = json.dumps(avisos).encode()
+                tabla = tabla.replace_schema_metadata(metadatos)
+            _escribir_snapshot(nombre, ruta, tabla)
+        except Exception:
+            # Columnas con tipos mixtos u otros errores: se sigue con la tabla en memoria
+            pass
+    return (df, avisos) if con_avisos else df
+
+def leer_parquet_territorio(nombre, version, departamento=None, localidad=None, columnas=None, construir=None):
+    """
+    Lee del snapshot local solo las filas de un departamento y/o localidad.
+
+    Usa pyarrow.dataset con un filtro sobre N_DEPARTAMENTO/N_LOCALIDAD, de modo que
+    los row groups cuyas estadísticas no contienen el valor buscado no se leen.
+
+    Args:
+        nombre: Nombre del archivo original, o de la tabla materializada si se indica `construir`
+        version: Versión del archivo (df.attrs['version'] del DataFrame cargado) o la
+            usada al materializar la tabla
+        departamento: Departamento a leer (None para no filtrar)
+        localidad: Localidad a leer (None para no filtrar)
+        columnas: Lista de columnas a leer (None para todas)
+        construir: Si se indica, se lee la tabla ya preprocesada por
+            materializar_tabla(nombre, version, construir) en lugar del archivo original
+            (basta una función del mismo módulo que el constructor, ver version_codigo)
+
+    Returns:
+        DataFrame con las filas del territorio o None si no hay snapshot disponible
+    """
+    if version is None:
+        return None
+    ruta = _ruta_snapshot(nombre, version) if construir is None else _ruta_tabla(nombre, version, construir)
+    if not os.path.exists(ruta):
+        return None
+
+    try:
+        import pyarrow.dataset as ds
+
+        filtro = None
+        if departamento is not None:
+            filtro = ds.field('N_DEPARTAMENTO') == departamento
+        if localidad is not None:
+            filtro_loc = ds.field('N_LOCALIDAD') == localidad
+            filtro = filtro_loc if filtro is None else filtro & filtro_loc
+
+        dataset = ds.dataset(ruta, format='parquet')
+        return dataset.to_table(columns=columnas, filter=filtro).to_pandas()
+    except Exception:
+        return None
+
+def version_dataset(data, nombres):
+    """
+    Combina las versiones de varios archivos en un único identificador.
+
+    Args:
+        data: Diccionario de DataFrames cargados
+        nombres: Lista de nombres de archivo que componen el dataset
+
+    Returns:
+        Hash hexadecimal que cambia si cambia cualquiera de los archivos
+    """
+    hasher = hashlib.sha1()
+    for nombre in sorted(nombres):
+        df = data.get(nombre) if data is not None else None
+        if df is None:
+            version = 'ausente'
+        else:
+            version = df.attrs.get('version')
+            if version is None:
+                # DataFrame que no pasó por el cargador: versionar por contenido
+                version = str(pd.util.hash_pandas_object(df, index=False).sum()) if isinstance(df, pd.DataFrame) else str(id(df))
+        hasher.update(f"{nombre}={version};".encode())
+    return hasher.hexdigest()[:16]
+
+def preprocesar_incremental(nombre, df, preprocesar, dependencias=None):
+    """
+    Devuelve preprocesar(df) reprocesando solo las filas que cambiaron desde la última carga.
+
+    Compara la tabla nueva con la versión anterior usando la clave primaria
+    (CLAVES_PRIMARIAS) y un hash del contenido de cada fila. Las filas eliminadas
+    y modificadas se quitan de la tabla preprocesada anterior y solo las filas
+    insertadas o modificadas pasan por `preprocesar`.
+
+    `preprocesar` debe transformar cada fila de forma independiente (filtros,
+    columnas calculadas, cruces por clave) y conservar las columnas de entrada.
+    Si no hay clave primaria, la clave tiene duplicados, cambian las columnas o
+    cambian las dependencias, se preprocesa la tabla completa. El resultado tiene
+    las filas en el orden de `df` y con sus etiquetas de índice, igual que preprocesar(df).
+
+    Args:
+        nombre: Nombre del archivo (clave en CLAVES_PRIMARIAS)
+        df: DataFrame crudo recién cargado
+        preprocesar: Función DataFrame -> DataFrame preprocesado
+        dependencias: Valor que identifica las otras tablas usadas por `preprocesar`
+            (por ejemplo la versión de la tabla de localidades)
+
+    Returns:
+        DataFrame preprocesado. Es compartido entre sesiones: no debe modificarse.
+    """
+    claves = CLAVES_PRIMARIAS.get(nombre)
+    if df is None or df.empty or not claves or any(c not in df.columns for c in claves):
+        return preprocesar(df)
+
+    clave_estado = (nombre, f"{preprocesar.__module__}.{preprocesar.__qualname__}")
+    version = df.attrs.get('version')
+    with _lock_incremental:
+        anterior = _estado_incremental.get(clave_estado)
+        if anterior is not None:
+            _estado_incremental.move_to_end(clave_estado)
+
+    # Misma versión y mismas dependencias: nada que recalcular
+    if anterior is not None and version is not None and anterior['version'] == version and anterior['dependencias'] == dependencias:
+        return anterior['tabla']
+
+    try:
+        hash_clave = pd.util.hash_pandas_object(df[claves], index=False).to_numpy()
+        if pd.Index(hash_clave).has_duplicates:
+            return preprocesar(df)
+        hash_fila = pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy(), index=hash_clave)
+    except Exception:
+        return preprocesar(df)
+
+    def _preprocesar_con_clave(df_filas, claves_filas):
+        resultado = preprocesar(df_filas.assign(**{_COLUMNA_CLAVE_DELTA: claves_filas}))
+        return resultado.drop(columns=[_COLUMNA_CLAVE_DELTA]), resultado[_COLUMNA_CLAVE_DELTA].to_numpy()
+
+    reutilizable = (
+        anterior is not None
+        and anterior['dependencias'] == dependencias
+        and anterior['columnas'] == list(df.columns)
+    )
+
+    if not reutilizable:
+        tabla, claves_tabla = _preprocesar_con_clave(df, hash_clave)
+    else:
+        hash_anterior = anterior['hash_fila']
+        comunes = hash_fila.index.intersection(hash_anterior.index)
+        modificadas = comunes[hash_fila.loc[comunes].to_numpy() != hash_anterior.loc[comunes].to_numpy()]
+        insertadas = hash_fila.index.difference(hash_anterior.index)
+        eliminadas = hash_anterior.index.difference(hash_fila.index)
+
+        if len(modificadas) == 0 and len(insertadas) == 0 and len(eliminadas) == 0:
+            tabla, claves_tabla = anterior['tabla'], anterior['claves_tabla']
+        else:
+            # Quitar de la tabla anterior las filas eliminadas o modificadas
+            conservar = ~np.isin(anterior['claves_tabla'], modificadas.append(eliminadas).to_numpy())
+            # Preprocesar solo las filas nuevas o modificadas
+            cambiadas = np.isin(hash_clave, modificadas.append(insertadas).to_numpy())
+            tabla_delta, claves_delta = _preprocesar_con_clave(df[cambiadas], hash_clave[cambiadas])
+            tabla = pd.concat([anterior['tabla'][conservar], tabla_delta], ignore_index=True)
+            claves_tabla = np.concatenate([anterior['claves_tabla'][conservar], claves_delta])
+
+            # Restaurar el orden (y las etiquetas del índice) de la tabla nueva: las filas
+            # insertadas o modificadas quedaron al final. El orden estable respeta varias
+            # filas de salida por clave
+            posicion = pd.Index(hash_clave).get_indexer(claves_tabla)
+            orden = np.argsort(posicion, kind='stable')
+            tabla = tabla.take(orden)
+            tabla.index = df.index[posicion[orden]]
+            claves_tabla = claves_tabla[orden]
+
+    with _lock_incremental:
+        _estado_incremental[clave_estado] = {
+            'version': version,
+            'dependencias': dependencias,
+            'columnas': list(df.columns),
+            'hash_fila': hash_fila,
+            'tabla': tabla,
+            'claves_tabla': claves_tabla,
+        }
+        _estado_incremental.move_to_end(clave_estado)
+        while len(_estado_incremental) > ESTADOS_INCREMENTALES_MAXIMOS:
+            _estado_incremental.popitem(last=False)
+    return tabla
+
+def normalizar_tipos(df):
+    """
+    Etapa de normalización que se aplica una sola vez a cada tabla al cargarla,
+    para que los módulos trabajen siempre con tipos ya resueltos (CUIL/CUIT
+    quedan como claves enteras Int64).
+
+    La cantidad de filas con coordenadas descartadas queda en
+    df.attrs['coordenadas_rechazadas'].
+
+    Args:
+        df: DataFrame recién cargado
+
+    Returns:
+        DataFrame con los tipos normalizados (conserva df.attrs)
+    """
+    if not isinstance(df, pd.DataFrame) or isinstance(df, gpd.GeoDataFrame):
+        return df
+    df = optimizar_tipos_numericos(df)
+    df = codificar_cuil_cuit(df)
+    df = normalizar_fechas(df)
+    df, rechazadas = normalizar_coordenadas(df)
+    df.attrs['coordenadas_rechazadas'] = rechazadas
+    return df
+
+def informar_coordenadas_rechazadas(nombre, df):
+    """
+    Avisa cuántas filas de un archivo tenían coordenadas inválidas.
+
+    Args:
+        nombre: Nombre del archivo
+        df: DataFrame ya normalizado con normalizar_tipos
+    """
+    rechazadas = df.attrs.get('coordenadas_rechazadas', 0) if isinstance(df, pd.DataFrame) else 0
+    if rechazadas:
+        st.warning(f"{nombre}: {rechazadas} filas con LATITUD/LONGITUD inválidas quedaron sin coordenadas.")
+
 def procesar_archivo(nombre, contenido, es_buffer=False, header='infer'):
     """
     Procesa un archivo (local o buffer) y devuelve el DataFrame y la fecha de modificación.
@@ -359,6 +827,12 @@ def load_data_from_gitlab(repo_id, branch='main', token=None, use_local=False, l
                     nombre = os.path.basename(archivo_path)
                     df, fecha = procesar_archivo(nombre, archivo_path, es_buffer=False)
                     if df is not None:
+                        df = normalizar_tipos(df)
+                        informar_coordenadas_rechazadas(nombre, df)
+                        df.attrs['version'] = calcular_version(archivo_path)
+                        df.attrs['fecha'] = fecha
+                        if nombre.endswith('.parquet'):
+                            guardar_snapshot_parquet(nombre, df)
                         all_data[nombre] = df
                         all_dates[nombre] = fecha
 
@@ -390,6 +864,9 @@ def load_data_from_gitlab(repo_id, branch='main', token=None, use_local=False, l
             extensiones = ['.parquet', '.csv', '.geojson', '.txt', '.xlsx']
             archivos_filtrados = [a for a in archivos if any(a.endswith(ext) for ext in extensiones)]
             
+            # Fecha del último commit de todos los archivos en una sola consulta
+            fechas_commit = obtener_fechas_commit(repo_id, tuple(archivos_filtrados), branch, token)
+            
             # Barra de progreso
             progress = st.progress(0)
             total = len(archivos_filtrados)
@@ -409,6 +886,14 @@ def load_data_from_gitlab(repo_id, branch='main', token=None, use_local=False, l
                     nombre = archivo.split('/')[-1]
                     df, fecha = procesar_archivo(nombre, contenido, es_buffer=True)
                     if df is not None:
+                        # Usar la fecha del último commit en lugar de la hora de descarga
+                        fecha = fechas_commit.get(archivo, fecha)
+                        df = normalizar_tipos(df)
+                        informar_coordenadas_rechazadas(nombre, df)
+                        df.attrs['version'] = calcular_version(contenido, es_buffer=True)
+                        df.attrs['fecha'] = fecha
+                        if nombre.endswith('.parquet'):
+                            guardar_snapshot_parquet(nombre, df)
                         all_data[nombre] = df
                         all_dates[nombre] = fecha
 
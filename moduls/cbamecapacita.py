@@ -4,7 +4,11 @@ import plotly.express as px
 import plotly.graph_objects as go
 import altair as alt
 from utils.ui_components import display_kpi_row
-from utils.data_cleaning import clean_thousand_separator, convert_decimal_separator
+from utils.data_cleaning import clean_thousand_separator, convert_decimal_separator, calcular_edad, rango_edad
+from utils.territorio import adjuntar_territorio
+from utils.filtros import OpcionesFiltros, opciones_filtros
+from utils.conteo_distinto import ConteoDistinto
+from moduls.carga import preprocesar_incremental, version_dataset, materializar_tabla
 import geopandas as gpd
 import json
 
@@ -56,124 +60,199 @@ def create_cbamecapacita_kpi(resultados):
     ]
     return kpis
 
+def _preprocesar_postulantes(df_postulantes):
+    """
+    Aplica las transformaciones fila a fila de las postulaciones
+    (VT_INSCRIPCIONES_PRG129): normaliza departamento, agrega ZONA, corrige
+    localidades de CAPITAL y tipa ID_CERTIFICACION como entero.
+
+    Args:
+        df_postulantes: DataFrame crudo de postulaciones
+
+    Returns:
+        DataFrame preprocesado (nuevo, no modifica el original)
+    """
+    # Copia superficial: solo se asignan columnas completas, así que la tabla de origen
+    # no cambia aunque copy-on-write esté desactivado
+    df_postulantes = df_postulantes.copy(deep=False)
+
+    # --- Tratamiento de N_DEPARTAMENTO y ZONA (dimensión territorial compartida) ---
+    # Los departamentos no válidos pasan a 'OTROS' y CAPITAL se corrige a la localidad 'CORDOBA'
+    df_postulantes = adjuntar_territorio(df_postulantes)
+
+    # Asegurar que ID_CERTIFICACION sea entero
+    if 'ID_CERTIFICACION' in df_postulantes.columns:
+        df_postulantes['ID_CERTIFICACION'] = pd.to_numeric(df_postulantes['ID_CERTIFICACION'], errors='coerce').fillna(0).astype(int)
+
+    return df_postulantes
+
+# Archivos que componen el dataset de CBA ME CAPACITA
+ARCHIVOS_CBA_CAPACITA = [
+    'VT_INSCRIPCIONES_PRG129.parquet',
+    'VT_CURSOS_SEDES_GEO.parquet',
+    'VT_ALUMNOS_EN_CURSOS.parquet'
+]
+
+# Rangos de ocupación de cursos (20 alumnos = 100%)
+ALUMNOS_CUPO_COMPLETO = 20
+CATEGORIAS_OCUPACION = ['Baja (0-25%)', 'Media-Baja (25-50%)', 'Media-Alta (50-75%)', 'Alta (75-100%)']
+
+# Dimensiones del conteo de postulantes distintos (CUIL): las de los filtros de la pestaña
+DIMENSIONES_POSTULANTES = ['N_DEPARTAMENTO', 'N_LOCALIDAD']
+
 def load_and_preprocess_data(data):
     """
     Carga y preprocesa los datos principales del dashboard CBA ME CAPACITA.
-    - Limpia separadores de miles en columnas numéricas.
-    - Devuelve los DataFrames listos para usar.
+
+    El cálculo se cachea por versión del dataset (ver _calcular_datos_capacita).
+
+    Args:
+        data: Diccionario (o lista) de DataFrames cargados
+
+    Returns:
+        tuple: (df_postulantes, df_alumnos, df_cursos), compartidos y de solo lectura
     """
-    # Cargar DataFrames principales
-    df_postulantes = None
-    df_cursos = None
-    df_alumnos = None
-    if isinstance(data, dict):
-        df_postulantes = data.get("VT_INSCRIPCIONES_PRG129.parquet")
-        df_cursos = data.get("VT_CURSOS_SEDES_GEO.parquet")
-        df_alumnos = data.get("VT_ALUMNOS_EN_CURSOS.parquet")
-    elif isinstance(data, list):
+    if isinstance(data, list):
+        # Identificar los DataFrames por sus columnas
+        data_dict = {}
         for df in data:
             if "CUIL" in df.columns:
-                df_postulantes = df
+                data_dict["VT_INSCRIPCIONES_PRG129.parquet"] = df
             if "ID_PLANIFICACION" in df.columns and "N_CURSO" in df.columns:
-                df_cursos = df
-    # Limpieza de separador de miles en ambos DataFrames
-    #df_postulantes = clean_thousand_separator(df_postulantes)
-    #df_cursos = clean_thousand_separator(df_cursos)
-
-    # --- Tratamiento de N_DEPARTAMENTO y ZONA ---
-    if df_postulantes is not None and 'N_DEPARTAMENTO' in df_postulantes.columns:
-        departamentos_validos = [
-            "CAPITAL", "CALAMUCHITA", "COLON", "CRUZ DEL EJE", "GENERAL ROCA", "GENERAL SAN MARTIN",
-            "ISCHILIN", "JUAREZ CELMAN", "MARCOS JUAREZ", "MINAS", "POCHO", "PRESIDENTE ROQUE SAENZ PEÑA",
-            "PUNILLA", "RIO CUARTO", "RIO PRIMERO", "RIO SECO", "RIO SEGUNDO", "SAN ALBERTO", "SAN JAVIER",
-            "SAN JUSTO", "SANTA MARIA", "SOBREMONTE", "TERCERO ARRIBA", "TOTORAL", "TULUMBA", "UNION"
-        ]
-        # Normalizar N_DEPARTAMENTO: los que no estén en la lista pasan a 'OTROS'
-        df_postulantes['N_DEPARTAMENTO'] = df_postulantes['N_DEPARTAMENTO'].where(
-            df_postulantes['N_DEPARTAMENTO'].isin(departamentos_validos), 'OTROS'
-        )
+                data_dict["VT_CURSOS_SEDES_GEO.parquet"] = df
+        data = data_dict
+    elif not isinstance(data, dict):
+        return None, None, None
+
+    version = version_dataset(data, ARCHIVOS_CBA_CAPACITA)
+    # Las edades se calculan a la fecha del día: la fecha forma parte de la clave del caché
+    return _calcular_datos_capacita(version, pd.Timestamp.today().normalize(), data)
+
+@st.cache_resource(show_spinner="Cargando y procesando datos de CBA ME CAPACITA...", max_entries=4)
+def _calcular_datos_capacita(version, fecha_referencia, _data):
+    """
+    Calcula postulaciones, alumnos, no asignados y ocupación por curso.
+
+    No modifica `_data` ni sus DataFrames. El resultado se calcula una sola vez por
+    `version` y se comparte entre reruns y sesiones, por lo que es de solo lectura.
+
+    Args:
+        version: Versión del dataset (version_dataset sobre ARCHIVOS_CBA_CAPACITA), clave del caché
+        fecha_referencia: Fecha a la que se calcula la edad de los postulantes
+        _data: Diccionario de DataFrames cargados (no se usa para la clave del caché)
+
+    Returns:
+        tuple: (df_postulantes, df_alumnos, df_cursos)
+    """
+    # Limpieza de separador de miles en postulantes y cursos
+    df_postulantes = clean_thousand_separator(_data.get("VT_INSCRIPCIONES_PRG129.parquet"))
+    df_cursos = clean_thousand_separator(_data.get("VT_CURSOS_SEDES_GEO.parquet"))
+    df_alumnos = _data.get("VT_ALUMNOS_EN_CURSOS.parquet")
+
+    # --- Tratamiento de N_DEPARTAMENTO, ZONA e ID_CERTIFICACION ---
+    # Solo se reprocesan las postulaciones que cambiaron desde la última carga
+    def construir_postulantes():
+        """Normaliza territorio y certificación, y agrega la edad a la fecha de referencia."""
+        df = preprocesar_incremental('VT_INSCRIPCIONES_PRG129.parquet', df_postulantes, _preprocesar_postulantes)
+
+        # Edad exacta a la fecha de referencia y su rango
+        if 'FEC_NACIMIENTO' in df.columns:
+            edad = calcular_edad(df['FEC_NACIMIENTO'], fecha_referencia)
+            df = df.assign(EDAD=edad, RANGO_EDAD=rango_edad(edad))
+        return df
 
-        # Añadir columna de ZONA FAVORECIDA
-        zonas_favorecidas = [
-            'PRESIDENTE ROQUE SAENZ PEÑA', 'GENERAL ROCA', 'RIO SECO', 'TULUMBA', 
-            'POCHO', 'SAN JAVIER', 'SAN ALBERTO', 'MINAS', 'CRUZ DEL EJE', 
-            'TOTORAL', 'SOBREMONTE', 'ISCHILIN'
-        ]
-        df_postulantes['ZONA'] = df_postulantes['N_DEPARTAMENTO'].apply(
-            lambda x: 'ZONA NOC Y SUR' if x in zonas_favorecidas else 'ZONA REGULAR'
+    if df_postulantes is not None and not df_postulantes.empty:
+        # La edad depende de la fecha de referencia, que forma parte de la versión materializada
+        df_postulantes = materializar_tabla(
+            'HECHOS_CBA_CAPACITA_POSTULANTES',
+            f"{version}_{fecha_referencia:%Y%m%d}",
+            construir_postulantes
         )
 
-        # Corregir N_LOCALIDAD a 'CORDOBA' si el departamento es CAPITAL
-        if 'N_LOCALIDAD' in df_postulantes.columns:
-            capital_mask = df_postulantes['N_DEPARTAMENTO'] == 'CAPITAL'
-            df_postulantes.loc[capital_mask, 'N_LOCALIDAD'] = 'CORDOBA'
-
-    # Cruce solicitado: agregar CUIL de postulantes a cursos directamente en df_cursos
-    if df_cursos is not None and df_postulantes is not None:
-        # Asegurar que ID_CERTIFICACION e ID_CERTIFICACION sean enteros si existen
-        if 'ID_CERTIFICACION' in df_postulantes.columns:
-            df_postulantes['ID_CERTIFICACION'] = pd.to_numeric(df_postulantes['ID_CERTIFICACION'], errors='coerce').fillna(0).astype(int)
-        if 'ID_PLANIFICACION' in df_cursos.columns and 'ID_CERTIFICACION' in df_postulantes.columns and 'CUIL' in df_postulantes.columns:
-            # Agrupar por ID_CERTIFICACION y contar CUILs no nulos
-            cuil_count = (
-                df_postulantes.groupby('ID_CERTIFICACION')['CUIL']
-                .apply(lambda x: x.notnull().sum())
-                .reset_index()
-                .rename(columns={'CUIL': 'POSTULACIONES'})
-            )
-            df_cursos = df_cursos.merge(
-                cuil_count,
-                how='left',
-                left_on='ID_PLANIFICACION',
-                right_on='ID_CERTIFICACION'
-            )
-        if 'POSTULACIONES' in df_cursos.columns:
-            df_cursos['POSTULACIONES'] = pd.to_numeric(df_cursos['POSTULACIONES'], errors='coerce').fillna(0).astype(int)
-    if df_alumnos is not None and df_cursos is not None:
-        if 'ID_ALUMNO' in df_alumnos.columns and 'ID_PLANIFICACION' in df_alumnos.columns:
-            # Debug: Ver valores únicos en ID_PLANIFICACION
-            print(f"Valores únicos en ID_PLANIFICACION de df_alumnos: {df_alumnos['ID_PLANIFICACION'].nunique()}")
-
-            alumnos_count = (
-                df_alumnos.groupby('ID_PLANIFICACION')['ID_ALUMNO']
-                .apply(lambda x: x.notnull().sum())
-                .reset_index()
-                .rename(columns={'ID_ALUMNO': 'ALUMNOS'})
-            )
-            # Debug: Ver el resultado del conteo
-            print(f"Total de grupos en alumnos_count: {len(alumnos_count)}")
-
-            df_cursos = df_cursos.merge(
-                alumnos_count,
-                how='left',
-                left_on='ID_PLANIFICACION',
-                right_on='ID_PLANIFICACION'
-            )
+    def construir_cursos():
+        """Cruza cursos con postulaciones y alumnos, y calcula la ocupación."""
+        df_cursos = df_cursos_raw
+        # Cruce solicitado: agregar a cursos la cantidad de CUIL postulados
+        if df_cursos is not None and df_postulantes is not None:
+            if 'ID_PLANIFICACION' in df_cursos.columns and 'ID_CERTIFICACION' in df_postulantes.columns and 'CUIL' in df_postulantes.columns:
+                # count() cuenta los CUIL no nulos de cada certificación
+                cuil_count = (
+                    df_postulantes.groupby('ID_CERTIFICACION')['CUIL']
+                    .count()
+                    .rename('POSTULACIONES')
+                    .reset_index()
+                )
+                df_cursos = df_cursos.merge(
+                    cuil_count,
+                    how='left',
+                    left_on='ID_PLANIFICACION',
+                    right_on='ID_CERTIFICACION'
+                )
+            if 'POSTULACIONES' in df_cursos.columns:
+                df_cursos['POSTULACIONES'] = pd.to_numeric(df_cursos['POSTULACIONES'], errors='coerce').fillna(0).astype(int)
 
-        if 'ALUMNOS' in df_cursos.columns:
-            df_cursos['ALUMNOS'] = pd.to_numeric(df_cursos['ALUMNOS'], errors='coerce').fillna(0).astype(int)
-            # Debug: Confirmar que ALUMNOS está en df_cursos
-            print(f"Columna ALUMNOS en df_cursos: {df_cursos['ALUMNOS'].sum()} alumnos en total")
-        else:
-            print("ADVERTENCIA: La columna ALUMNOS no se agregó a df_cursos")
+        if df_alumnos is not None and df_cursos is not None:
+            if 'ID_ALUMNO' in df_alumnos.columns and 'ID_PLANIFICACION' in df_alumnos.columns:
+                alumnos_count = (
+                    df_alumnos.groupby('ID_PLANIFICACION')['ID_ALUMNO']
+                    .count()
+                    .rename('ALUMNOS')
+                    .reset_index()
+                )
+                df_cursos = df_cursos.merge(alumnos_count, how='left', on='ID_PLANIFICACION')
+
+            if 'ALUMNOS' in df_cursos.columns:
+                df_cursos['ALUMNOS'] = pd.to_numeric(df_cursos['ALUMNOS'], errors='coerce').fillna(0).astype(int)
+
+        if df_cursos is not None:
+            # Columna "No asignados": diferencia entre POSTULACIONES y ALUMNOS, sin negativos
+            # (puede haber inconsistencias en los datos)
+            if 'POSTULACIONES' in df_cursos.columns and 'ALUMNOS' in df_cursos.columns:
+                df_cursos['No asignados'] = (df_cursos['POSTULACIONES'] - df_cursos['ALUMNOS']).clip(lower=0)
+
+            # Porcentaje y categoría de ocupación (20 alumnos = 100%)
+            if 'ALUMNOS' in df_cursos.columns:
+                df_cursos['Porcentaje_Ocupacion'] = (df_cursos['ALUMNOS'] / ALUMNOS_CUPO_COMPLETO * 100).clip(upper=100)
+                df_cursos['Categoria_Ocupacion'] = pd.cut(
+                    df_cursos['Porcentaje_Ocupacion'],
+                    bins=[0, 25, 50, 75, 100],
+                    labels=CATEGORIAS_OCUPACION,
+                    include_lowest=True,
+                    right=True  # Asegura que 75 esté en la categoría 'Alta'
+                )
+
+            # Rangos de postulantes (de 20 en 20)
+            if 'POSTULACIONES' in df_cursos.columns and not df_cursos.empty:
+                limites = list(range(0, int(df_cursos['POSTULACIONES'].max()) + 21, 20))
+                df_cursos['Rango_Postulantes'] = pd.cut(
+                    df_cursos['POSTULACIONES'],
+                    bins=limites,
+                    labels=[f'{i}-{i+19}' for i in limites[:-1]],
+                    right=False
+                )
+        return df_cursos
+
+    # Tabla de hechos de cursos, materializada en el snapshot local por versión
+    df_cursos_raw = df_cursos
+    if df_cursos is not None and not df_cursos.empty:
+        df_cursos = materializar_tabla('HECHOS_CBA_CAPACITA_CURSOS', version, construir_cursos)
 
-    # Debug: Verificar columnas finales
-    if df_cursos is not None:
-        print(f"Columnas en df_cursos: {df_cursos.columns.tolist()}")
-        if 'ALUMNOS' in df_cursos.columns:
-            print(f"Estadísticas de ALUMNOS: Min={df_cursos['ALUMNOS'].min()}, Max={df_cursos['ALUMNOS'].max()}, Media={df_cursos['ALUMNOS'].mean():.2f}")
-        
-        # Añadir columna "No asignados" como la diferencia entre POSTULACIONES y ALUMNOS
-        if 'POSTULACIONES' in df_cursos.columns and 'ALUMNOS' in df_cursos.columns:
-            df_cursos['No asignados'] = df_cursos['POSTULACIONES'] - df_cursos['ALUMNOS']
-            # Asegurar que no haya valores negativos (en caso de inconsistencias en los datos)
-            df_cursos['No asignados'] = df_cursos['No asignados'].apply(lambda x: max(0, x))
-            print(f"Columna 'No asignados' creada: Min={df_cursos['No asignados'].min()}, Max={df_cursos['No asignados'].max()}, Total={df_cursos['No asignados'].sum()}")
-        else:
-            print("ADVERTENCIA: No se pudo crear la columna 'No asignados' porque faltan las columnas POSTULACIONES o ALUMNOS")
-            
     return df_postulantes, df_alumnos, df_cursos
 
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _conteo_postulantes(version, _df_postulantes):
+    """
+    Construye el conteo de CUIL distintos de postulantes una vez por versión.
+
+    Args:
+        version: Versión del dataset (version_dataset sobre ARCHIVOS_CBA_CAPACITA), clave del caché
+        _df_postulantes: DataFrame de postulaciones (no se hashea)
+
+    Returns:
+        ConteoDistinto compartido, de solo lectura
+    """
+    return ConteoDistinto(_df_postulantes, 'CUIL', DIMENSIONES_POSTULANTES)
+
 def show_cba_capacita_dashboard(data, dates, is_development=False):
     """
     Muestra el dashboard de CBA ME CAPACITA.
@@ -202,8 +281,14 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
     # KPIs reales usando VT_INSCRIPCIONES_PRG129.parquet (postulantes) y VT_CURSOS_SEDES_GEO.parquet (cursos)
     # Asegurarse de que los DataFrames existen y tienen las columnas necesarias
     total_postulantes = 0
+    conteo_postulantes = None
     if df_postulantes is not None and "CUIL" in df_postulantes.columns:
-        total_postulantes = df_postulantes["CUIL"].dropna().nunique()
+        # CUIL distintos por departamento y localidad, para contar postulantes con cualquier filtro
+        if isinstance(data, dict):
+            conteo_postulantes = _conteo_postulantes(version_dataset(data, ARCHIVOS_CBA_CAPACITA), df_postulantes)
+        else:
+            conteo_postulantes = ConteoDistinto(df_postulantes, 'CUIL', DIMENSIONES_POSTULANTES)
+        total_postulantes = conteo_postulantes.contar()
         
     total_alumnos = 0
     if df_alumnos is not None and "ID_ALUMNO" in df_alumnos.columns:
@@ -220,8 +305,7 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
     # Calcular cursos ya comenzados (fecha actual >= FEC_INICIO)
     cursos_comenzados = 0
     if df_cursos is not None and 'FEC_INICIO' in df_cursos.columns:
-        # Convertir FEC_INICIO a datetime
-        df_cursos['FEC_INICIO'] = pd.to_datetime(df_cursos['FEC_INICIO'], errors='coerce')
+        # FEC_INICIO ya llega como datetime desde la carga
         # Fecha actual
         fecha_actual = pd.Timestamp.now().normalize()
         # Contar cursos con fecha de inicio menor o igual a la fecha actual
@@ -249,15 +333,28 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
     with tab1:
         st.subheader("Análisis de Postulantes")
         if df_postulantes is not None and not df_postulantes.empty:
+            # Opciones de los filtros y mapa departamento → localidades, una vez por versión
+            columnas_opciones = ('N_DEPARTAMENTO', 'N_LOCALIDAD')
+            dependencias_opciones = (('N_DEPARTAMENTO', 'N_LOCALIDAD'),)
+            if isinstance(data, dict):
+                token_opciones = ('VT_INSCRIPCIONES_PRG129.parquet', version_dataset(data, ARCHIVOS_CBA_CAPACITA))
+                opciones = opciones_filtros(token_opciones, df_postulantes, columnas_opciones, dependencias_opciones)
+            else:
+                opciones = OpcionesFiltros(df_postulantes, columnas_opciones, dependencias_opciones)
+
             # Filtros interactivos
             col1, col2 = st.columns(2)
             with col1:
-                departamentos = sorted(df_postulantes['N_DEPARTAMENTO'].dropna().unique())
+                departamentos = opciones.valores('N_DEPARTAMENTO')
                 selected_dpto = st.selectbox("Departamento:", ["Todos"] + departamentos)
             with col2:
-                localidades = sorted(df_postulantes['N_LOCALIDAD'].dropna().unique())
+                # Localidades del departamento elegido (o todas)
+                if selected_dpto != "Todos":
+                    localidades = opciones.dependientes('N_DEPARTAMENTO', 'N_LOCALIDAD', selected_dpto)
+                else:
+                    localidades = opciones.valores('N_LOCALIDAD')
                 selected_loc = st.selectbox("Localidad:", ["Todos"] + localidades)
-            df_filtered = df_postulantes.copy()
+            df_filtered = df_postulantes.copy(deep=False)
             if selected_dpto != "Todos":
                 df_filtered = df_filtered[df_filtered['N_DEPARTAMENTO'] == selected_dpto]
             if selected_loc != "Todos":
@@ -265,17 +362,22 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
             # 1. Cantidad de Postulaciones por N_DEPARTAMENTO y N_LOCALIDAD
             st.subheader("Cantidad de Postulaciones por Departamento y Localidad")
             df_group = df_filtered.groupby(['N_DEPARTAMENTO','N_LOCALIDAD']).size().reset_index(name='Cantidad')
+            if conteo_postulantes is not None:
+                # Postulantes distintos (CUIL) de cada localidad con los mismos filtros
+                postulantes_unicos = conteo_postulantes.contar_por(
+                    ['N_DEPARTAMENTO', 'N_LOCALIDAD'],
+                    {
+                        'N_DEPARTAMENTO': selected_dpto if selected_dpto != "Todos" else None,
+                        'N_LOCALIDAD': selected_loc if selected_loc != "Todos" else None,
+                    },
+                    nombre='Postulantes únicos'
+                )
+                df_group = df_group.merge(postulantes_unicos, on=['N_DEPARTAMENTO', 'N_LOCALIDAD'], how='left')
             st.dataframe(df_group, use_container_width=True, hide_index=True)
             # 2. Distribución por rangos de edad
             st.subheader("Distribución por Rangos de Edad")
-            today = pd.Timestamp.today()
-            if 'FEC_NACIMIENTO' in df_filtered.columns:
-                df_filtered = df_filtered.copy()
-                df_filtered['FEC_NACIMIENTO'] = pd.to_datetime(df_filtered['FEC_NACIMIENTO'], errors='coerce')
-                df_filtered['EDAD'] = ((today - df_filtered['FEC_NACIMIENTO']).dt.days // 365).astype('Int64')
-                bins = [0, 17, 29, 39, 49, 59, 69, 200]
-                labels = ['<18', '18-29', '30-39', '40-49', '50-59', '60-69','70+']
-                df_filtered['RANGO_EDAD'] = pd.cut(df_filtered['EDAD'], bins=bins, labels=labels, right=True)
+            if 'RANGO_EDAD' in df_filtered.columns:
+                # EDAD y RANGO_EDAD se calculan en la carga
                 edad_group = df_filtered['RANGO_EDAD'].value_counts().sort_index().reset_index()
                 edad_group.columns = ['Rango de Edad','Cantidad']
                 fig_edad = px.bar(edad_group, x='Rango de Edad', y='Cantidad', title='Distribución por Rango de Edad', text_auto=True, color='Rango de Edad', color_discrete_sequence=px.colors.qualitative.Pastel)
@@ -556,35 +658,16 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
             st.markdown("### Porcentaje de Ocupación de Cursos")
             st.markdown("*Considerando 20 alumnos como 100% de ocupación*")
             
-            # Calcular el porcentaje de ocupación (20 alumnos = 100%)
-            df_cursos['Porcentaje_Ocupacion'] = (df_cursos['ALUMNOS'] / 20 * 100).clip(upper=100)
-            
-            # Crear categorías de ocupación
-            df_cursos['Categoria_Ocupacion'] = pd.cut(
-                df_cursos['Porcentaje_Ocupacion'],
-                bins=[0, 25, 50, 75, 100],
-                labels=['Baja (0-25%)', 'Media-Baja (25-50%)', 'Media-Alta (50-75%)', 'Alta (75-100%)']
-            )
-            
+            # Porcentaje_Ocupacion y Categoria_Ocupacion se calculan en la carga
             # Definir el umbral para alta ocupación (75%)
             umbral_alta_ocupacion = 75
             
-            # Asegurarse de que todas las categorías estén correctamente asignadas
-            # Verificar que los cursos con Porcentaje_Ocupacion >= 75 estén en la categoría 'Alta (75-100%)'
-            df_cursos['Categoria_Ocupacion'] = pd.cut(
-                df_cursos['Porcentaje_Ocupacion'],
-                bins=[0, 25, 50, 75, 100],
-                labels=['Baja (0-25%)', 'Media-Baja (25-50%)', 'Media-Alta (50-75%)', 'Alta (75-100%)'],
-                include_lowest=True,
-                right=True  # Asegura que 75 esté en la categoría 'Alta'
-            )
-            
             # Contar cursos por categoría de ocupación
             df_ocupacion = df_cursos['Categoria_Ocupacion'].value_counts().reset_index()
             df_ocupacion.columns = ['Categoría', 'Cantidad']
             
             # Asegurar que las categorías estén en el orden correcto para la visualización
-            orden_categorias = ['Baja (0-25%)', 'Media-Baja (25-50%)', 'Media-Alta (50-75%)', 'Alta (75-100%)']
+            orden_categorias = CATEGORIAS_OCUPACION
             df_ocupacion['Orden'] = df_ocupacion['Categoría'].map({cat: i for i, cat in enumerate(orden_categorias)})
             df_ocupacion = df_ocupacion.sort_values('Orden').drop('Orden', axis=1)
             
@@ -659,14 +742,7 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
         if df_cursos is not None and 'POSTULACIONES' in df_cursos.columns:
             st.markdown("### Distribución de Cursos por Cantidad de Postulantes")
             
-            # Crear rangos de postulantes (de 20 en 20)
-            df_cursos['Rango_Postulantes'] = pd.cut(
-                df_cursos['POSTULACIONES'], 
-                bins=range(0, max(df_cursos['POSTULACIONES']) + 21, 20),
-                labels=[f'{i}-{i+19}' for i in range(0, max(df_cursos['POSTULACIONES']), 20)],
-                right=False
-            )
-            
+            # Rango_Postulantes (de 20 en 20) se calcula en la carga
             # Contar cursos por rango de postulantes
             df_rangos = df_cursos.groupby('Rango_Postulantes').size().reset_index(name='Cantidad_Cursos')
             
@@ -726,7 +802,7 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
             ]
             # Filtrar solo columnas existentes
             columnas_existentes = [col for col in columnas_exportar if col in df_cursos.columns]
-            df_export = df_cursos[columnas_existentes].copy()
+            df_export = df_cursos[columnas_existentes]
             
             # Mostrar tabla con estilos
             st.markdown("### Tabla de Cursos")
@@ -750,7 +826,7 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
             
             # Filtrar solo columnas existentes para mostrar
             columnas_mostrar_existentes = [col for col in columnas_mostrar if col in df_export.columns]
-            df_display = df_export[columnas_mostrar_existentes].copy()
+            df_display = df_export[columnas_mostrar_existentes]
             
             # Aplicar estilos al DataFrame
             styled_display = df_display.style\
@@ -792,14 +868,9 @@ def show_cba_capacita_dashboard(data, dates, is_development=False):
                         geojson_departamentos = df
                         break
 
-           # Limpiar y convertir LATITUD y LONGITUD
-            df_cursos = convert_decimal_separator(df_cursos, columns=["LATITUD", "LONGITUD"])
-
-            # Asegúrate de que los valores sean strings antes de usar .str.extract()
-            for col in ["LATITUD", "LONGITUD"]:
-                df_cursos[col] = df_cursos[col].astype(str)  # Convertir a string
-                df_cursos[col] = df_cursos[col].str.extract(r"(-?\d+\.\d+)").astype(float)
-                df_cursos = df_cursos.dropna(subset=["LATITUD", "LONGITUD"])
+            # LATITUD y LONGITUD ya llegan numéricas y validadas desde la carga;
+            # para el mapa solo se usan los cursos con coordenadas
+            df_cursos = df_cursos.dropna(subset=["LATITUD", "LONGITUD"])
 
             # Agrupar y contar para tabla (incluye ID_DEPARTAMENTO para relación con geojson)
             df_agrupado_tabla = df_cursos.groupby([
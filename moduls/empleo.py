@@ -8,8 +8,12 @@ from datetime import datetime, timedelta
 from utils.ui_components import display_kpi_row
 from utils.map_utils import create_choropleth_map, display_map
 from utils.styles import COLORES_IDENTIDAD
-from utils.data_cleaning import clean_thousand_separator, convert_decimal_separator
+from utils.data_cleaning import clean_thousand_separator, formatear_cuil_cuit
 from utils.kpi_tooltips import TOOLTIPS_DESCRIPTIVOS, ESTADO_TOOLTIPS
+from utils.territorio import adjuntar_territorio, dimension_localidades, adjuntar_localidades
+from utils.filtros import OpcionesFiltros, opciones_filtros
+from utils.conteo_distinto import DESCRIPCION_ERROR_HLL, ConteoAproximado, formatear_conteo
+from moduls.carga import leer_parquet_territorio, preprocesar_incremental, version_dataset, materializar_tabla
 import folium
 from streamlit_folium import folium_static
 import geopandas as gpd
@@ -57,6 +61,51 @@ def create_empleo_kpis(resultados, programa_nombre=""):
 
 
 
+# Mapeo de programas según IDETAPA
+PROGRAMAS_POR_ETAPA = {
+    53: "Programa Primer Paso",
+    51: "Más 26",
+    54: "CBA Mejora",
+    55: "Nueva Oportunidad"
+}
+
+def _preprocesar_inscriptos(df_inscriptos_raw):
+    """
+    Aplica las transformaciones fila a fila del reporte de fichas
+    (VT_REPORTES_PPP_MAS26): excluye ADHERIDO, tipa enteros, corrige CAPITAL,
+    marca fin de programa y agrega ZONA y PROGRAMA.
+
+    Como cada fila se transforma de forma independiente, puede aplicarse tanto
+    a la tabla completa como a un subconjunto leído por territorio.
+
+    Args:
+        df_inscriptos_raw: DataFrame crudo de fichas
+
+    Returns:
+        DataFrame preprocesado (nuevo, no modifica el original)
+    """
+    # Filtrar para excluir el estado "ADHERIDO"
+    df_inscriptos = df_inscriptos_raw[df_inscriptos_raw['N_ESTADO_FICHA'] != "ADHERIDO"]
+
+    # Los campos enteros (ID_FICHA, IDETAPA, EDAD, ...) ya llegan como Int nullable
+    # desde la carga (ver normalizar_tipos en moduls/carga.py)
+
+    # Agregar ZONA y corregir localidades del departamento CAPITAL a "CORDOBA"
+    # (los nombres de departamento se conservan tal como vienen)
+    df_inscriptos = adjuntar_territorio(df_inscriptos, normalizar_departamento=False)
+
+    if 'BEN_N_ESTADO' in df_inscriptos.columns:
+        estado_ben_mask = df_inscriptos['BEN_N_ESTADO'] == 'BAJA POR FINALIZACION DE PROGR'
+        df_inscriptos['N_ESTADO_FICHA'] = df_inscriptos['N_ESTADO_FICHA'].mask(estado_ben_mask, 'BENEFICIARIO FIN PROGRAMA')
+
+    # Crear columna con nombres de programas
+    if 'IDETAPA' in df_inscriptos.columns:
+        df_inscriptos['PROGRAMA'] = df_inscriptos['IDETAPA'].map(lambda x: PROGRAMAS_POR_ETAPA.get(x, f"Programa {x}"))
+    else:
+        df_inscriptos['PROGRAMA'] = "No especificado"
+
+    return df_inscriptos
+
 def calculate_cupo(cantidad_empleados, empleador, adherido):
     # Condición para el programa PPP
     if adherido == "PPP - PROGRAMA PRIMER PASO [2024]":
@@ -90,21 +139,69 @@ def calculate_cupo(cantidad_empleados, empleador, adherido):
     
     return 0
 
-def render_filters(df_inscriptos, key_prefix=""):
+def calcular_cupo_vectorizado(cantidad_empleados, empleador, adherido):
+    """
+    Versión vectorizada de calculate_cupo: aplica los tramos de PPP y EMPLEO +26
+    sobre columnas completas en lugar de fila a fila.
+
+    Args:
+        cantidad_empleados: Serie numérica con la cantidad de empleados (sin nulos)
+        empleador: Serie con el indicador EMPLEADOR ('S'/'N')
+        adherido: Serie con el programa al que adhiere la empresa
+
+    Returns:
+        Serie de enteros con el cupo de cada empresa
+    """
+    cantidad = pd.to_numeric(cantidad_empleados, errors='coerce').to_numpy(dtype=float)
+    es_ppp = (adherido == "PPP - PROGRAMA PRIMER PASO [2024]").to_numpy()
+    es_mas26 = (adherido == "EMPLEO +26").to_numpy()
+    no_empleador = (empleador == 'N').to_numpy()
+
+    # Tramos de PPP
+    cupo_ppp = np.select(
+        [cantidad < 1, cantidad <= 5, cantidad <= 10, cantidad <= 25, cantidad <= 50],
+        [0, 1, 2, 3, np.ceil(0.2 * cantidad)],
+        default=np.ceil(0.1 * cantidad)
+    )
+
+    # Tramos de EMPLEO +26 (los no empleadores tienen cupo 1)
+    cupo_mas26 = np.select(
+        [no_empleador, cantidad < 1, cantidad <= 7, cantidad <= 30, cantidad <= 165],
+        [1, 1, 2, np.ceil(0.2 * cantidad), np.ceil(0.15 * cantidad)],
+        default=np.ceil(0.1 * cantidad)
+    )
+
+    cupo = np.select([es_ppp, es_mas26], [cupo_ppp, cupo_mas26], default=0)
+    return pd.Series(cupo.astype(int), index=adherido.index, name='CUPO')
+
+def render_filters(df_inscriptos, key_prefix="", version=None):
     """
     Renderiza los filtros de la interfaz de usuario.
     
     Args:
         df_inscriptos: DataFrame con los datos de inscripciones
+        version: Versión del archivo VT_REPORTES_PPP_MAS26.parquet. Si se indica y la tabla
+            HECHOS_EMPLEO_FICHAS está materializada, al elegir un departamento se leen solo
+            sus filas ya preprocesadas.
         
     Returns:
         Tupla con el DataFrame filtrado y los filtros seleccionados
     """
-    # Mantener una copia del DataFrame original para no modificarlo
-    df_filtered = df_inscriptos.copy()
+    # Copia perezosa del DataFrame original (copy-on-write: no se duplican los datos)
+    df_filtered = df_inscriptos.copy(deep=False)
     
     # Inicializar la lista de filtros aplicados
     filtros_aplicados = []
+
+    # Opciones de los filtros y mapa departamento → localidades, calculados una vez por versión
+    columnas_opciones = ('N_DEPARTAMENTO', 'ZONA')
+    dependencias_opciones = (('N_DEPARTAMENTO', 'N_LOCALIDAD'),)
+    if version is not None:
+        opciones = opciones_filtros(
+            ('VT_REPORTES_PPP_MAS26.parquet', version), df_inscriptos, columnas_opciones, dependencias_opciones
+        )
+    else:
+        opciones = OpcionesFiltros(df_inscriptos, columnas_opciones, dependencias_opciones)
     
     with st.container():
         # Contenedor de filtros con 2 columnas
@@ -114,7 +211,7 @@ def render_filters(df_inscriptos, key_prefix=""):
         with col1:
             # Solo mostrar el filtro de departamento si la columna existe en el dataframe
             if 'N_DEPARTAMENTO' in df_inscriptos.columns:
-                departamentos = sorted(df_inscriptos['N_DEPARTAMENTO'].dropna().unique())
+                departamentos = opciones.valores('N_DEPARTAMENTO')
                 all_dpto_option = "Todos los departamentos"
                 selected_dpto = st.selectbox("Departamento (Beneficiarios):", [all_dpto_option] + list(departamentos), key=f"{key_prefix}_dpto_filter")
                 
@@ -124,11 +221,19 @@ def render_filters(df_inscriptos, key_prefix=""):
                 
                 # Filtrar por departamento si se seleccionó uno
                 if selected_dpto != all_dpto_option:
-                    df_filtered = df_filtered[df_filtered['N_DEPARTAMENTO'] == selected_dpto]
+                    # Leer solo el departamento desde la tabla de fichas ya limpiada y
+                    # preprocesada (row groups filtrados por estadísticas)
+                    df_territorio = leer_parquet_territorio(
+                        'HECHOS_EMPLEO_FICHAS', version, departamento=selected_dpto, construir=_preprocesar_inscriptos
+                    )
+                    if df_territorio is not None:
+                        df_filtered = df_territorio
+                    else:
+                        df_filtered = df_filtered[df_filtered['N_DEPARTAMENTO'] == selected_dpto]
                     
                     # Solo mostrar el filtro de localidad si la columna existe en el dataframe
                     if 'N_LOCALIDAD' in df_inscriptos.columns:
-                        localidades = sorted(df_filtered['N_LOCALIDAD'].dropna().unique())
+                        localidades = opciones.dependientes('N_DEPARTAMENTO', 'N_LOCALIDAD', selected_dpto)
                         all_loc_option = "Todas las localidades"
                         selected_loc = st.selectbox("Localidad:", [all_loc_option] + list(localidades), key=f"{key_prefix}_loc_filter")
                         
@@ -149,7 +254,7 @@ def render_filters(df_inscriptos, key_prefix=""):
         with col2:
             # Solo mostrar el filtro de ZONA si la columna existe en el dataframe
             if 'ZONA' in df_inscriptos.columns:
-                zonas = sorted(df_inscriptos['ZONA'].dropna().unique())
+                zonas = opciones.valores('ZONA')
                 all_zona_option = "Todas las zonas"
                 selected_zona = st.selectbox("Zona:", [all_zona_option] + list(zonas), key=f"{key_prefix}_zona_filter")
             else:
@@ -191,10 +296,15 @@ def show_empleo_dashboard(data, dates, is_development=False):
         show_dev_dataframe_info(data, modulo_nombre="Empleo")
     try:
         # Cargar y preprocesar los datos
-        df_inscriptos, df_empresas, df_poblacion, geojson_data, has_fichas, has_empresas, has_poblacion, has_geojson = load_and_preprocess_data(data, dates, is_development)
+        df_inscriptos, df_empresas, df_poblacion, geojson_data, df_censales, has_fichas, has_empresas, has_poblacion, has_geojson = load_and_preprocess_data(data, dates, is_development)
+        if df_inscriptos is None:
+            return
         
         # Renderizar el dashboard principal
-        render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has_empresas, has_geojson)
+        df_fichas = data.get('VT_REPORTES_PPP_MAS26.parquet')
+        version_inscriptos = version_dataset(data, ['VT_REPORTES_PPP_MAS26.parquet']) if df_fichas is not None else None
+        version_empleo = version_dataset(data, ARCHIVOS_EMPLEO)
+        render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has_empresas, has_geojson, version_inscriptos, version_empleo)
         
         # Agregar sección específica para datos censales
         st.markdown("### Información Demográfica y Estadísticas Laborales por Localidad")
@@ -205,32 +315,34 @@ def show_empleo_dashboard(data, dates, is_development=False):
             **¿Cómo se calcula la tasa de desocupación?**  
             La tasa de desempleo se calcula dividiendo el número de personas desocupadas por la Población Económicamente Activa (PEA) y multiplicando por 100. Fuente: INDEC.
             """)
-            df_censales = data.get('LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - DATOS_CENSALES.txt')
             if df_censales is not None and not getattr(df_censales, 'empty', True):
                 col1, col2 = st.columns(2)
                 with col1:
-                    departamentos_censales = sorted(df_censales['CODIGOS.Departamento'].dropna().unique())
+                    # Opciones y mapa departamento → localidades censales, una vez por versión
+                    opciones_censales = opciones_filtros(
+                        ('DATOS_CENSALES', version_empleo), df_censales,
+                        ('CODIGOS.Departamento', 'CODIGOS.Localidad'), (('CODIGOS.Departamento', 'CODIGOS.Localidad'),)
+                    )
+                    departamentos_censales = opciones_censales.valores('CODIGOS.Departamento')
                     depto_sel_censal = st.selectbox("Filtrar por Departamento (Censal):", options=["Todos"] + departamentos_censales, key="censo_depto")
                 with col2:
                     if depto_sel_censal != "Todos":
-                        df_censales_filtrado_loc = df_censales[df_censales['CODIGOS.Departamento'] == depto_sel_censal]
+                        localidades_censales = opciones_censales.dependientes('CODIGOS.Departamento', 'CODIGOS.Localidad', depto_sel_censal)
                     else:
-                        df_censales_filtrado_loc = df_censales
-                    
-                    localidades_censales = sorted(df_censales_filtrado_loc['CODIGOS.Localidad'].dropna().unique())
+                        localidades_censales = opciones_censales.valores('CODIGOS.Localidad')
                     loc_sel_censal = st.selectbox("Filtrar por Localidad (Censal):", options=["Todas"] + localidades_censales, key="censo_loc")
                 
-                df_censales_display = df_censales.copy()
+                df_censales_display = df_censales.copy(deep=False)
                 if depto_sel_censal != "Todos":
                     df_censales_display = df_censales_display[df_censales_display['CODIGOS.Departamento'] == depto_sel_censal]
                 if loc_sel_censal != "Todas":
                     df_censales_display = df_censales_display[df_censales_display['CODIGOS.Localidad'] == loc_sel_censal]
                 
                 cols_tabla_censal = ["CODIGOS.Departamento", "CODIGOS.Localidad", "Tasa de Actividad", "Tasa de Empleo", "Tasa de desocupación"]
-                df_tabla_censal = df_censales_display[cols_tabla_censal].copy()
+                df_tabla_censal = df_censales_display[cols_tabla_censal]
                 
-                # Crear una copia para no modificar el original
-                df_display = df_tabla_censal.copy()
+                # Copia perezosa para no modificar el original (copy-on-write)
+                df_display = df_tabla_censal.copy(deep=False)
                 
                 # Aplicar estilo avanzado similar a bco_gente.py
                 def highlight_row(row):
@@ -310,8 +422,8 @@ def show_empleo_dashboard(data, dates, is_development=False):
                     elif not all(col in df_mas26_excel.columns for col in mas26_cols_esperadas):
                         st.warning(f"El archivo 'mas26_jesi.xlsx' no contiene todas las columnas esperadas: {', '.join(mas26_cols_esperadas)}")
                     else:
-                        df_ppp_clean = df_ppp_excel[ppp_cols_esperadas].copy()
-                        df_mas26_clean = df_mas26_excel[mas26_cols_esperadas].copy()
+                        df_ppp_clean = df_ppp_excel[ppp_cols_esperadas]
+                        df_mas26_clean = df_mas26_excel[mas26_cols_esperadas]
                         
                         df_ppp_clean = df_ppp_clean.rename(columns={'Población de 15 a 24 años': 'POBLACION'})
                         df_mas26_clean = df_mas26_clean.rename(columns={'Población mayor de 25 años': 'POBLACION'})
@@ -342,7 +454,7 @@ def show_empleo_dashboard(data, dates, is_development=False):
                         st.plotly_chart(fig_poblacion, use_container_width=True)
                         
                         st.subheader("Tasas de Empleo y Desocupación")
-                        df_tasas = df_poblacion_completo.copy()
+                        df_tasas = df_poblacion_completo.copy(deep=False)
                         df_tasas['Tasa de Actividad'] = np.where(df_tasas['POBLACION'] != 0, (df_tasas['TOTAL PEA'] / df_tasas['POBLACION'] * 100), 0).round(2)
                         df_tasas['Tasa de Empleo'] = np.where(df_tasas['POBLACION'] != 0, (df_tasas['OCUPADA'] / df_tasas['POBLACION'] * 100), 0).round(2)
                         df_tasas['Tasa de Desocupación'] = np.where(df_tasas['TOTAL PEA'] != 0, (df_tasas['DESOCUPADA'] / df_tasas['TOTAL PEA'] * 100), 0).round(2)
@@ -373,224 +485,264 @@ def show_empleo_dashboard(data, dates, is_development=False):
     except Exception as e:
         st.error(f"Error al mostrar el dashboard de empleo: {str(e)}")
 
+# Archivos que intervienen en el preprocesamiento cacheado de empleo
+ARCHIVOS_EMPLEO = [
+    'VT_REPORTES_PPP_MAS26.parquet',
+    'vt_empresas_adheridas.parquet',
+    'vt_empresas_ARCA.parquet',
+    'LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - DATOS_CENSALES.txt'
+]
+
 def load_and_preprocess_data(data, dates=None, is_development=False):
     """
     Carga y preprocesa los datos necesarios para el dashboard.
+
+    El cálculo pesado se delega en _calcular_datos_empleo, cacheada por versión
+    del dataset; aquí solo quedan los avisos y elementos de interfaz.
     
     Args:
         data: Diccionario de dataframes cargados desde GitLab
         dates: Diccionario de fechas de actualización de los archivos
+        is_development: Booleano que indica si estamos en modo desarrollo
         
     Returns:
-        Tupla con los dataframes procesados y flags de disponibilidad
+        Tupla con los dataframes procesados (incluidos los datos censales) y flags de disponibilidad
     """
-    with st.spinner("Cargando y procesando datos de empleo..."):
+    df_inscriptos_raw = data.get('VT_REPORTES_PPP_MAS26.parquet')
+    geojson_data = data.get('capa_departamentos_2010.geojson')
+    has_geojson = geojson_data is not None
 
-        # Extraer los dataframes necesarios
-        df_inscriptos_raw = data.get('VT_REPORTES_PPP_MAS26.parquet')
-        geojson_data = data.get('capa_departamentos_2010.geojson')
-        
-        # Cargar datos de circuitos electorales
+    # Cargar dataset de población (limpiando separador de miles)
+    df_poblacion = clean_thousand_separator(data.get('POBLACION.parquet'))
+    has_poblacion = df_poblacion is not None and not df_poblacion.empty
+
+    # Solo mostrar mensaje si hay error al cargar el dataset de liquidación por localidad
+    df_liquidacion = data.get('VT_REPORTE_LIQUIDACION_LOCALIDAD.parquet')
+    if df_liquidacion is None or df_liquidacion.empty:
+        st.warning("No se pudo cargar el dataset de liquidación por localidad.")
+
+    # Verificar que los datos estén disponibles
+    if df_inscriptos_raw is None or df_inscriptos_raw.empty:
+        st.error("No se pudieron cargar los datos de inscripciones.")
+        return None, None, None, None, None, False, False, False, False
+
+    version = version_dataset(data, ARCHIVOS_EMPLEO)
+    df_inscriptos, df_empresas, df_censales = _calcular_datos_empleo(version, data)
+    has_empresas = df_empresas is not None and not df_empresas.empty
+    has_fichas = True  # Si llegamos hasta aquí, tenemos datos de fichas
+
+    # Mostrar la fecha de última actualización
+    from utils.ui_components import show_last_update
+    show_last_update(dates, 'VT_REPORTES_PPP_MAS26.parquet')
+
+    # Mostrar df_inscriptos cruzado con circuitos electorales solo en modo desarrollo
+    if is_development:
         df_circuitos = data.get('LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - USAR.txt')
-        has_circuitos = df_circuitos is not None and not df_circuitos.empty
+        if df_circuitos is not None and not df_circuitos.empty:
+            try:
+                version_cruce = version_dataset(data, ['VT_REPORTES_PPP_MAS26.parquet', 'LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - USAR.txt'])
+                df_inscriptos_cruzado = _cruzar_circuitos(version_cruce, df_inscriptos, df_circuitos)
+                with st.expander('🔍 Visualización DEBUG: df_inscriptos cruzado (post-merge) NO RETORNA DE LA FUNCION DE CARGA', expanded=False):
+                    st.dataframe(df_inscriptos_cruzado.head(50))
+                    st.write(f"Filas: {df_inscriptos_cruzado.shape[0]}, Columnas: {df_inscriptos_cruzado.shape[1]}")
+            except Exception as e:
+                st.error(f"Error al procesar datos de circuitos electorales: {str(e)}")
+
+    # Retornar los dataframes procesados y los flags de disponibilidad
+    return df_inscriptos, df_empresas, df_poblacion, geojson_data, df_censales, has_fichas, has_empresas, has_poblacion, has_geojson
+
+@st.cache_resource(show_spinner="Cargando y procesando datos de empleo...", max_entries=4)
+def _calcular_datos_empleo(version, _data):
+    """
+    Calcula los DataFrames derivados de empleo para una versión del dataset.
 
+    Es una función pura: no muestra elementos de interfaz ni modifica `_data` ni
+    los DataFrames que contiene. El resultado se calcula una sola vez por `version`
+    y se comparte entre reruns y sesiones, por lo que es de solo lectura.
+
+    Args:
+        version: Versión del dataset (version_dataset sobre ARCHIVOS_EMPLEO), clave del caché
+        _data: Diccionario de dataframes cargados (no se usa para la clave del caché)
+
+    Returns:
+        tuple: (df_inscriptos, df_empresas, df_censales)
+    """
+    # Limpiar separador de miles en los DataFrames principales
+    df_inscriptos_raw = clean_thousand_separator(_data.get('VT_REPORTES_PPP_MAS26.parquet'))
+
+    def construir_empresas():
+        """Cruza empresas con ARCA, beneficiarios por CUIT y zona, y calcula el cupo."""
         # Crear df_emp_ben: cantidad de beneficiarios por empresa (CUIT)
         df_emp_ben = (
             df_inscriptos_raw[
                 (df_inscriptos_raw["IDETAPA"].isin([51, 53, 54, 55])) &
                 (df_inscriptos_raw["N_ESTADO_FICHA"] == "BENEFICIARIO")
             ]
-            .assign(CUIT=lambda df: df["EMP_CUIT"].astype(str).str.replace("-", ""))
+            .assign(CUIT=lambda df: df["EMP_CUIT"])
             .groupby("CUIT", as_index=False)
             .agg(BENEF=("ID_FICHA", "count"))
         )
-        
+
         # Cargar el dataset de empresas
-        df_empresas = data.get('vt_empresas_adheridas.parquet')
+        df_empresas = clean_thousand_separator(_data.get('vt_empresas_adheridas.parquet'))
         has_empresas = df_empresas is not None and not df_empresas.empty
 
+        if has_empresas:
+            # CUIT, EMP_CUIT y el CUIT de ARCA ya vienen codificados como enteros desde la carga
+            # --- Cruce con ARCA ---
+            df_arca = _data.get('vt_empresas_ARCA.parquet')
+            if df_arca is not None and not df_arca.empty:
+                # Seleccionar solo las columnas de interés de ARCA
+                cols_arca = ['CUIT', 'IMP_GANANCIAS', 'IMP_IVA', 'MONOTRIBUTO', 'INTEGRANTE_SOC', 'EMPLEADOR', 'ACTIVIDAD_MONOTRIBUTO','NOMBRE_TIPO_EMPRESA']
+                df_arca_sel = df_arca[cols_arca]
+                # Merge left
+                df_empresas = df_empresas.merge(df_arca_sel, on='CUIT', how='left')
 
+            # Cruce de empresas con df_emp_ben por CUIT
+            if "CUIT" in df_empresas.columns:
+                df_empresas = df_empresas.merge(df_emp_ben, on="CUIT", how="left")
 
-        # --- NUEVO: Cruce con ARCA ---
-        df_arca = data.get('vt_empresas_ARCA.parquet')
-        if has_empresas and df_arca is not None and not df_arca.empty:
-            # Limpiar CUIT en ambos DataFrames (quitar guiones y asegurar string)
-            df_empresas['CUIT'] = df_empresas['CUIT'].astype(str).str.replace('-', '', regex=False)
-            df_arca['CUIT'] = df_arca['CUIT'].astype(str).str.replace('-', '', regex=False)
-            # Seleccionar solo las columnas de interés de ARCA
-            cols_arca = ['CUIT', 'IMP_GANANCIAS', 'IMP_IVA', 'MONOTRIBUTO', 'INTEGRANTE_SOC', 'EMPLEADOR', 'ACTIVIDAD_MONOTRIBUTO','NOMBRE_TIPO_EMPRESA']
-            df_arca_sel = df_arca[cols_arca].copy()
-            # Merge left
-            df_empresas = df_empresas.merge(df_arca_sel, on='CUIT', how='left')
+            # Añadir la columna ZONA también al dataframe de empresas
+            df_empresas = adjuntar_territorio(df_empresas, normalizar_departamento=False, corregir_capital=False)
 
-        # Cruce de df_display con df_emp_ben por CUIT
-        if "CUIT" in df_empresas.columns:
-            df_empresas = df_empresas.merge(df_emp_ben, on="CUIT", how="left")
-        
-        # Cargar el nuevo dataset de liquidación por localidad
-        df_liquidacion = data.get('VT_REPORTE_LIQUIDACION_LOCALIDAD.parquet')
-        has_liquidacion = df_liquidacion is not None and not df_liquidacion.empty
-        
-        # Cargar dataset de población
-        df_poblacion = data.get('POBLACION.parquet')
-        has_poblacion = df_poblacion is not None and not df_poblacion.empty
-        
-        # Verificar si hay datos geojson
-        has_geojson = geojson_data is not None
-        
-        # Solo mostrar mensaje si hay error al cargar el dataset
-        if not has_liquidacion:
-            st.warning("No se pudo cargar el dataset de liquidación por localidad.")
-        
-        # Verificar que los datos estén disponibles
-        if df_inscriptos_raw is None or df_inscriptos_raw.empty:
-            st.error("No se pudieron cargar los datos de inscripciones.")
-            return None, None, None, None, False, False, False, False
-        
-        # Limpiar separador de miles en los DataFrames principales
-        #df_empresas = clean_thousand_separator(df_empresas)
-        #df_inscriptos_raw = clean_thousand_separator(df_inscriptos_raw)
-        #df_poblacion = clean_thousand_separator(df_poblacion)
-        
-        # Cargar y limpiar datos censales (si existen)
-        df_censales = data.get('LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - DATOS_CENSALES.txt')
-        if df_censales is not None and not df_censales.empty:
-            # Asegurar que todas las columnas sean de tipo string para evitar problemas de tipo
-            for col in df_censales.columns:
-                df_censales[col] = df_censales[col].astype(str)
-                # Reemplazar 'nan', 'None', etc. con cadena vacía
-                df_censales[col] = df_censales[col].replace(['nan', 'None', 'none', 'null', 'NaN', '<NA>', 'NA', 'undefined'], '')
-            
-            # Limpiar caracteres especiales en columnas numéricas pero mantener formato original
-            numeric_cols = ['Tasa de Actividad', 'Tasa de Empleo', 'Tasa de desocupación']
-            for col in numeric_cols:
-                if col in df_censales.columns:
-                    # Limpiar valores no deseados pero mantener el formato con coma
-                    df_censales[col] = df_censales[col].replace(['\u2014', '\u2013', '\u2212', '-'], '')
-            
-            # Actualizar el dataset en el diccionario de datos
-            data['LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - DATOS_CENSALES.txt'] = df_censales
-
-        # Filtrar para excluir el estado "ADHERIDO"
-        df_inscriptos = df_inscriptos_raw[df_inscriptos_raw['N_ESTADO_FICHA'] != "ADHERIDO"].copy()
-
-        # Convertir campos numéricos a enteros para eliminar decimales (.0)
-        integer_columns = [
-            "ID_DEPARTAMENTO_GOB", 
-            "ID_LOCALIDAD_GOB",
-            "ID_FICHA",
-            "IDETAPA",
-            "CUPO",
-            "ID_MOD_CONT_AFIP",
-            "EDAD"
-        ]
-        
-        # Convertir solo las columnas que existen en el DataFrame
-        for col in integer_columns:
-            if col in df_inscriptos.columns:
-                # Primero convertir a float para manejar posibles NaN, luego a int
-                df_inscriptos[col] = df_inscriptos[col].fillna(-1)  # Reemplazar NaN con -1 temporalmente
-                df_inscriptos[col] = df_inscriptos[col].astype(int)
-                # Opcional: volver a convertir -1 a NaN si es necesario
-                df_inscriptos.loc[df_inscriptos[col] == -1, col] = pd.NA
-        
-        # Corregir localidades del departamento CAPITAL a "CORDOBA"
-        if 'N_DEPARTAMENTO' in df_inscriptos.columns and 'N_LOCALIDAD' in df_inscriptos.columns:
-            # Crear una máscara para identificar registros del departamento CAPITAL
-            capital_mask = df_inscriptos['N_DEPARTAMENTO'] == 'CAPITAL'
-            
-            # Aplicar la corrección solo a los registros del departamento CAPITAL
-            df_inscriptos.loc[capital_mask, 'N_LOCALIDAD'] = 'CORDOBA'
-        
-        if 'BEN_N_ESTADO' in df_inscriptos.columns:
-            estado_ben_mask = df_inscriptos['BEN_N_ESTADO'] == 'BAJA POR FINALIZACION DE PROGR'
-            df_inscriptos.loc[estado_ben_mask, 'N_ESTADO_FICHA'] = 'BENEFICIARIO FIN PROGRAMA'
-
-        # Añadir columna de ZONA FAVORECIDA
-        zonas_favorecidas = [
-            'PRESIDENTE ROQUE SAENZ PEÑA', 'GENERAL ROCA', 'RIO SECO', 'TULUMBA', 
-            'POCHO', 'SAN JAVIER', 'SAN ALBERTO', 'MINAS', 'CRUZ DEL EJE', 
-            'TOTORAL', 'SOBREMONTE', 'ISCHILIN'
-        ]
-        
-        # Crear la columna ZONA
-        df_inscriptos['ZONA'] = df_inscriptos['N_DEPARTAMENTO'].apply(
-            lambda x: 'ZONA NOC Y SUR' if x in zonas_favorecidas else 'ZONA REGULAR'
-        )
-        
-        # Añadir la columna ZONA también al dataframe de empresas
-        if has_empresas and 'N_DEPARTAMENTO' in df_empresas.columns:
-            df_empresas['ZONA'] = df_empresas['N_DEPARTAMENTO'].apply(
-                lambda x: 'ZONA NOC Y SUR' if x in zonas_favorecidas else 'ZONA REGULAR'
-            )
-                # Mostrar la fecha de última actualización
-        from utils.ui_components import show_last_update
-        show_last_update(dates, 'VT_REPORTES_PPP_MAS26.parquet')
-        
+            # Asegurar que las columnas numéricas sean del tipo correcto
+            for col in ['CANTIDAD_EMPLEADOS', 'VACANTES']:
+                if col in df_empresas.columns:
+                    df_empresas[col] = pd.to_numeric(df_empresas[col], errors='coerce').fillna(0)
+                else:
+                    df_empresas[col] = 0
 
-        
-        # Preparar datos para los filtros
-        # Limpiar y preparar los datos
-        df_inscriptos_sin_adherido = df_inscriptos.copy()
-        
-        # Mapeo de programas según IDETAPA
-        programas = {
-            53: "Programa Primer Paso",
-            51: "Más 26",
-            54: "CBA Mejora",
-            55: "Nueva Oportunidad"
-        }
-        
-        # Crear columna con nombres de programas
-        if 'IDETAPA' in df_inscriptos_sin_adherido.columns:
-            df_inscriptos_sin_adherido['PROGRAMA'] = df_inscriptos_sin_adherido['IDETAPA'].map(lambda x: programas.get(x, f"Programa {x}"))
-        else:
-            df_inscriptos_sin_adherido['PROGRAMA'] = "No especificado"
-            
-        has_fichas = True  # Si llegamos hasta aquí, tenemos datos de fichas
-        
-        # Preprocesar el dataframe de circuitos electorales si está disponible
-        df_inscriptos_cruzado = None  # Para debug visual
-        if has_circuitos:
-            try:
-                # Asegurarse de que las columnas estén correctamente tipadas
-                if 'ID_LOCALIDAD' in df_circuitos.columns:
-                    df_circuitos['ID_LOCALIDAD'] = pd.to_numeric(df_circuitos['ID_LOCALIDAD'], errors='coerce')
-                
-                # Limpiar datos si es necesario
-                #df_circuitos = clean_thousand_separator(df_circuitos)
-                #df_circuitos = convert_decimal_separator(df_circuitos)
-                
-                # Si hay datos de inscriptos y circuitos, intentar cruzarlos
-                if df_inscriptos is not None and not df_inscriptos.empty:
-                    if 'ID_LOCALIDAD_GOB' in df_inscriptos.columns and 'ID_LOCALIDAD' in df_circuitos.columns:
-                        df_inscriptos = pd.merge(
-                            df_inscriptos,
-                            df_circuitos,
-                            left_on='ID_LOCALIDAD_GOB',
-                            right_on='ID_LOCALIDAD',
-                            how='left',
-                            suffixes=('', '_circuito')
-                        )
-                    # Guardar copia para debug visual si estamos en modo desarrollo
-                    df_inscriptos_cruzado = df_inscriptos.copy()
+            # Calcular la columna 'CUPO' según los tramos de cada programa
+            if all(col in df_empresas.columns for col in ['CANTIDAD_EMPLEADOS', 'EMPLEADOR', 'ADHERIDO']):
+                df_empresas['CUPO'] = calcular_cupo_vectorizado(df_empresas['CANTIDAD_EMPLEADOS'], df_empresas['EMPLEADOR'], df_empresas['ADHERIDO'])
+            else:
+                df_empresas['CUPO'] = 0
+        return df_empresas
 
-            except Exception as e:
-                st.error(f"Error al procesar datos de circuitos electorales: {str(e)}")
-                has_circuitos = False
-        
-        # Mostrar df_inscriptos cruzado solo en modo desarrollo
-        if is_development:
-            if df_inscriptos_cruzado is not None:
-                with st.expander('🔍 Visualización DEBUG: df_inscriptos cruzado (post-merge) NO RETORNA DE LA FUNCION DE CARGA', expanded=False):
-                    st.dataframe(df_inscriptos_cruzado.head(50))
-                    st.write(f"Filas: {df_inscriptos_cruzado.shape[0]}, Columnas: {df_inscriptos_cruzado.shape[1]}")
-        # Retornar los dataframes procesados y los flags de disponibilidad
-        return df_inscriptos_sin_adherido, df_empresas, df_poblacion, geojson_data, has_fichas, has_empresas, has_poblacion, has_geojson
+    # Tabla de hechos de empresas, materializada en el snapshot local por versión
+    df_empresas = _data.get('vt_empresas_adheridas.parquet')
+    if df_empresas is not None and not df_empresas.empty:
+        df_empresas = materializar_tabla('HECHOS_EMPLEO_EMPRESAS', version, construir_empresas)
+
+    # Limpiar datos censales (si existen) sobre una copia
+    df_censales = _data.get('LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - DATOS_CENSALES.txt')
+    if df_censales is not None and not df_censales.empty:
+        # Asegurar que todas las columnas sean de tipo string para evitar problemas de tipo
+        # y reemplazar 'nan', 'None', etc. con cadena vacía
+        df_censales = df_censales.astype(str).replace(['nan', 'None', 'none', 'null', 'NaN', '<NA>', 'NA', 'undefined'], '')
 
+        # Limpiar caracteres especiales en columnas numéricas pero mantener formato original (con coma)
+        numeric_cols = [col for col in ['Tasa de Actividad', 'Tasa de Empleo', 'Tasa de desocupación'] if col in df_censales.columns]
+        if numeric_cols:
+            df_censales[numeric_cols] = df_censales[numeric_cols].replace(['\u2014', '\u2013', '\u2212', '-'], '')
 
+    # Filtrar ADHERIDO y normalizar campos fila a fila
+    # (solo se reprocesan las fichas que cambiaron desde la última carga). La tabla
+    # depende solo de las fichas: se versiona por ese archivo para que render_filters
+    # pueda leerla por departamento
+    df_inscriptos = materializar_tabla(
+        'HECHOS_EMPLEO_FICHAS',
+        version_dataset(_data, ['VT_REPORTES_PPP_MAS26.parquet']),
+        lambda: preprocesar_incremental('VT_REPORTES_PPP_MAS26.parquet', df_inscriptos_raw, _preprocesar_inscriptos)
+    )
 
-def render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has_empresas, has_geojson):
+    return df_inscriptos, df_empresas, df_censales
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cruzar_circuitos(version, _df_inscriptos, _df_circuitos):
+    """
+    Cruza las fichas con los circuitos electorales por localidad (solo para depuración).
+
+    Args:
+        version: Versión de fichas y circuitos, clave del caché
+        _df_inscriptos: DataFrame de fichas preprocesado
+        _df_circuitos: DataFrame de circuitos electorales
+
+    Returns:
+        DataFrame con las fichas y las columnas del circuito electoral
+    """
+    if 'ID_LOCALIDAD_GOB' not in _df_inscriptos.columns:
+        return _df_inscriptos
+
+    # Dimensión de localidades compartida con los demás tableros (limpia, tipada e indexada por ID_LOCALIDAD)
+    dim_localidades = dimension_localidades(_df_circuitos)
+    if dim_localidades is None:
+        return _df_inscriptos
+
+    # Búsqueda posicional por ID_LOCALIDAD_GOB en lugar de pd.merge
+    return materializar_tabla(
+        'HECHOS_EMPLEO_FICHAS_CIRCUITOS',
+        version,
+        lambda: adjuntar_localidades(_df_inscriptos, dim_localidades, clave='ID_LOCALIDAD_GOB', sufijo='_circuito')
+    )
+
+
+# Dimensiones de los sketches HyperLogLog de CUIL de las fichas (modo aproximado). Cada
+# celda ocupa un sketch denso de 64 KB: solo departamento × programa
+DIMENSIONES_PERSONAS_FICHAS = ['N_DEPARTAMENTO', 'PROGRAMA']
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _conteo_personas_fichas(version, _df_inscriptos):
+    """
+    Arma los sketches HyperLogLog de CUIL de las fichas por departamento y programa.
+
+    Args:
+        version: Versión de VT_REPORTES_PPP_MAS26.parquet, clave del caché
+        _df_inscriptos: DataFrame de fichas preprocesado (no se hashea)
+
+    Returns:
+        ConteoAproximado compartido, de solo lectura (None si no hay columna CUIL)
+    """
+    if 'CUIL' not in _df_inscriptos.columns:
+        return None
+    return ConteoAproximado(_df_inscriptos, 'CUIL', DIMENSIONES_PERSONAS_FICHAS)
+
+def mostrar_personas_por_programa(df_inscriptos, df_filtered, departamento=None, localidad=None, version=None):
+    """
+    Muestra fichas y personas distintas (CUIL) por programa, en forma exacta o
+    estimada con HyperLogLog si el usuario lo elige y no hay localidad seleccionada.
+
+    Args:
+        df_inscriptos: DataFrame de fichas completo (base de los sketches)
+        df_filtered: DataFrame de fichas con los filtros de la pestaña
+        departamento: Departamento seleccionado (None = todos)
+        localidad: Localidad seleccionada (None = todas)
+        version: Versión de VT_REPORTES_PPP_MAS26.parquet (clave del caché de sketches)
+    """
+    if 'CUIL' not in df_filtered.columns or 'PROGRAMA' not in df_filtered.columns:
+        return
+
+    conteo_aproximado = st.checkbox(
+        "Conteo rápido de personas (aproximado)",
+        value=False,
+        key="benef_tab_conteo_aproximado",
+        help=f"Estima las personas distintas (CUIL) con sketches HyperLogLog ({DESCRIPCION_ERROR_HLL}). "
+             "Los valores estimados se muestran como '≈ … (estimado)'. Con una localidad seleccionada "
+             "se cuenta siempre exacto."
+    )
+    conteo = None
+    if conteo_aproximado and localidad is None and version is not None:
+        conteo = _conteo_personas_fichas(version, df_inscriptos)
+    elif conteo_aproximado and localidad is not None:
+        st.caption("Con una localidad seleccionada las personas se cuentan en forma exacta.")
+
+    fichas = df_filtered.groupby('PROGRAMA', observed=True).size().rename('Fichas')
+    if conteo is not None:
+        personas = (
+            conteo.contar_por(['PROGRAMA'], {'N_DEPARTAMENTO': departamento}, nombre='Personas')
+            .set_index('PROGRAMA')['Personas']
+        )
+    else:
+        personas = df_filtered.groupby('PROGRAMA', observed=True)['CUIL'].nunique().rename('Personas')
+    estimado = conteo is not None
+
+    resumen = pd.concat([fichas, personas], axis=1).fillna(0).reset_index()
+    resumen['Fichas'] = resumen['Fichas'].map(lambda valor: formatear_conteo(valor))
+    resumen['Personas'] = resumen['Personas'].map(lambda valor: formatear_conteo(valor, estimado))
+    st.markdown("#### Fichas y personas (CUIL) por programa" + (" (estimado)" if estimado else ""))
+    st.dataframe(resumen, use_container_width=True, hide_index=True)
+
+def render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has_empresas, has_geojson, version_inscriptos=None, version_empleo=None):
     """
     Renderiza el dashboard principal con los datos procesados.
     """
@@ -652,7 +804,7 @@ def render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has
         # Contenido de la pestaña Beneficiarios
         with tab_beneficiarios:
             # Contenedor para los filtros específicos de la pestaña Beneficiarios
-            df_filtered, selected_dpto, selected_loc, all_dpto_option, all_loc_option = render_filters(df_inscriptos, key_prefix="benef_tab")
+            df_filtered, selected_dpto, selected_loc, all_dpto_option, all_loc_option = render_filters(df_inscriptos, key_prefix="benef_tab", version=version_inscriptos)
             
             # Conteo de ID_FICHA por PROGRAMA y ESTADO_FICHA
             pivot_table = df_filtered.pivot_table(
@@ -789,6 +941,15 @@ def render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has
             
             # Mostrar la tabla principal
             st.markdown(html_table_main, unsafe_allow_html=True)
+
+            # Personas distintas (CUIL) por programa, exactas o estimadas
+            mostrar_personas_por_programa(
+                df_inscriptos,
+                df_filtered,
+                departamento=selected_dpto if selected_dpto != all_dpto_option else None,
+                localidad=selected_loc if selected_loc not in (None, all_loc_option) else None,
+                version=version_inscriptos
+            )
             
             # Crear un botón desplegable para mostrar la tabla del grupo 3 y otros
             if grupo3_cols or otros_cols:  # Solo mostrar si hay columnas del grupo 3 u otros
@@ -1018,7 +1179,7 @@ def render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has
                 with table_col:
                     st.markdown(f"### Beneficiarios por Departamento")
                     # Crear una copia del dataframe sin la columna ID_DEPARTAMENTO_GOB para mostrar
-                    df_mapa_display = df_mapa.drop(columns=['ID_DEPARTAMENTO_GOB']).copy()
+                    df_mapa_display = df_mapa.drop(columns=['ID_DEPARTAMENTO_GOB'])
                     # Renombrar columnas para mejor visualización
                     df_mapa_display = df_mapa_display.rename(columns={
                         'N_DEPARTAMENTO': 'Departamento',
@@ -1071,7 +1232,7 @@ def render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has
             if has_empresas:
                 # Pasar directamente el DataFrame de empresas sin aplicar los filtros de render_filters
                 # ya que los filtros se manejarán internamente en show_companies
-                show_companies(df_empresas, geojson_data)
+                show_companies(df_empresas, geojson_data, version_empleo)
             else:
                 st.markdown("""
                     <div class="info-box status-warning">
@@ -1079,25 +1240,12 @@ def render_dashboard(df_inscriptos, df_empresas, df_poblacion, geojson_data, has
                     </div>
                 """, unsafe_allow_html=True)
 
-def show_companies(df_empresas, geojson_data):
-    # Asegúrate de que las columnas numéricas sean del tipo correcto
-    if 'CANTIDAD_EMPLEADOS' in df_empresas.columns:
-        df_empresas['CANTIDAD_EMPLEADOS'] = pd.to_numeric(df_empresas['CANTIDAD_EMPLEADOS'], errors='coerce')
-        df_empresas['CANTIDAD_EMPLEADOS'] = df_empresas['CANTIDAD_EMPLEADOS'].fillna(0)
-    else:
-        df_empresas['CANTIDAD_EMPLEADOS'] = 0
-        
-    if 'VACANTES' in df_empresas.columns:
-        df_empresas['VACANTES'] = pd.to_numeric(df_empresas['VACANTES'], errors='coerce')
-        df_empresas['VACANTES'] = df_empresas['VACANTES'].fillna(0)
-    else:
-        df_empresas['VACANTES'] = 0
+def show_companies(df_empresas, geojson_data, version=None):
+    # Trabajar sobre una copia perezosa: df_empresas es compartido por el caché de carga
+    # y, con copy-on-write, solo se copian las columnas que se modifican
+    df_empresas = df_empresas.copy(deep=False)
 
-    # Calcular la columna 'CUPO'
-    if all(col in df_empresas.columns for col in ['CANTIDAD_EMPLEADOS', 'EMPLEADOR', 'ADHERIDO']):
-        df_empresas['CUPO'] = df_empresas.apply(lambda row: calculate_cupo(row['CANTIDAD_EMPLEADOS'], row['EMPLEADOR'], row['ADHERIDO']), axis=1)
-    else:
-        df_empresas['CUPO'] = 0
+    # CANTIDAD_EMPLEADOS, VACANTES y CUPO ya vienen calculados desde la carga
 
     # Filtrar por CUIT único y eliminar duplicados
     columns_to_select = [col for col in ['N_LOCALIDAD', 'N_DEPARTAMENTO', 'CUIT', 'N_EMPRESA', 
@@ -1115,12 +1263,13 @@ def show_companies(df_empresas, geojson_data):
     df_display = df_empresas[columns_to_select + (['PROGRAMAS_LISTA'] if 'PROGRAMAS_LISTA' in df_empresas.columns else [])].drop_duplicates(subset='CUIT')
     df_display = df_display.sort_values(by='CUPO', ascending=False).reset_index(drop=True)
     
-    # Extraer todos los programas únicos para el filtro multiselect
-    programas_unicos = []
-    if 'ADHERIDO' in df_display.columns:
-        # Extraer todos los programas únicos de la columna ADHERIDO
-        todos_programas = df_display['ADHERIDO'].str.split(', ').explode().dropna().unique()
-        programas_unicos = sorted(todos_programas)
+    # Programas y departamentos para los filtros, calculados una vez por versión
+    # (los programas se toman de PROGRAMAS_LISTA: un programa por fila, antes de agrupar por CUIT)
+    if version is not None:
+        opciones = opciones_filtros(('EMPRESAS', version), df_empresas, ('PROGRAMAS_LISTA', 'N_DEPARTAMENTO'))
+    else:
+        opciones = OpcionesFiltros(df_empresas, ('PROGRAMAS_LISTA', 'N_DEPARTAMENTO'))
+    programas_unicos = list(opciones.valores('PROGRAMAS_LISTA')) if 'ADHERIDO' in df_display.columns else []
     st.markdown("<hr style='border: 1px solid #e0e0e0; margin: 20px 0;'>", unsafe_allow_html=True)
     
     # Añadir filtros en la pestaña de empresas
@@ -1139,7 +1288,7 @@ def show_companies(df_empresas, geojson_data):
     with col_filtro2:
         st.markdown('<div class="filter-label">Departamento (Empresas):</div>', unsafe_allow_html=True)
         if 'N_DEPARTAMENTO' in df_display.columns:
-            departamentos = sorted(df_display['N_DEPARTAMENTO'].dropna().unique())
+            departamentos = opciones.valores('N_DEPARTAMENTO')
             selected_dpto = st.selectbox("Seleccionar departamento de empresas", options=["Todos los departamentos"] + departamentos, label_visibility="collapsed")
         else:
             selected_dpto = "Todos los departamentos"
@@ -1147,7 +1296,7 @@ def show_companies(df_empresas, geojson_data):
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Aplicar filtros al dataframe
-    df_filtered = df_display.copy()
+    df_filtered = df_display.copy(deep=False)
     
     # Filtrar por departamento si se seleccionó uno específico
     if selected_dpto != "Todos los departamentos" and 'N_DEPARTAMENTO' in df_filtered.columns:
@@ -1188,7 +1337,7 @@ def show_companies(df_empresas, geojson_data):
     
     if 'PROGRAMAS_LISTA' in df_empresas.columns:
         # Usamos el dataframe original (antes del agrupamiento) para contar correctamente
-        df_empresas_original = df_empresas.copy()
+        df_empresas_original = df_empresas.copy(deep=False)
         
         # Aplicamos los mismos filtros que aplicamos a df_filtered
         if selected_dpto != "Todos los departamentos" and 'N_DEPARTAMENTO' in df_empresas_original.columns:
@@ -1271,7 +1420,7 @@ def show_companies(df_empresas, geojson_data):
 
     # Mostrar el DataFrame con mejor estilo, dentro de un expander
     with st.expander("Ver tabla de empresas adheridas", expanded=False):
-        st.dataframe(df_filtered, hide_index=True, use_container_width=True)
+        st.dataframe(formatear_cuil_cuit(df_filtered), hide_index=True, use_container_width=True)
 
     st.markdown("<hr style='border: 1px solid #e0e0e0; margin: 20px 0;'>", unsafe_allow_html=True)
 
@@ -1326,9 +1475,9 @@ def show_companies(df_empresas, geojson_data):
 
             if len(df_cat_count) > 9:
                 # Tomar el top 9 directamente, sin agregar 'Otros'
-                df_cat_count_final = df_cat_count.head(9).copy()
+                df_cat_count_final = df_cat_count.head(9)
             else:
-                df_cat_count_final = df_cat_count.copy()
+                df_cat_count_final = df_cat_count.copy(deep=False)
 
             if True:
                 # Crear gráfico de barras con texto de categoría y conteo visible
@@ -1419,10 +1568,8 @@ def show_inscriptions(df_inscriptos, df_poblacion, geojson_data, file_date):
         return
     
     try:
-        # Limpiar CUIL
-        if 'CUIL' in df_inscriptos.columns:
-            df_inscriptos['CUIL'] = df_inscriptos['CUIL'].astype(str).str.replace("-", "", regex=False)
-        
+        # CUIL ya viene codificado como entero desde la carga
+
         # Definir mapeo de programas según IDETAPA
         programas = {
             53: "Programa Primer Paso",
@@ -1463,7 +1610,7 @@ def show_inscriptions(df_inscriptos, df_poblacion, geojson_data, file_date):
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Filtrar los datos según el programa seleccionado
-            df_programa = df_inscriptos[df_inscriptos['IDETAPA'] == programa_seleccionado].copy()
+            df_programa = df_inscriptos[df_inscriptos['IDETAPA'] == programa_seleccionado]
         else:
             st.warning("No se encontró la columna IDETAPA en los datos.")
             return
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import os
 from utils.ui_components import display_kpi_row, show_dev_dataframe_info
+from utils.filtros import OpcionesFiltros, opciones_filtros
 
 def show_emprendimientos_dashboard(data=None, dates=None, is_development=False):
     """
@@ -30,21 +31,35 @@ def show_emprendimientos_dashboard(data=None, dates=None, is_development=False):
 
     st.header('Dashboard de Emprendimientos')
 
+    # Opciones de los filtros y mapa departamento → localidades, una vez por versión del archivo
+    columnas_opciones = ('año', 'Departamento', 'Localidad', 'Etapa del emprendimiento', 'Genero')
+    dependencias_opciones = (('Departamento', 'Localidad'),)
+    version = data[nombre_archivo].attrs.get('version')
+    if version is not None:
+        opciones = opciones_filtros((nombre_archivo, version), df, columnas_opciones, dependencias_opciones)
+    else:
+        opciones = OpcionesFiltros(df, columnas_opciones, dependencias_opciones)
+
     # Filtros
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
-        anio_sel = st.selectbox('Año', options=['Todos'] + sorted(df['año'].dropna().unique().astype(int).tolist()))
+        anio_sel = st.selectbox('Año', options=['Todos'] + [int(anio) for anio in opciones.valores('año')])
     with col2:
-        depto_sel = st.selectbox('Departamento', options=['Todos'] + sorted(df['Departamento'].dropna().unique()))
+        depto_sel = st.selectbox('Departamento', options=['Todos'] + opciones.valores('Departamento'))
     with col3:
-        Localidad_sel = st.selectbox('Localidad', options=['Todos'] + sorted(df['Localidad'].dropna().unique()))
+        # Localidades del departamento elegido (o todas)
+        if depto_sel != 'Todos':
+            localidades = opciones.dependientes('Departamento', 'Localidad', depto_sel)
+        else:
+            localidades = opciones.valores('Localidad')
+        Localidad_sel = st.selectbox('Localidad', options=['Todos'] + localidades)
     with col4:
-        etapa_sel = st.selectbox('Etapa del emprendimiento', options=['Todos'] + sorted(df['Etapa del emprendimiento'].dropna().unique()))
+        etapa_sel = st.selectbox('Etapa del emprendimiento', options=['Todos'] + opciones.valores('Etapa del emprendimiento'))
     with col5:
-        genero_sel = st.selectbox('Género', options=['Todos'] + sorted(df['Genero'].dropna().unique()))
+        genero_sel = st.selectbox('Género', options=['Todos'] + opciones.valores('Genero'))
 
     # Aplicar filtros
-    df_filtrado = df.copy()
+    df_filtrado = df.copy(deep=False)
     if anio_sel != 'Todos':
         df_filtrado = df_filtrado[df_filtrado['año'] == anio_sel]
     if depto_sel != 'Todos':
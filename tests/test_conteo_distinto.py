@@ -0,0 +1,82 @@
+# tests/test_conteo_distinto.py
+"""ConteoDistinto debe dar lo mismo que groupby().nunique() sobre las filas originales."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.conteo_distinto import ConteoAproximado, ConteoDistinto
+
+DIMENSIONES = ['DEPARTAMENTO', 'LINEA', 'ESTADO']
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(7)
+    n = 5000
+    datos = pd.DataFrame({
+        # Ids con nulos (no se cuentan) y repetidos entre celdas
+        'CUIL': pd.array(rng.integers(0, 800, n), dtype='Int64'),
+        'DEPARTAMENTO': rng.choice(['CAPITAL', 'COLON', 'PUNILLA', None], n),
+        'LINEA': pd.Categorical(rng.choice(['L1', 'L2', 'L3'], n), categories=['L1', 'L2', 'L3', 'SIN USO']),
+        'ESTADO': rng.choice([1.0, 2.0, np.nan], n),
+    })
+    datos.loc[rng.random(n) < 0.1, 'CUIL'] = pd.NA
+    return datos
+
+def _mascara(df, filtros):
+    mascara = pd.Series(True, index=df.index)
+    for col, valores in (filtros or {}).items():
+        if valores is None:
+            continue
+        if isinstance(valores, (list, tuple, set)):
+            mascara &= df[col].isin(valores)
+        else:
+            mascara &= df[col] == valores
+    return mascara
+
+FILTROS = [
+    None,
+    {'DEPARTAMENTO': 'CAPITAL'},
+    {'DEPARTAMENTO': ['COLON', 'PUNILLA'], 'LINEA': 'L2'},
+    {'LINEA': ['L1', 'L3'], 'ESTADO': 2.0},
+    {'LINEA': 'SIN USO'},
+    {'DEPARTAMENTO': None, 'ESTADO': [1.0]},
+]
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_contar(df, filtros):
+    conteo = ConteoDistinto(df, 'CUIL', DIMENSIONES)
+    assert conteo.contar(filtros) == df.loc[_mascara(df, filtros), 'CUIL'].nunique()
+
+@pytest.mark.parametrize('filtros', FILTROS)
+@pytest.mark.parametrize('por', [['DEPARTAMENTO'], ['LINEA'], ['DEPARTAMENTO', 'ESTADO']])
+def test_contar_por(df, filtros, por):
+    conteo = ConteoDistinto(df, 'CUIL', DIMENSIONES)
+    obtenido = conteo.contar_por(por, filtros, nombre='CUIL')
+
+    esperado = (
+        df[_mascara(df, filtros)]
+        .groupby(por, observed=True)['CUIL'].nunique()
+        .reset_index()
+    )
+    ordenar = lambda tabla: tabla.astype({col: str for col in por}).sort_values(por).reset_index(drop=True)
+    pd.testing.assert_frame_equal(ordenar(obtenido), ordenar(esperado), check_dtype=False)
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_filtrar_y_contar(df, filtros):
+    previo = {'LINEA': ['L1', 'L2']}
+    conteo = ConteoDistinto(df, 'CUIL', DIMENSIONES).filtrar(previo)
+    esperado = df.loc[_mascara(df, previo) & _mascara(df, filtros), 'CUIL'].nunique()
+    assert conteo.contar(filtros) == esperado
+
+def test_sin_ids_validos():
+    df = pd.DataFrame({'CUIL': [None, None], 'DEPARTAMENTO': ['CAPITAL', 'COLON']})
+    conteo = ConteoDistinto(df, 'CUIL', ['DEPARTAMENTO'])
+    assert conteo.contar() == 0
+    assert conteo.contar_por(['DEPARTAMENTO'])['PERSONAS'].tolist() == [0, 0]
+
+@pytest.mark.parametrize('filtros', FILTROS)
+def test_aproximado_cerca_del_exacto(df, filtros):
+    # Con pocas personas rige la corrección de cardinalidades bajas: el error es mínimo
+    aproximado = ConteoAproximado(df, 'CUIL', DIMENSIONES)
+    exacto = df.loc[_mascara(df, filtros), 'CUIL'].nunique()
+    assert abs(aproximado.contar(filtros) - exacto) <= max(2, 0.01 * exacto)
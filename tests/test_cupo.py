@@ -0,0 +1,45 @@
+# tests/test_cupo.py
+"""calcular_cupo_vectorizado debe reproducir calculate_cupo fila a fila."""
+import itertools
+
+import pandas as pd
+import pytest
+
+from moduls.empleo import calculate_cupo, calcular_cupo_vectorizado
+
+PROGRAMAS = ["PPP - PROGRAMA PRIMER PASO [2024]", "EMPLEO +26", "OTRO PROGRAMA"]
+EMPLEADORES = ['S', 'N', None]
+# 0 a 200 empleados: cubre los bordes de los tramos (1, 5, 7, 10, 25, 30, 50, 165)
+CANTIDADES = list(range(0, 201))
+
+@pytest.mark.parametrize('programa', PROGRAMAS)
+def test_cupo_vectorizado_igual_a_fila_a_fila(programa):
+    combinaciones = list(itertools.product(CANTIDADES, EMPLEADORES))
+    df = pd.DataFrame(combinaciones, columns=['CANTIDAD_EMPLEADOS', 'EMPLEADOR']).assign(ADHERIDO=programa)
+
+    esperado = [
+        calculate_cupo(fila.CANTIDAD_EMPLEADOS, fila.EMPLEADOR, fila.ADHERIDO)
+        for fila in df.itertuples(index=False)
+    ]
+    obtenido = calcular_cupo_vectorizado(df['CANTIDAD_EMPLEADOS'], df['EMPLEADOR'], df['ADHERIDO'])
+
+    assert obtenido.tolist() == esperado
+
+def test_cupo_en_bordes_de_tramo():
+    bordes = [0, 1, 2, 5, 6, 10, 11, 25, 26, 50, 51]
+    df = pd.DataFrame({
+        'CANTIDAD_EMPLEADOS': bordes,
+        'EMPLEADOR': 'S',
+        'ADHERIDO': "PPP - PROGRAMA PRIMER PASO [2024]",
+    })
+    obtenido = calcular_cupo_vectorizado(df['CANTIDAD_EMPLEADOS'], df['EMPLEADOR'], df['ADHERIDO'])
+    assert obtenido.tolist() == [0, 1, 1, 1, 2, 2, 3, 3, 6, 10, 6]
+
+def test_cupo_conserva_el_indice():
+    df = pd.DataFrame(
+        {'CANTIDAD_EMPLEADOS': [3, 40], 'EMPLEADOR': ['S', 'N'], 'ADHERIDO': ["EMPLEO +26", "EMPLEO +26"]},
+        index=[10, 20]
+    )
+    obtenido = calcular_cupo_vectorizado(df['CANTIDAD_EMPLEADOS'], df['EMPLEADOR'], df['ADHERIDO'])
+    assert obtenido.index.tolist() == [10, 20]
+    assert obtenido.tolist() == [2, 1]
@@ -0,0 +1,287 @@
+# tests/test_data_cleaning.py
+"""Limpieza y normalización de columnas al cargar los archivos (utils/data_cleaning.py)."""
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import data_cleaning
+from utils.data_cleaning import (
+    calcular_edad, clean_thousand_separator, convert_decimal_separator, normalizar_coordenadas, normalizar_fechas,
+    rango_edad
+)
+
+@pytest.fixture(autouse=True)
+def cache_limpio():
+    data_cleaning._conversiones_cacheadas.clear()
+    yield
+    data_cleaning._conversiones_cacheadas.clear()
+
+def _con_version(df, version):
+    df.attrs['version'] = version
+    return df
+
+# --- clean_thousand_separator ---
+
+def test_miles_convierte_columna_con_separador():
+    df = pd.DataFrame({'MONTO': ['1,234', '56', '-7,890.5'], 'NOMBRE': ['A', 'B', 'C']})
+    resultado = clean_thousand_separator(df)
+    assert resultado['MONTO'].tolist() == [1234, 56, -7890.5]
+    assert resultado['NOMBRE'].dtype == object
+    # El DataFrame original no se modifica
+    assert df['MONTO'].tolist() == ['1,234', '56', '-7,890.5']
+
+def test_miles_enteros_cortos_sin_separador_se_convierten():
+    # Regla histórica: '12' y '345' cumplen el patrón aunque no tengan coma
+    resultado = clean_thousand_separator(pd.DataFrame({'CANTIDAD': ['12', '345']}))
+    assert pd.api.types.is_numeric_dtype(resultado['CANTIDAD'])
+    assert resultado['CANTIDAD'].tolist() == [12, 345]
+
+def test_miles_numeros_largos_sin_separador_quedan_como_texto():
+    # Ningún valor cumple el patrón histórico (más de 3 dígitos sin coma)
+    resultado = clean_thousand_separator(pd.DataFrame({'CODIGO': ['12345', '67890']}))
+    assert resultado['CODIGO'].dtype == object
+
+def test_miles_separador_fuera_de_la_muestra():
+    # 1000 valores: la muestra toma 200 posiciones repartidas y no incluye la posición 1
+    valores = ['1234'] * 1000
+    valores[1] = '5,678'
+    resultado = clean_thousand_separator(pd.DataFrame({'MONTO': valores}))
+    assert resultado['MONTO'].iloc[1] == 5678
+    assert resultado['MONTO'].iloc[0] == 1234
+
+def test_miles_columna_mixta_no_se_convierte():
+    # La muestra es numérica pero hay un texto fuera de ella: la columna queda como estaba
+    valores = ['1,234'] * 1000
+    valores[1] = 'SIN DATO'
+    df = pd.DataFrame({'MONTO': valores})
+    resultado = clean_thousand_separator(df)
+    assert resultado['MONTO'].dtype == object
+    assert resultado['MONTO'].tolist() == valores
+
+def test_miles_muestra_no_numerica_no_se_convierte():
+    resultado = clean_thousand_separator(pd.DataFrame({'DOMICILIO': ['CALLE 1,234', '12']}))
+    assert resultado['DOMICILIO'].tolist() == ['CALLE 1,234', '12']
+
+def test_miles_nulos_se_conservan():
+    resultado = clean_thousand_separator(pd.DataFrame({'MONTO': ['1,000', None, '2']}))
+    assert resultado['MONTO'].iloc[0] == 1000
+    assert pd.isna(resultado['MONTO'].iloc[1])
+
+def test_miles_cache_por_version():
+    df = _con_version(pd.DataFrame({'MONTO': ['1,234', '5']}), 'v1')
+    primero = clean_thousand_separator(df)
+    assert clean_thousand_separator(df) is primero
+    assert primero.attrs['version'] == 'v1+miles'
+
+    # Otra versión del archivo se vuelve a convertir
+    otro = _con_version(pd.DataFrame({'MONTO': ['1,234', '5']}), 'v2')
+    assert clean_thousand_separator(otro) is not primero
+
+def test_miles_sin_version_no_se_cachea():
+    df = pd.DataFrame({'MONTO': ['1,234', '5']})
+    assert clean_thousand_separator(df) is not clean_thousand_separator(df)
+    assert not data_cleaning._conversiones_cacheadas
+
+# --- convert_decimal_separator ---
+
+def test_decimal_convierte_coma_decimal():
+    df = pd.DataFrame({'TASA': ['3,5', '10', '-0,25'], 'NOMBRE': ['A', 'B', 'C']})
+    resultado = convert_decimal_separator(df)
+    assert resultado['TASA'].tolist() == [3.5, 10.0, -0.25]
+    assert resultado['NOMBRE'].dtype == object
+
+def test_decimal_solo_columnas_indicadas():
+    df = pd.DataFrame({'TASA': ['3,5'], 'OTRA': ['1,5']})
+    resultado = convert_decimal_separator(df, columns=['TASA', 'NO_EXISTE'])
+    assert resultado['TASA'].iloc[0] == 3.5
+    assert resultado['OTRA'].iloc[0] == '1,5'
+
+def test_decimal_coma_fuera_de_la_muestra():
+    valores = ['7'] * 1000
+    valores[1] = '2,75'
+    resultado = convert_decimal_separator(pd.DataFrame({'TASA': valores}))
+    assert resultado['TASA'].iloc[1] == 2.75
+
+def test_decimal_columna_mixta_no_se_convierte():
+    valores = ['1,5'] * 1000
+    valores[1] = 'N/D'
+    resultado = convert_decimal_separator(pd.DataFrame({'TASA': valores}))
+    assert resultado['TASA'].dtype == object
+    assert resultado['TASA'].tolist() == valores
+
+def test_decimal_cache_por_version_y_columnas():
+    df = _con_version(pd.DataFrame({'TASA': ['3,5'], 'OTRA': ['1,5']}), 'v1')
+    todas = convert_decimal_separator(df)
+    assert convert_decimal_separator(df) is todas
+    # Las columnas pedidas son parte de la clave del caché
+    solo_tasa = convert_decimal_separator(df, columns=['TASA'])
+    assert solo_tasa is not todas
+    assert solo_tasa['OTRA'].iloc[0] == '1,5'
+
+def test_conversiones_encadenadas_con_cache():
+    df = _con_version(pd.DataFrame({'MONTO': ['1,234'], 'TASA': ['3,5']}), 'v1')
+    miles = clean_thousand_separator(df)
+    resultado = convert_decimal_separator(miles)
+    assert convert_decimal_separator(clean_thousand_separator(df)) is resultado
+    assert resultado.attrs['version'] == 'v1+miles+decimal'
+
+# --- calcular_edad / rango_edad ---
+
+def _fechas(valores):
+    return pd.Series(pd.to_datetime(valores))
+
+@pytest.mark.parametrize('referencia, esperada', [
+    ('2020-05-09', 29),   # día anterior al cumpleaños
+    ('2020-05-10', 30),   # día del cumpleaños
+    ('2020-05-11', 30),
+    ('2020-12-31', 30),
+    ('2021-01-01', 30),
+])
+def test_edad_alrededor_del_cumpleanios(referencia, esperada):
+    assert calcular_edad(_fechas(['1990-05-10']), referencia).tolist() == [esperada]
+
+@pytest.mark.parametrize('referencia, esperada', [
+    ('2001-02-28', 0),    # en años no bisiestos el 29/2 se cumple recién el 1/3
+    ('2001-03-01', 1),
+    ('2004-02-28', 3),
+    ('2004-02-29', 4),
+])
+def test_edad_nacidos_el_29_de_febrero(referencia, esperada):
+    assert calcular_edad(_fechas(['2000-02-29']), referencia).tolist() == [esperada]
+
+def test_edad_con_referencia_por_fila():
+    nacimiento = _fechas(['1990-05-10', '1990-05-10', '2000-02-29'])
+    referencia = _fechas(['2020-05-09', '2020-05-10', '2001-02-28'])
+    edad = calcular_edad(nacimiento, referencia)
+    assert edad.dtype == 'Int16'
+    assert edad.tolist() == [29, 30, 0]
+
+def test_edad_fechas_nulas_o_invalidas():
+    nacimiento = pd.Series(['1990-05-10', None, 'sin fecha', '1850-01-01', '2150-01-01', '2021-01-01'])
+    edad = calcular_edad(nacimiento, '2020-05-10')
+    assert edad.iloc[0] == 30
+    # Nula, no parseable, fuera de [1900, 2100] y nacimiento posterior a la referencia
+    assert edad.iloc[1:].isna().all()
+
+    referencia = _fechas(['2020-05-10', None])
+    assert calcular_edad(_fechas(['1990-05-10', '1990-05-10']), referencia).isna().tolist() == [False, True]
+
+@pytest.mark.parametrize('edad, rango', [
+    (1, '<18'), (17, '<18'),
+    (18, '18-29'), (29, '18-29'),
+    (30, '30-39'), (39, '30-39'),
+    (40, '40-49'), (49, '40-49'),
+    (50, '50-59'), (59, '50-59'),
+    (60, '60-69'), (69, '60-69'),
+    (70, '70+'), (200, '70+'),
+])
+def test_rango_edad_limites(edad, rango):
+    assert rango_edad(pd.Series([edad], dtype='Int16')).tolist() == [rango]
+
+def test_rango_edad_fuera_de_rango_y_nulos():
+    rangos = rango_edad(pd.Series([0, -1, 201, None], dtype='Int16'))
+    assert rangos.isna().all()
+    assert rangos.cat.ordered
+    assert list(rangos.cat.categories) == data_cleaning.RANGOS_EDAD_ETIQUETAS
+
+# --- normalizar_coordenadas ---
+
+def test_coordenadas_varios_puntos_conserva_el_primero():
+    resultado, rechazadas = normalizar_coordenadas(pd.DataFrame({'LATITUD': ['-31.412.345', '-64.1.2.3']}))
+    assert resultado['LATITUD'].iloc[0] == -31.412345
+    # '-64.1.2.3' se lee como -64.123, dentro del rango de latitud
+    assert resultado['LATITUD'].iloc[1] == -64.123
+    assert rechazadas == 0
+
+def test_coordenadas_coma_decimal_y_espacios():
+    df = pd.DataFrame({'LATITUD': ['-31,41', ' -31.4 '], 'LONGITUD': ['-64,18', '-64.2']})
+    resultado, rechazadas = normalizar_coordenadas(df)
+    assert resultado['LATITUD'].tolist() == [-31.41, -31.4]
+    assert resultado['LONGITUD'].tolist() == [-64.18, -64.2]
+    assert resultado['LATITUD'].dtype == 'float64'
+    assert rechazadas == 0
+
+def test_coordenadas_fuera_de_rango_se_descartan():
+    df = pd.DataFrame({
+        'LATITUD': [-31.4, -90.0, 90.0, -90.5, 91.0, -31.4],
+        'LONGITUD': [-64.2, -180.0, 180.0, -64.2, -64.2, 180.5],
+    })
+    resultado, rechazadas = normalizar_coordenadas(df)
+    assert resultado['LATITUD'].isna().tolist() == [False, False, False, True, True, False]
+    assert resultado['LONGITUD'].isna().tolist() == [False, False, False, False, False, True]
+    # Filas con alguna coordenada informada que se descartó
+    assert rechazadas == 3
+
+def test_coordenadas_vacias_no_cuentan_como_rechazadas():
+    df = pd.DataFrame({
+        'LATITUD': ['', None, 'nan', 'sin dato', '-31.4'],
+        'LONGITUD': [np.nan, np.nan, np.nan, -64.2, 'abc'],
+        'OTRA': ['a', 'b', 'c', 'd', 'e'],
+    })
+    original = df.copy()
+    resultado, rechazadas = normalizar_coordenadas(df)
+    assert resultado['LATITUD'].isna().tolist() == [True, True, True, True, False]
+    assert resultado['LONGITUD'].isna().tolist() == [True, True, True, False, True]
+    # Solo 'sin dato' y 'abc' estaban informadas y no se pudieron interpretar
+    assert rechazadas == 2
+    assert resultado['OTRA'].tolist() == ['a', 'b', 'c', 'd', 'e']
+    pd.testing.assert_frame_equal(df, original)
+
+def test_coordenadas_sin_columnas_o_vacio():
+    df = pd.DataFrame({'OTRA': [1]})
+    assert normalizar_coordenadas(df) == (df, 0)
+    vacio = pd.DataFrame({'LATITUD': []})
+    assert normalizar_coordenadas(vacio)[1] == 0
+
+# --- normalizar_fechas ---
+
+def test_fechas_texto_y_fuera_de_rango():
+    df = pd.DataFrame({
+        'FEC_FORM': ['2023-05-17', '1899-12-31', '1900-01-01', '2100-12-31', '2101-01-01', 'no es fecha', None],
+    })
+    resultado = normalizar_fechas(df)
+    assert pd.api.types.is_datetime64_any_dtype(resultado['FEC_FORM'])
+    assert resultado['FEC_FORM'].isna().tolist() == [False, True, False, False, True, True, True]
+    assert resultado['FEC_FORM'].iloc[0] == pd.Timestamp('2023-05-17')
+
+def test_fechas_epoch_desde_parquet():
+    # Los timestamps de parquet (epoch en segundos) llegan como datetime64[s], que admite
+    # fechas fuera del rango de datetime64[ns]
+    segundos = [1684281600, -5364662400, 8267961600, None]  # 2023-05-17, 1800-01-01, 2232-01-02
+    df = pd.DataFrame({'FEC_INICIO_PAGO': pd.array(segundos, dtype='Int64')})
+    df['FEC_INICIO_PAGO'] = pd.to_datetime(df['FEC_INICIO_PAGO'], unit='s').astype('datetime64[s]')
+    resultado = normalizar_fechas(df)
+    assert resultado['FEC_INICIO_PAGO'].iloc[0] == pd.Timestamp('2023-05-17')
+    assert resultado['FEC_INICIO_PAGO'].iloc[1:].isna().all()
+
+def test_fechas_objetos_datetime_fuera_del_rango_de_pandas():
+    df = pd.DataFrame({'FEC_NACIMIENTO': [
+        datetime.datetime(1, 1, 1), datetime.datetime(1990, 5, 10), datetime.datetime(9999, 12, 31), None
+    ]})
+    resultado = normalizar_fechas(df)
+    assert resultado['FEC_NACIMIENTO'].isna().tolist() == [True, False, True, True]
+    # Columnas de fecha sin período precalculado
+    assert 'FEC_NACIMIENTO_ANIO' not in resultado.columns
+
+def test_fechas_con_zona_horaria_quedan_sin_zona():
+    df = pd.DataFrame({'FEC_ALTA': pd.to_datetime(['2023-01-01T10:00:00+03:00'])})
+    resultado = normalizar_fechas(df)
+    assert resultado['FEC_ALTA'].dt.tz is None
+
+def test_fechas_solo_columnas_fec_de_texto():
+    df = pd.DataFrame({'OBSERVACION': ['2023-01-01'], 'FEC_FORM': ['2023-01-01']})
+    resultado = normalizar_fechas(df)
+    assert resultado['OBSERVACION'].tolist() == ['2023-01-01']
+    assert pd.api.types.is_datetime64_any_dtype(resultado['FEC_FORM'])
+
+@pytest.mark.parametrize('columna', data_cleaning.COLUMNAS_FECHA_CON_PERIODO)
+def test_fechas_columnas_de_periodo(columna):
+    df = pd.DataFrame({columna: ['2023-05-17', '2024-12-31', '1850-01-01', None]})
+    resultado = normalizar_fechas(df)
+    assert resultado[f"{columna}_ANIO"].dtype == 'Int16'
+    assert resultado[f"{columna}_ANIO"].tolist()[:2] == [2023, 2024]
+    assert resultado[f"{columna}_ANIO"].iloc[2:].isna().all()
+    assert resultado[f"{columna}_MES"].tolist()[:2] == [pd.Timestamp('2023-05-01'), pd.Timestamp('2024-12-01')]
+    assert resultado[f"{columna}_MES"].iloc[2:].isna().all()
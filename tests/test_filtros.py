@@ -0,0 +1,88 @@
+# tests/test_filtros.py
+"""IndiceFiltros debe reproducir las máscaras ==/isin sobre el DataFrame original."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.filtros import IndiceFiltros
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(3)
+    # Cantidad de filas que no es múltiplo de 8: el último byte de cada bitmap tiene relleno
+    n = 1003
+    datos = pd.DataFrame({
+        'N_DEPARTAMENTO': rng.choice(['CAPITAL', 'COLON', 'PUNILLA', None], n),
+        'N_LOCALIDAD': rng.choice(['A', 'B', 'C', 'D'], n),
+        'N_LINEA_PRESTAMO': rng.choice(['INICIAR EMPRENDIMIENTO', 'POTENCIAR EMPRENDIMIENTO', 'Otras Lineas'], n),
+        'CATEGORIA': rng.choice(['Pagados', 'En Evaluación'], n),
+        'LATITUD': np.where(rng.random(n) < 0.2, np.nan, -31.4),
+    }, index=np.arange(n) * 10)
+    return datos
+
+def _filas(indice, bitmap):
+    return np.unpackbits(bitmap, count=indice.filas).astype(bool)
+
+def _relleno(indice, bitmap):
+    return np.unpackbits(bitmap)[indice.filas:]
+
+def test_mascara_igual_a_comparacion(df):
+    indice = IndiceFiltros(df)
+    for columna in ['N_DEPARTAMENTO', 'N_LOCALIDAD', 'N_LINEA_PRESTAMO', 'CATEGORIA']:
+        for valor in df[columna].dropna().unique():
+            esperado = (df[columna] == valor).to_numpy()
+            assert np.array_equal(_filas(indice, indice.mascara(columna, valor)), esperado)
+
+def test_mascara_lista_igual_a_isin(df):
+    indice = IndiceFiltros(df)
+    valores = ['CAPITAL', 'PUNILLA', 'NO EXISTE']
+    esperado = df['N_DEPARTAMENTO'].isin(valores).to_numpy()
+    assert np.array_equal(_filas(indice, indice.mascara('N_DEPARTAMENTO', valores)), esperado)
+    assert not _filas(indice, indice.mascara('N_DEPARTAMENTO', 'NO EXISTE')).any()
+
+def test_valores(df):
+    indice = IndiceFiltros(df)
+    assert indice.valores('N_DEPARTAMENTO') == sorted(df['N_DEPARTAMENTO'].dropna().unique())
+
+    filas = indice.mascara('N_LOCALIDAD', 'A') & indice.mascara('CATEGORIA', 'Pagados')
+    seleccion = df[(df['N_LOCALIDAD'] == 'A') & (df['CATEGORIA'] == 'Pagados')]
+    assert indice.valores('N_LINEA_PRESTAMO', filas) == sorted(seleccion['N_LINEA_PRESTAMO'].unique())
+
+def test_bitmaps_de_coordenadas(df):
+    indice = IndiceFiltros(df)
+    # Departamento "Otros" de los filtros: filas sin coordenadas
+    assert np.array_equal(_filas(indice, indice.sin_coordenadas), df['LATITUD'].isna().to_numpy())
+    assert np.array_equal(_filas(indice, indice.con_coordenadas), df['LATITUD'].notna().to_numpy())
+    assert indice.contar(indice.sin_coordenadas) == df['LATITUD'].isna().sum()
+    assert not _relleno(indice, indice.sin_coordenadas).any()
+
+def test_sin_columna_de_coordenadas(df):
+    indice = IndiceFiltros(df.drop(columns='LATITUD'))
+    assert indice.contar(indice.con_coordenadas) == len(df)
+    assert indice.contar(indice.sin_coordenadas) == 0
+
+def test_negar_no_activa_el_relleno(df):
+    indice = IndiceFiltros(df)
+    bitmap = indice.mascara('CATEGORIA', 'Pagados')
+    negado = indice.negar(bitmap)
+
+    assert np.array_equal(_filas(indice, negado), (df['CATEGORIA'] != 'Pagados').to_numpy())
+    assert not _relleno(indice, negado).any()
+    assert not _relleno(indice, indice.todas).any()
+    assert indice.contar(negado) + indice.contar(bitmap) == len(df)
+    assert not indice.negar(indice.todas).any()
+
+def test_seleccionar_igual_a_filtrar(df):
+    indice = IndiceFiltros(df)
+    filas = (
+        indice.mascara('N_DEPARTAMENTO', ['CAPITAL', 'COLON'])
+        & indice.mascara('N_LINEA_PRESTAMO', 'Otras Lineas')
+        & indice.con_coordenadas
+    )
+    esperado = df[
+        df['N_DEPARTAMENTO'].isin(['CAPITAL', 'COLON'])
+        & (df['N_LINEA_PRESTAMO'] == 'Otras Lineas')
+        & df['LATITUD'].notna()
+    ]
+    pd.testing.assert_frame_equal(indice.seleccionar(df, filas), esperado)
+    assert indice.seleccionar(df, indice.todas) is df
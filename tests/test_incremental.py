@@ -0,0 +1,71 @@
+# tests/test_incremental.py
+"""preprocesar_incremental debe devolver lo mismo que preprocesar(df) sobre la tabla completa."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from moduls import carga
+
+NOMBRE = 'VT_REPORTES_PPP_MAS26.parquet'
+
+def _preprocesar(df):
+    """Preprocesamiento fila a fila: filtra un estado y agrega una columna calculada."""
+    df = df[df['N_ESTADO_FICHA'] != 'ADHERIDO']
+    return df.assign(EDAD_DOBLE=df['EDAD'] * 2)
+
+def _fichas(ids, version, rng):
+    df = pd.DataFrame({
+        'ID_FICHA': ids,
+        'N_ESTADO_FICHA': rng.choice(['INSCRIPTO', 'BENEFICIARIO', 'ADHERIDO'], len(ids)),
+        'EDAD': rng.integers(18, 60, len(ids)),
+    }, index=np.arange(len(ids)) * 3)
+    df.attrs['version'] = version
+    return df
+
+@pytest.fixture(autouse=True)
+def estado_limpio():
+    carga._estado_incremental.clear()
+    yield
+    carga._estado_incremental.clear()
+
+def _verificar(df):
+    resultado = carga.preprocesar_incremental(NOMBRE, df, _preprocesar)
+    pd.testing.assert_frame_equal(resultado, _preprocesar(df))
+
+def test_inserciones_modificaciones_y_eliminaciones():
+    rng = np.random.default_rng(0)
+    anterior = _fichas(np.arange(1000), 'v1', rng)
+    _verificar(anterior)
+
+    # Se eliminan 100 fichas, se modifican 50 y se insertan 80 intercaladas
+    nuevo = anterior.drop(anterior.index[rng.choice(1000, 100, replace=False)])
+    modificar = nuevo.index[rng.choice(len(nuevo), 50, replace=False)]
+    nuevo.loc[modificar, 'EDAD'] = nuevo.loc[modificar, 'EDAD'] + 1
+    nuevo.loc[modificar[:10], 'N_ESTADO_FICHA'] = 'ADHERIDO'
+    insertadas = _fichas(np.arange(1000, 1080), 'v2', rng)
+    nuevo = pd.concat([nuevo, insertadas]).sample(frac=1, random_state=1).reset_index(drop=True)
+    nuevo.attrs['version'] = 'v2'
+    _verificar(nuevo)
+
+def test_solo_inserciones_al_principio():
+    rng = np.random.default_rng(1)
+    anterior = _fichas(np.arange(500), 'v1', rng)
+    _verificar(anterior)
+
+    nuevo = pd.concat([_fichas(np.arange(500, 520), 'v2', rng), anterior])
+    nuevo.attrs['version'] = 'v2'
+    _verificar(nuevo)
+
+def test_sin_cambios_devuelve_la_tabla_anterior():
+    rng = np.random.default_rng(2)
+    df = _fichas(np.arange(200), 'v1', rng)
+    primera = carga.preprocesar_incremental(NOMBRE, df, _preprocesar)
+    assert carga.preprocesar_incremental(NOMBRE, df, _preprocesar) is primera
+
+def test_estado_acotado(monkeypatch):
+    monkeypatch.setattr(carga, 'ESTADOS_INCREMENTALES_MAXIMOS', 1)
+    rng = np.random.default_rng(3)
+    carga.preprocesar_incremental(NOMBRE, _fichas(np.arange(10), 'v1', rng), _preprocesar)
+    otra = _fichas(np.arange(10), 'v1', rng).rename(columns={'ID_FICHA': 'NRO_SOLICITUD'})
+    carga.preprocesar_incremental('VT_NOMINA_REP_RECUPERO_X_ANIO.parquet', otra, _preprocesar)
+    assert [clave[0] for clave in carga._estado_incremental] == ['VT_NOMINA_REP_RECUPERO_X_ANIO.parquet']
@@ -0,0 +1,78 @@
+# tests/test_territorio.py
+"""
+adjuntar_territorio y los preprocesamientos que trabajan sobre copias superficiales
+no deben modificar la tabla de origen (compartida en caché), con o sin copy-on-write.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.territorio import ZONA_FAVORECIDA, ZONA_REGULAR, adjuntar_territorio
+
+@pytest.fixture(params=[False, True], ids=['sin_cow', 'con_cow'])
+def copy_on_write(request):
+    with pd.option_context('mode.copy_on_write', request.param):
+        yield request.param
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'N_DEPARTAMENTO': ['CAPITAL', 'MINAS', 'NO EXISTE', None],
+        'N_LOCALIDAD': ['CORDOBA CAPITAL', 'SAN CARLOS MINAS', 'X', 'Y'],
+        'ID_LOCALIDAD': pd.array([10, 20, 30, 40], dtype='Int64'),
+        'N_ESTADO_FICHA': ['INSCRIPTO', 'INSCRIPTO', 'INSCRIPTO', 'ADHERIDO'],
+        'BEN_N_ESTADO': ['BAJA POR FINALIZACION DE PROGR', None, None, None],
+        'IDETAPA': pd.array([53, 51, 54, 55], dtype='Int64'),
+        'ID_CERTIFICACION': ['1', '2', None, '4'],
+    })
+
+def test_adjuntar_territorio(df, copy_on_write):
+    resultado = adjuntar_territorio(df, id_localidad_capital=1)
+    assert resultado['N_DEPARTAMENTO'].tolist() == ['CAPITAL', 'MINAS', 'OTROS', 'OTROS']
+    assert resultado['ZONA'].tolist() == [ZONA_REGULAR, ZONA_FAVORECIDA, ZONA_REGULAR, ZONA_REGULAR]
+    assert resultado['N_LOCALIDAD'].tolist() == ['CORDOBA', 'SAN CARLOS MINAS', 'X', 'Y']
+    assert resultado['ID_LOCALIDAD'].tolist() == [1, 20, 30, 40]
+
+def test_adjuntar_territorio_no_modifica_copia_superficial(df, copy_on_write):
+    original = df.copy()
+    adjuntar_territorio(df.copy(deep=False), id_localidad_capital=1)
+    pd.testing.assert_frame_equal(df, original)
+    assert 'ZONA' not in df.columns
+
+def test_preprocesar_postulantes_no_modifica_origen(df, copy_on_write):
+    from moduls.cbamecapacita import _preprocesar_postulantes
+
+    original = df.copy()
+    resultado = _preprocesar_postulantes(df)
+    pd.testing.assert_frame_equal(df, original)
+    assert resultado['N_LOCALIDAD'].iloc[0] == 'CORDOBA'
+    assert resultado['ID_CERTIFICACION'].tolist() == [1, 2, 0, 4]
+
+def test_preprocesar_inscriptos_no_modifica_origen(df, copy_on_write):
+    from moduls.empleo import _preprocesar_inscriptos
+
+    original = df.copy()
+    resultado = _preprocesar_inscriptos(df)
+    pd.testing.assert_frame_equal(df, original)
+    assert resultado['N_ESTADO_FICHA'].tolist() == ['BENEFICIARIO FIN PROGRAMA', 'INSCRIPTO', 'INSCRIPTO']
+    assert resultado['N_DEPARTAMENTO'].tolist() == ['CAPITAL', 'MINAS', 'NO EXISTE']
+
+def test_preprocesar_nomina_no_modifica_origen(copy_on_write):
+    from moduls.bco_gente import _preprocesar_nomina
+
+    df = pd.DataFrame({
+        'N_DEPARTAMENTO': ['CAPITAL', 'PUNILLA', 'OTRO'],
+        'N_LOCALIDAD': ['CORDOBA CAPITAL', 'COSQUIN', 'X'],
+        'ID_LOCALIDAD': pd.array([10, 20, 30], dtype='Int64'),
+        'N_ESTADO_PRESTAMO': ['PAGADO', 'PAGADO', 'PAGADO'],
+        'N_LINEA_PRESTAMO': ['L4.', 'L1', 'POTENCIAR EMPRENDIMIENTO'],
+        'DEUDA': [1.0, 2.0, np.nan],
+        'DEUDA_NO_VENCIDA': [0.0, 1.0, 1.0],
+        'MONTO_OTORGADO': [10.0, 10.0, 10.0],
+    })
+    original = df.copy()
+    resultado = _preprocesar_nomina(df, None)
+    pd.testing.assert_frame_equal(df, original)
+    assert resultado['N_LINEA_PRESTAMO'].tolist() == ['INICIAR EMPRENDIMIENTO', 'Otras Lineas', 'POTENCIAR EMPRENDIMIENTO']
+    assert resultado['N_LOCALIDAD'].iloc[0] == 'CORDOBA'
+    assert resultado['ID_LOCALIDAD'].iloc[0] == 1
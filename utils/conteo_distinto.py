@@ -0,0 +1,320 @@
+# utils/conteo_distinto.py
+"""
+Conteo de personas distintas (CUIL, CUIT, etc.) bajo cualquier combinación de
+filtros, a partir de celdas de un cubo (combinación de dimensiones).
+
+- ConteoDistinto (exacto): cada celda guarda el arreglo ordenado de códigos de las
+  personas que aparecen en ella; el total de una selección de celdas es la unión de
+  esos arreglos, que se resuelve marcando los códigos en un arreglo booleano de una
+  posición por persona.
+- ConteoAproximado (HyperLogLog): cada celda guarda un sketch HyperLogLog denso
+  (2**PRECISION_HLL registros de un byte); los sketches se combinan con el máximo por
+  registro y la cantidad de personas se estima con un error típico de ~0,4%. Ocupa
+  un sketch completo por celda, así que solo conviene con pocas celdas (dimensiones
+  gruesas, ej: departamento × programa).
+
+Ambos exponen la misma interfaz (filtrar, contar, contar_por) y el atributo
+`estimado`, para que la UI pueda rotular los valores aproximados.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from utils.cubo import filtrar_cubo
+
+# Precisión de los sketches HyperLogLog: 2**16 registros (64 KB por celda), error típico
+# 1,04 / sqrt(2**16) ≈ 0,4% (algo más, ~0,45%, cerca de 2**17 personas); ~97% de las
+# estimaciones quedan a menos del 1% del valor exacto
+PRECISION_HLL = 16
+
+# Descripción del error para textos de ayuda de la UI
+DESCRIPCION_ERROR_HLL = "error típico ~0,4%; ~97% de las estimaciones a menos del 1% del valor exacto"
+
+class _ConteoPorCeldas:
+    """
+    Base de los conteos por celda: arma las celdas y resuelve los filtros sobre ellas.
+
+    Las subclases guardan en `_celda` la celda de cada entrada y, en los arreglos
+    listados en `_ARREGLOS`, los datos de cada entrada (paralelos a `_celda`).
+    """
+    _ARREGLOS = ('_celda',)
+    estimado = False
+
+    def _armar_celdas(self, df: pd.DataFrame, dimensiones):
+        """
+        Asigna las celdas (las dimensiones nulas también forman celda).
+
+        Args:
+            df: DataFrame con una fila por registro
+            dimensiones: Columnas de las celdas (se ignoran las que no existen)
+
+        Returns:
+            Arreglo con la celda de cada fila de `df`
+        """
+        dimensiones = [col for col in dimensiones if col in df.columns]
+        celda = df.groupby(dimensiones, dropna=False, observed=True, sort=False).ngroup().to_numpy()
+        _, primeras = np.unique(celda, return_index=True)
+        self.celdas = df[dimensiones].iloc[primeras].reset_index(drop=True)
+        return celda
+
+    def _entradas(self, filtros):
+        """Devuelve la máscara de entradas de las celdas que cumplen `filtros`."""
+        if not filtros:
+            return np.ones(len(self._celda), dtype=bool)
+        seleccion = np.zeros(len(self.celdas), dtype=bool)
+        seleccion[filtrar_cubo(self.celdas, filtros).index.to_numpy()] = True
+        return seleccion[self._celda]
+
+    def _grupos(self, por, filtros):
+        """
+        Agrupa las celdas que cumplen `filtros` por las dimensiones `por`.
+
+        Returns:
+            tuple: (grupo de cada entrada, -1 si no participa; índice con las claves de los grupos)
+        """
+        celdas = filtrar_cubo(self.celdas, filtros or {})
+        agrupado = celdas.groupby(list(por), observed=True)
+        grupos = agrupado.ngroup().fillna(-1).astype(np.int64)
+
+        grupo_de_celda = np.full(len(self.celdas), -1, dtype=np.int64)
+        grupo_de_celda[celdas.index.to_numpy()] = grupos.to_numpy()
+        return grupo_de_celda[self._celda], agrupado.size().index
+
+    def filtrar(self, filtros):
+        """
+        Devuelve un conteo con solo las celdas que cumplen `filtros`.
+
+        Args:
+            filtros: Diccionario {dimensión: valor o lista de valores}; None no filtra
+
+        Returns:
+            Conteo del mismo tipo, restringido a esas celdas
+        """
+        seleccion = filtrar_cubo(self.celdas, filtros).index.to_numpy()
+        nueva_celda = np.full(len(self.celdas), -1, dtype=np.int64)
+        nueva_celda[seleccion] = np.arange(len(seleccion))
+        celda = nueva_celda[self._celda]
+        mantener = celda >= 0
+
+        resultado = copy.copy(self)
+        resultado.celdas = self.celdas.iloc[seleccion].reset_index(drop=True)
+        for arreglo in self._ARREGLOS:
+            setattr(resultado, arreglo, getattr(self, arreglo)[mantener])
+        resultado._celda = celda[mantener]
+        return resultado
+
+class ConteoDistinto(_ConteoPorCeldas):
+    """
+    Personas distintas por celda de un cubo de dimensiones (conteo exacto).
+
+    A diferencia de sumar celdas de un cubo, las personas no se pueden sumar (una
+    persona puede estar en varias celdas): los conteos se obtienen uniendo los
+    conjuntos de personas de las celdas seleccionadas.
+    """
+    _ARREGLOS = ('_celda', '_persona')
+
+    def __init__(self, df: pd.DataFrame, columna_id, dimensiones):
+        """
+        Arma las celdas y sus conjuntos de personas en una sola pasada.
+
+        Args:
+            df: DataFrame con una fila por registro
+            columna_id: Columna que identifica a la persona (los nulos no se cuentan)
+            dimensiones: Columnas de las celdas (se ignoran las que no existen)
+        """
+        codigos_persona, valores_id = pd.factorize(df[columna_id])
+        self.personas = len(valores_id)
+        celda = self._armar_celdas(df, dimensiones)
+
+        # Pares (celda, persona) distintos, ordenados por celda y persona
+        validos = codigos_persona >= 0
+        personas = max(self.personas, 1)
+        pares = np.unique(celda[validos].astype(np.int64) * personas + codigos_persona[validos])
+        self._celda = pares // personas
+        self._persona = pares % personas
+
+    def contar(self, filtros=None):
+        """
+        Cuenta las personas distintas de las celdas que cumplen `filtros`.
+
+        Args:
+            filtros: Diccionario {dimensión: valor o lista de valores}; None no filtra
+
+        Returns:
+            int con la cantidad exacta de personas distintas
+        """
+        vistas = np.zeros(self.personas, dtype=bool)
+        vistas[self._persona[self._entradas(filtros)]] = True
+        return int(np.count_nonzero(vistas))
+
+    def contar_por(self, por, filtros=None, nombre='PERSONAS'):
+        """
+        Cuenta las personas distintas para cada combinación de algunas dimensiones.
+
+        Como en un groupby(...).nunique() sobre las filas originales, las celdas con
+        alguna de las dimensiones `por` nula no se incluyen.
+
+        Args:
+            por: Dimensiones por las que agrupar
+            filtros: Diccionario {dimensión: valor o lista de valores}; None no filtra
+            nombre: Nombre de la columna con el conteo
+
+        Returns:
+            DataFrame con una fila por combinación de `por` y la columna `nombre`
+        """
+        grupo, claves = self._grupos(por, filtros)
+        validos = grupo >= 0
+
+        # Pares (grupo, persona) distintos: cada persona cuenta una vez por grupo
+        personas = max(self.personas, 1)
+        pares = np.unique(grupo[validos] * personas + self._persona[validos])
+        conteos = np.bincount(pares // personas, minlength=len(claves))
+
+        return claves.to_frame(index=False).assign(**{nombre: conteos})
+
+class ConteoAproximado(_ConteoPorCeldas):
+    """
+    Sketches HyperLogLog densos de personas por celda de un cubo de dimensiones.
+
+    Cada celda guarda un arreglo de 2**precision registros (una fila de `_sketches`),
+    por lo que las dimensiones deben ser gruesas (pocas celdas). Las estimaciones no
+    recorren las filas originales: se toma el máximo por registro de los sketches de
+    las celdas seleccionadas.
+    """
+    _ARREGLOS = ('_celda', '_sketches')
+    estimado = True
+
+    def __init__(self, df: pd.DataFrame, columna_id, dimensiones, precision=PRECISION_HLL):
+        """
+        Arma las celdas y sus sketches en una sola pasada.
+
+        Args:
+            df: DataFrame con una fila por registro
+            columna_id: Columna que identifica a la persona (los nulos no se cuentan)
+            dimensiones: Columnas de las celdas (se ignoran las que no existen); deben
+                generar pocas celdas, cada una ocupa 2**precision bytes
+            precision: Bits del hash usados como índice de registro
+        """
+        self.precision = precision
+        self.registros = 1 << precision
+        celda = self._armar_celdas(df, dimensiones)
+
+        # Hash de 64 bits de cada valor distinto (mismo valor => mismo hash en cualquier tabla)
+        codigos_persona, valores_id = pd.factorize(df[columna_id])
+        hash_valores = pd.util.hash_pandas_object(pd.Series(valores_id), index=False).to_numpy()
+        validos = codigos_persona >= 0
+        hashes = hash_valores[codigos_persona[validos]]
+
+        # Primeros `precision` bits: registro; resto: posición del primer bit en 1 (rango)
+        bits_resto = 64 - precision
+        registro = (hashes >> np.uint64(bits_resto)).astype(np.int64)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+        # frexp devuelve la cantidad de bits significativos (exacta: el resto entra en 53 bits)
+        rango = (bits_resto + 1 - np.frexp(resto.astype(np.float64))[1]).astype(np.uint8)
+
+        # Máximo rango por (celda, registro): orden por clave y rango, último de cada clave
+        clave = celda[validos].astype(np.int64) * self.registros + registro
+        orden = np.lexsort((rango, clave))
+        clave, rango = clave[orden], rango[orden]
+        ultimo = np.r_[clave[1:] != clave[:-1], True] if len(clave) else np.zeros(0, dtype=bool)
+        self._sketches = np.zeros((len(self.celdas), self.registros), dtype=np.uint8)
+        self._sketches.reshape(-1)[clave[ultimo]] = rango[ultimo]
+        self._celda = np.arange(len(self.celdas))
+        self._total = None
+
+    def filtrar(self, filtros):
+        """
+        Devuelve un conteo con solo las celdas que cumplen `filtros`.
+
+        Args:
+            filtros: Diccionario {dimensión: valor o lista de valores}; None no filtra
+
+        Returns:
+            ConteoAproximado restringido a esas celdas
+        """
+        resultado = super().filtrar(filtros)
+        resultado._total = None
+        return resultado
+
+    def _combinar(self, seleccion):
+        """
+        Combina los sketches de las entradas seleccionadas (máximo por registro).
+
+        Se recorre sketch a sketch sobre un único arreglo de salida: indexar con la
+        máscara copiaría todos los sketches seleccionados antes de reducirlos. El
+        sketch de todas las celdas se guarda, ya que es el caso sin filtros.
+        """
+        indices = np.flatnonzero(seleccion)
+        todas = len(indices) == len(self._celda)
+        if todas and self._total is not None:
+            return self._total
+        combinado = np.zeros(self.registros, dtype=np.uint8)
+        for indice in indices:
+            np.maximum(combinado, self._sketches[indice], out=combinado)
+        if todas:
+            self._total = combinado
+        return combinado
+
+    def _estimar(self, registros):
+        """
+        Estima la cardinalidad de un sketch denso.
+
+        Trabaja sobre el histograma de rangos (a lo sumo 65 valores) en lugar de
+        sumar 2**-rango registro por registro. Usa la corrección para cardinalidades
+        bajas (conteo lineal de registros vacíos); con hashes de 64 bits no hace falta
+        la de cardinalidades altas.
+        """
+        m = self.registros
+        alfa = 0.7213 / (1 + 1.079 / m)
+        histograma = np.bincount(registros, minlength=1)
+        estimacion = alfa * m * m / (histograma * np.exp2(-np.arange(len(histograma)))).sum()
+        vacios = histograma[0]
+        if estimacion <= 2.5 * m and vacios > 0:
+            estimacion = m * np.log(m / vacios)
+        return int(round(estimacion))
+
+    def contar(self, filtros=None):
+        """
+        Estima las personas distintas de las celdas que cumplen `filtros`.
+
+        Args:
+            filtros: Diccionario {dimensión: valor o lista de valores}; None no filtra
+
+        Returns:
+            int con la cantidad estimada de personas distintas
+        """
+        return self._estimar(self._combinar(self._entradas(filtros)))
+
+    def contar_por(self, por, filtros=None, nombre='PERSONAS'):
+        """
+        Estima las personas distintas para cada combinación de algunas dimensiones.
+
+        Args:
+            por: Dimensiones por las que agrupar (las celdas con alguna nula no se incluyen)
+            filtros: Diccionario {dimensión: valor o lista de valores}; None no filtra
+            nombre: Nombre de la columna con la estimación
+
+        Returns:
+            DataFrame con una fila por combinación de `por` y la columna `nombre`
+        """
+        grupo, claves = self._grupos(por, filtros)
+
+        # Un sketch por grupo: máximo por registro de los sketches de sus celdas
+        conteos = [self._estimar(self._combinar(grupo == indice)) for indice in range(len(claves))]
+
+        return claves.to_frame(index=False).assign(**{nombre: conteos})
+
+def formatear_conteo(valor, estimado=False):
+    """
+    Formatea un conteo con separador de miles, rotulando los valores estimados.
+
+    Args:
+        valor: Cantidad (exacta o estimada)
+        estimado: True si proviene de un ConteoAproximado
+
+    Returns:
+        str, ej: '1.234' o '≈ 1.234 (estimado)'
+    """
+    texto = f"{int(valor):,}".replace(',', '.')
+    return f"≈ {texto} (estimado)" if estimado else texto
@@ -0,0 +1,86 @@
+# utils/cubo.py
+"""
+Cubos pre-agregados: una tabla con una fila (celda) por combinación de dimensiones y
+las medidas de esa celda (cantidad de filas, conteos y sumas). Las vistas filtran y
+suman celdas en lugar de recorrer las filas originales.
+"""
+import pandas as pd
+
+# Medida con la cantidad de filas originales de cada celda
+COLUMNA_CANTIDAD = 'CANTIDAD'
+
+def construir_cubo(df: pd.DataFrame, dimensiones, sumas=(), conteos=None, extremos=()) -> pd.DataFrame:
+    """
+    Agrega un DataFrame por todas sus dimensiones en una sola pasada.
+
+    Las celdas con dimensiones nulas se conservan (dropna=False), así los totales
+    del cubo coinciden con los de la tabla original.
+
+    Args:
+        df: DataFrame a agregar
+        dimensiones: Columnas de agrupamiento (se ignoran las que no existen)
+        sumas: Columnas numéricas a sumar (los nulos no suman)
+        conteos: Diccionario {medida: columna} con conteos de valores no nulos
+        extremos: Columnas (ej: fechas) de las que se guarda el mínimo y el máximo de
+            cada celda, como <COL>_MIN y <COL>_MAX
+
+    Returns:
+        DataFrame con las dimensiones, CANTIDAD, los conteos, las sumas y los extremos
+    """
+    dimensiones = [col for col in dimensiones if col in df.columns]
+    agregaciones = {COLUMNA_CANTIDAD: (dimensiones[0], 'size')}
+    for medida, col in (conteos or {}).items():
+        if col in df.columns:
+            agregaciones[medida] = (col, 'count')
+    for col in sumas:
+        if col in df.columns:
+            agregaciones[col] = (col, 'sum')
+    for col in extremos:
+        if col in df.columns:
+            agregaciones[f"{col}_MIN"] = (col, 'min')
+            agregaciones[f"{col}_MAX"] = (col, 'max')
+
+    return (
+        df.groupby(dimensiones, dropna=False, observed=True, sort=False)
+        .agg(**agregaciones)
+        .reset_index()
+    )
+
+def filtrar_cubo(cubo: pd.DataFrame, filtros) -> pd.DataFrame:
+    """
+    Devuelve las celdas del cubo que cumplen todos los filtros.
+
+    Args:
+        cubo: Cubo devuelto por construir_cubo
+        filtros: Diccionario {dimensión: valor o lista de valores}; None no filtra
+
+    Returns:
+        DataFrame con las celdas seleccionadas
+    """
+    mascara = pd.Series(True, index=cubo.index)
+    for col, valores in filtros.items():
+        if valores is None:
+            continue
+        if isinstance(valores, (list, tuple, set)):
+            mascara &= cubo[col].isin(valores)
+        else:
+            mascara &= cubo[col] == valores
+    return cubo[mascara]
+
+def sumar_cubo(cubo: pd.DataFrame, por, medidas=None) -> pd.DataFrame:
+    """
+    Suma las medidas de las celdas agrupando por algunas dimensiones.
+
+    Como en un groupby sobre las filas originales, las celdas con alguna de las
+    dimensiones `por` nula no se incluyen.
+
+    Args:
+        cubo: Cubo (o selección de celdas) devuelto por construir_cubo/filtrar_cubo
+        por: Dimensiones por las que agrupar
+        medidas: Medidas a sumar (None = CANTIDAD)
+
+    Returns:
+        DataFrame con una fila por combinación de `por` y las medidas sumadas
+    """
+    medidas = list(medidas or [COLUMNA_CANTIDAD])
+    return cubo.groupby(list(por), observed=True)[medidas].sum().reset_index()
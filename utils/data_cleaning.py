@@ -1,42 +1,437 @@
+import threading
+
+import numpy as np
 import pandas as pd
 
+# Catálogo de precisión para columnas de punto flotante (por prefijo de nombre).
+# Los montos se mantienen en float64 para que las sumas sean exactas al centavo;
+# promedios, porcentajes y tasas toleran float32.
+PRECISION_FLOTANTES = [
+    (('MONTO', 'DEUDA', 'RECUPERADO', 'IMPORTE'), 'float64'),
+    (('LATITUD', 'LONGITUD'), 'float64'),
+    (('PROMEDIO', 'PORCENTAJE', 'TASA'), 'float32'),
+]
+PRECISION_FLOTANTE_DEFAULT = 'float64'
+
+# Columnas enteras que pueden llegar como float por tener nulos
+PREFIJOS_ENTEROS = ('ID', 'NRO_')
+COLUMNAS_ENTERAS = {'EDAD', 'CUPO', 'CANTIDAD_EMPLEADOS', 'VACANTES'}
+
+# Rango de fechas válidas: lo que queda fuera se considera un error de carga (NaT)
+FECHA_MINIMA_VALIDA = pd.Timestamp('1900-01-01')
+FECHA_MAXIMA_VALIDA = pd.Timestamp('2100-12-31')
+
+# Fechas para las que se precalculan claves de año y mes (<COL>_ANIO, <COL>_MES)
+COLUMNAS_FECHA_CON_PERIODO = ['FEC_FORM', 'FEC_INICIO_PAGO', 'FEC_INICIO']
+
+# Rango válido de cada columna de coordenadas: lo que queda fuera se descarta (NaN)
+LIMITES_COORDENADAS = {
+    'LATITUD': (-90.0, 90.0),
+    'LONGITUD': (-180.0, 180.0),
+}
+VALORES_COORDENADA_VACIA = ['', 'nan', 'NaN', 'None', 'none', 'null', '<NA>']
+
+# Claves fiscales que se codifican como enteros al cargar (el texto con guiones solo se arma para mostrar)
+COLUMNAS_CUIL_CUIT = ['CUIL', 'CUIT', 'EMP_CUIT']
+DIGITOS_MAXIMOS_CUIL_CUIT = 18  # mayor cantidad de dígitos que entra en un int64
+
+# Rangos de edad usados en todos los tableros
+RANGOS_EDAD_LIMITES = [0, 17, 29, 39, 49, 59, 69, 200]
+RANGOS_EDAD_ETIQUETAS = ['<18', '18-29', '30-39', '40-49', '50-59', '60-69', '70+']
+
+def _tipo_entero_minimo(valores):
+    """Devuelve el tipo Int nullable más chico que contiene todos los valores (o None)."""
+    if valores.empty:
+        return 'Int8'
+    minimo, maximo = valores.min(), valores.max()
+    for tipo in ('Int8', 'Int16', 'Int32', 'Int64'):
+        limites = np.iinfo(tipo.lower())
+        if minimo >= limites.min and maximo <= limites.max:
+            return tipo
+    return None
+
+def _precision_flotante(columna):
+    """Devuelve el dtype float que corresponde a la columna según el catálogo."""
+    nombre = str(columna).upper()
+    for prefijos, tipo in PRECISION_FLOTANTES:
+        if nombre.startswith(prefijos):
+            return tipo
+    return PRECISION_FLOTANTE_DEFAULT
+
+def optimizar_tipos_numericos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce el tamaño de las columnas numéricas una sola vez, al cargar el archivo.
+
+    - Enteros: se pasan al tipo Int nullable más chico que contiene sus valores.
+    - Flotantes de columnas enteras (IDs, NRO_, EDAD, CUPO...) que solo tienen
+      valores enteros y nulos: se pasan a Int nullable en lugar de float64.
+    - Resto de flotantes: precisión según PRECISION_FLOTANTES.
+
+    Args:
+        df: DataFrame recién cargado
+
+    Returns:
+        El mismo DataFrame con los tipos numéricos optimizados
+    """
+    if df is None or df.empty:
+        return df
+
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_bool_dtype(serie) or not pd.api.types.is_numeric_dtype(serie):
+            continue
+
+        if pd.api.types.is_integer_dtype(serie):
+            tipo = _tipo_entero_minimo(serie.dropna())
+            if tipo is not None and serie.dtype != tipo:
+                df[col] = serie.astype(tipo)
+        elif pd.api.types.is_float_dtype(serie):
+            nombre = str(col).upper()
+            es_entera = nombre.startswith(PREFIJOS_ENTEROS) or nombre in COLUMNAS_ENTERAS
+            valores = serie.dropna()
+            if es_entera and np.isfinite(valores).all() and (valores % 1 == 0).all():
+                tipo = _tipo_entero_minimo(valores)
+                if tipo is not None:
+                    df[col] = serie.astype(tipo)
+                    continue
+            tipo = _precision_flotante(col)
+            if serie.dtype != tipo:
+                df[col] = serie.astype(tipo)
+    return df
+
+def normalizar_fechas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte las columnas de fecha a datetime64 una sola vez, al cargar el archivo.
+
+    Se procesan las columnas que ya son datetime y las de texto/objeto cuyo nombre
+    empieza con FEC_ (incluye las que llegan como objetos datetime por estar fuera
+    del rango de pandas). Los valores no parseables o fuera de
+    [FECHA_MINIMA_VALIDA, FECHA_MAXIMA_VALIDA] quedan como NaT. Para las columnas de
+    COLUMNAS_FECHA_CON_PERIODO se agregan <COL>_ANIO (Int16) y <COL>_MES (primer día
+    del mes), para agrupar sin volver a derivarlas en cada sección.
+
+    Args:
+        df: DataFrame recién cargado
+
+    Returns:
+        El mismo DataFrame con las fechas normalizadas
+    """
+    if df is None or df.empty:
+        return df
+
+    for col in list(df.columns):
+        serie = df[col]
+        es_fecha = pd.api.types.is_datetime64_any_dtype(serie)
+        if not es_fecha and not (str(col).upper().startswith('FEC_') and (serie.dtype == object or pd.api.types.is_string_dtype(serie))):
+            continue
+
+        fechas = pd.to_datetime(serie, errors='coerce')
+        if getattr(fechas.dt, 'tz', None) is not None:
+            fechas = fechas.dt.tz_localize(None)
+        fechas = fechas.where((fechas >= FECHA_MINIMA_VALIDA) & (fechas <= FECHA_MAXIMA_VALIDA))
+        df[col] = fechas
+
+        if col in COLUMNAS_FECHA_CON_PERIODO:
+            df[f"{col}_ANIO"] = fechas.dt.year.astype('Int16')
+            df[f"{col}_MES"] = fechas.dt.to_period('M').dt.to_timestamp()
+    return df
+
+def codificar_cuil_cuit(df: pd.DataFrame, columnas=None) -> pd.DataFrame:
+    """
+    Codifica las columnas de CUIL/CUIT como enteros Int64 una sola vez, al cargar.
+
+    Se conservan solo los dígitos ("20-12345678-9" y 20123456789 dan la misma clave),
+    así los cruces, isin y nunique trabajan sobre enteros y no sobre texto. Los
+    valores sin dígitos quedan como NA. Para mostrar usar formatear_cuil_cuit.
+
+    Args:
+        df: DataFrame recién cargado
+        columnas: Columnas a codificar (None = COLUMNAS_CUIL_CUIT)
+
+    Returns:
+        El mismo DataFrame con las claves codificadas
+    """
+    if df is None or df.empty:
+        return df
+
+    for col in [col for col in (columnas or COLUMNAS_CUIL_CUIT) if col in df.columns]:
+        serie = df[col]
+        if pd.api.types.is_integer_dtype(serie):
+            if serie.dtype != 'Int64':
+                df[col] = serie.astype('Int64')
+            continue
+        if pd.api.types.is_float_dtype(serie):
+            valores = serie.where(np.isfinite(serie) & (serie % 1 == 0))
+            df[col] = valores.astype('Int64')
+            continue
+
+        # Texto: se descarta un ".0" final (valores exportados como float) y todo lo que no sea dígito
+        digitos = (serie.astype('string')
+                   .str.replace(r'\.0+$', '', regex=True)
+                   .str.replace(r'\D', '', regex=True))
+        digitos = digitos.where(digitos.str.len().between(1, DIGITOS_MAXIMOS_CUIL_CUIT))
+        df[col] = pd.to_numeric(digitos, errors='coerce').astype('Int64')
+    return df
+
+def formatear_cuil_cuit(df: pd.DataFrame, columnas=None) -> pd.DataFrame:
+    """
+    Devuelve una copia para mostrar/descargar con CUIL/CUIT como texto XX-XXXXXXXX-X.
+
+    Las claves que no tienen 11 dígitos se muestran sin guiones.
+
+    Args:
+        df: DataFrame con las claves codificadas por codificar_cuil_cuit
+        columnas: Columnas a formatear (None = COLUMNAS_CUIL_CUIT)
+
+    Returns:
+        DataFrame nuevo con las columnas formateadas como texto
+    """
+    columnas = [col for col in (columnas or COLUMNAS_CUIL_CUIT) if col in df.columns]
+    if not columnas:
+        return df
+
+    formateadas = {}
+    for col in columnas:
+        texto = df[col].astype('string')
+        completo = texto.str.len() == 11
+        formateadas[col] = texto.mask(completo, texto.str[:2] + '-' + texto.str[2:10] + '-' + texto.str[10:])
+    return df.assign(**formateadas)
+
+def _fecha_como_entero(fechas):
+    """Codifica fechas datetime64 como enteros AAAAMMDD (NaT queda como NA)."""
+    return (fechas.dt.year * 10000 + fechas.dt.month * 100 + fechas.dt.day).astype('Int64')
+
+def calcular_edad(fecha_nacimiento: pd.Series, fecha_referencia) -> pd.Series:
+    """
+    Calcula la edad exacta (años cumplidos) a una fecha de referencia.
+
+    Usa aritmética entera sobre las fechas codificadas como AAAAMMDD: la división
+    entera por 10000 de la diferencia descuenta el año si todavía no se cumplió
+    el aniversario, sin recorrer filas.
+
+    Args:
+        fecha_nacimiento: Serie datetime64 con las fechas de nacimiento
+        fecha_referencia: Serie datetime64 alineada o una fecha única
+
+    Returns:
+        Serie Int16 con la edad (NA si falta alguna de las fechas, si alguna queda
+        fuera de [FECHA_MINIMA_VALIDA, FECHA_MAXIMA_VALIDA] o si el nacimiento es
+        posterior a la referencia)
+    """
+    def _validas(fechas):
+        fechas = pd.to_datetime(fechas, errors='coerce')
+        return fechas.where((fechas >= FECHA_MINIMA_VALIDA) & (fechas <= FECHA_MAXIMA_VALIDA))
+
+    nacimiento = _fecha_como_entero(_validas(fecha_nacimiento))
+    if isinstance(fecha_referencia, pd.Series):
+        referencia = _fecha_como_entero(_validas(fecha_referencia))
+    else:
+        fecha_referencia = pd.Timestamp(fecha_referencia)
+        referencia = fecha_referencia.year * 10000 + fecha_referencia.month * 100 + fecha_referencia.day
+    edad = (referencia - nacimiento) // 10000
+    return edad.where(edad >= 0).astype('Int16')
+
+def rango_edad(edad: pd.Series) -> pd.Series:
+    """
+    Asigna el rango de edad (RANGOS_EDAD_ETIQUETAS) a cada edad.
+
+    Los intervalos son cerrados a derecha sobre RANGOS_EDAD_LIMITES: 17 es '<18',
+    18 es '18-29' y 70 es '70+'. Las edades fuera de (0, 200] y las nulas quedan sin rango.
+
+    Args:
+        edad: Serie numérica de edades
+
+    Returns:
+        Serie categórica ordenada con el rango de edad
+    """
+    return pd.cut(edad.astype('float64'), bins=RANGOS_EDAD_LIMITES, labels=RANGOS_EDAD_ETIQUETAS, right=True)
+
+def normalizar_coordenadas(df: pd.DataFrame, columnas=None):
+    """
+    Convierte LATITUD/LONGITUD a float64 con operaciones vectorizadas.
+
+    Acepta coma decimal ("-31,41") y valores con varios puntos ("-31.412.345"), de
+    los que se conserva solo el primero (-31.412345). Los valores que no se pueden
+    interpretar o quedan fuera de LIMITES_COORDENADAS pasan a NaN.
+
+    Args:
+        df: DataFrame a procesar (no se modifica)
+        columnas: Columnas de coordenadas a procesar (None = las de LIMITES_COORDENADAS)
+
+    Returns:
+        tuple: (DataFrame con las coordenadas normalizadas, cantidad de filas con
+        alguna coordenada informada que se descartó)
+    """
+    if df is None or df.empty:
+        return df, 0
+
+    columnas = [col for col in (columnas or LIMITES_COORDENADAS) if col in df.columns]
+    if not columnas:
+        return df, 0
+
+    rechazadas = np.zeros(len(df), dtype=bool)
+    nuevas = {}
+    for col in columnas:
+        serie = df[col]
+        if pd.api.types.is_numeric_dtype(serie):
+            informado = serie.notna()
+            valores = serie.astype('float64')
+        else:
+            texto = serie.astype('string').str.strip()
+            informado = texto.notna() & ~texto.isin(VALORES_COORDENADA_VACIA)
+            texto = texto.str.replace(',', '.', regex=False)
+            # Conservar solo el primer punto como separador decimal
+            partes = texto.str.partition('.')
+            texto = partes[0] + partes[1] + partes[2].str.replace('.', '', regex=False)
+            valores = pd.to_numeric(texto.where(informado), errors='coerce').astype('float64')
+
+        minimo, maximo = LIMITES_COORDENADAS.get(col, (-np.inf, np.inf))
+        valores = valores.where((valores >= minimo) & (valores <= maximo))
+        rechazadas |= (informado & valores.isna()).to_numpy(dtype=bool)
+        nuevas[col] = valores
+
+    return df.assign(**nuevas), int(rechazadas.sum())
+
+# Detección de columnas numéricas guardadas como texto
+TAMANIO_MUESTRA_TIPOS = 200
+PATRON_NUMERO_CON_MILES = r'^-?\d{1,3}(,\d{3})+(\.\d+)?$|^-?\d+(\.\d+)?$'
+PATRON_NUMERO_CON_COMA_DECIMAL = r'^-?\d+(,\d+)?$'
+# Regla histórica de clean_thousand_separator: la columna se convierte si algún valor
+# tiene este formato (incluye enteros de hasta 3 dígitos sin separador, ej: '12', '345')
+PATRON_VALOR_CON_MILES = r'^-?\d{1,3}(,\d{3})*(\.\d+)?$'
+
+# Resultados de las conversiones por versión del archivo de origen
+_MAX_CONVERSIONES_CACHEADAS = 16
+_conversiones_cacheadas = {}
+_lock_conversiones = threading.Lock()
+
+def _muestra(serie: pd.Series) -> pd.Series:
+    """Toma hasta TAMANIO_MUESTRA_TIPOS valores no nulos repartidos a lo largo de la serie."""
+    valores = serie.dropna()
+    if len(valores) <= TAMANIO_MUESTRA_TIPOS:
+        return valores
+    posiciones = np.linspace(0, len(valores) - 1, TAMANIO_MUESTRA_TIPOS).astype(int)
+    return valores.iloc[posiciones]
+
+def _es_texto(serie: pd.Series) -> bool:
+    return serie.dtype == object or pd.api.types.is_string_dtype(serie)
+
+def _convertir_si_es_numerica(serie: pd.Series, separador: str, reemplazo: str, patron_requerido=None):
+    """
+    Convierte toda la columna a número reemplazando el separador indicado.
+
+    Args:
+        patron_requerido: Si se indica, la columna solo se convierte si algún valor
+            (de toda la columna, no solo de la muestra) coincide con este patrón
+
+    Returns:
+        La serie numérica, o None si algún valor informado no es un número
+        (la columna no se convierte, como hacía errors='ignore').
+    """
+    texto = serie.astype('string').str.strip()
+    if patron_requerido is not None and not texto.str.fullmatch(patron_requerido).any():
+        return None
+    numeros = pd.to_numeric(texto.str.replace(separador, reemplazo, regex=False), errors='coerce')
+    if (numeros.isna() & serie.notna()).any():
+        return None
+    # Enteros quedan como Int64 nullable; los decimales como float64 (NaN para nulos)
+    return numeros.astype('float64') if pd.api.types.is_float_dtype(numeros) else numeros
+
+def _con_cache(tipo, df, columnas, convertir):
+    """
+    Devuelve la conversión cacheada para la versión del archivo de origen, o la calcula.
+
+    Solo se cachea cuando df.attrs trae 'version' (asignada por el cargador); la clave
+    incluye forma y columnas para no confundir tablas derivadas de la misma fuente.
+    Un resultado nuevo recibe su propia versión, para poder encadenar conversiones.
+    """
+    version = df.attrs.get('version')
+    if version is None:
+        return convertir()
+    clave = (tipo, version, df.shape, tuple(df.columns), tuple(columnas) if columnas is not None else None)
+    with _lock_conversiones:
+        resultado = _conversiones_cacheadas.get(clave)
+    if resultado is not None:
+        return resultado
+
+    # La conversión se calcula fuera del lock; si dos sesiones la calculan a la vez,
+    # se conserva la primera que se guardó
+    resultado = convertir()
+    if resultado is not df:
+        resultado.attrs['version'] = f"{version}+{tipo}"
+    with _lock_conversiones:
+        if clave not in _conversiones_cacheadas:
+            if len(_conversiones_cacheadas) >= _MAX_CONVERSIONES_CACHEADAS:
+                _conversiones_cacheadas.pop(next(iter(_conversiones_cacheadas)))
+            _conversiones_cacheadas[clave] = resultado
+        return _conversiones_cacheadas[clave]
+
 def clean_thousand_separator(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Limpia el separador de miles (",") en todas las columnas tipo string que parezcan numéricas y convierte a tipo numérico.
-    Devuelve el DataFrame modificado (inplace).
+    Limpia el separador de miles (",") en las columnas de texto que parezcan numéricas
+    y las convierte a tipo numérico.
+
+    La muestra de cada columna solo elige las candidatas (todos sus valores son números,
+    con o sin separador de miles). Sobre la columna completa, en una pasada vectorizada,
+    se aplica la regla histórica: se convierte si algún valor cumple PATRON_VALOR_CON_MILES
+    (aunque sea poco frecuente y no aparezca en la muestra), lo que incluye columnas de
+    enteros cortos sin separador como ['12', '345']; se descarta si algún valor no es
+    numérico (como errors='ignore'). El resultado se cachea por versión del archivo de origen.
+
+    Args:
+        df: DataFrame a procesar (no se modifica)
+
+    Returns:
+        DataFrame nuevo con las columnas convertidas (compartido si viene del caché)
     """
-    if df is not None:
+    if df is None:
+        return None
+
+    def convertir():
+        nuevas = {}
         for col in df.columns:
-            if df[col].dtype == object:
-                # Si hay string con ',' y parecen números, limpiar
-                if df[col].str.contains(r'^-?\d{1,3}(,\d{3})*(\.\d+)?$', na=False).any():
-                    df[col] = df[col].str.replace(',', '', regex=False)
-                    df[col] = pd.to_numeric(df[col], errors='ignore')
-    return df
+            if not _es_texto(df[col]):
+                continue
+            muestra = _muestra(df[col]).astype('string').str.strip()
+            if muestra.empty or not muestra.str.fullmatch(PATRON_NUMERO_CON_MILES).all():
+                continue
+            numeros = _convertir_si_es_numerica(df[col], ',', '', patron_requerido=PATRON_VALOR_CON_MILES)
+            if numeros is not None:
+                nuevas[col] = numeros
+        return df.assign(**nuevas) if nuevas else df
+
+    return _con_cache('miles', df, None, convertir)
 
 def convert_decimal_separator(df: pd.DataFrame, columns=None) -> pd.DataFrame:
     """
     Convierte separadores decimales de coma a punto en columnas específicas o todas.
-    Reemplaza las comas por puntos en valores que parecen decimales,
-    siguiendo el enfoque de bco_gente.py.
+
+    Igual que clean_thousand_separator, decide con una muestra qué columnas de texto
+    son números con coma decimal y solo convierte esas, de forma vectorizada y con el
+    resultado cacheado por versión del archivo de origen.
     
     Args:
-        df: DataFrame a procesar
+        df: DataFrame a procesar (no se modifica)
         columns: Lista opcional de columnas a procesar (None = todas)
         
     Returns:
-        DataFrame procesado
+        DataFrame nuevo con las columnas convertidas (compartido si viene del caché)
     """
     if df is None:
         return None
-        
-    cols_to_process = columns if columns else df.columns
-    
-    for col in cols_to_process:
-        if col in df.columns and df[col].dtype == object:
-            # Reemplazar comas por puntos en valores que podrían ser decimales
-            df[col] = df[col].astype(str).str.replace(",", ".", regex=False)
-            # Intentar convertir a numérico
-            df[col] = pd.to_numeric(df[col], errors='ignore')
-    
-    return df
+
+    def convertir():
+        nuevas = {}
+        cols_to_process = columns if columns else df.columns
+        for col in cols_to_process:
+            if col not in df.columns or not _es_texto(df[col]):
+                continue
+            muestra = _muestra(df[col]).astype('string').str.strip()
+            if muestra.empty or not muestra.str.fullmatch(PATRON_NUMERO_CON_COMA_DECIMAL).all():
+                continue
+            numeros = _convertir_si_es_numerica(df[col], ',', '.')
+            if numeros is not None:
+                nuevas[col] = numeros
+        return df.assign(**nuevas) if nuevas else df
+
+    return _con_cache('decimal', df, columns, convertir)
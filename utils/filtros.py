@@ -0,0 +1,166 @@
+# utils/filtros.py
+"""
+Índice de filtros por bitmaps: para cada valor de las columnas de filtro se guarda
+el conjunto de filas que lo contienen como un arreglo de bits empaquetado
+(np.packbits, 1 bit por fila). Cualquier combinación de filtros se resuelve con
+AND/OR entre bitmaps en lugar de recorrer el DataFrame completo.
+
+También provee las listas de opciones de los filtros (OpcionesFiltros), calculadas
+una sola vez por versión del dataset.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Columnas que se indexan por defecto en las tablas de préstamos
+COLUMNAS_FILTRO = ['N_DEPARTAMENTO', 'N_LOCALIDAD', 'N_LINEA_PRESTAMO', 'CATEGORIA']
+
+class IndiceFiltros:
+    """
+    Bitmaps de filas por valor de cada columna de filtro de un DataFrame.
+
+    El índice corresponde a una versión del DataFrame: las posiciones de los bits son
+    las posiciones de las filas, por lo que solo debe usarse con la misma tabla (o una
+    copia con el mismo orden de filas) con la que se construyó.
+    """
+
+    def __init__(self, df: pd.DataFrame, columnas=None, columna_coordenadas='LATITUD'):
+        """
+        Construye los bitmaps en una sola pasada por columna.
+
+        Args:
+            df: DataFrame a indexar
+            columnas: Columnas de filtro (None = COLUMNAS_FILTRO presentes en df)
+            columna_coordenadas: Columna cuyo valor no nulo indica que la fila tiene
+                coordenadas (se guarda como bitmap aparte)
+        """
+        self.filas = len(df)
+        self.todas = np.packbits(np.ones(self.filas, dtype=bool))
+        self.bitmaps = {}
+
+        for col in [col for col in (columnas or COLUMNAS_FILTRO) if col in df.columns]:
+            codigos, valores = pd.factorize(df[col], sort=True)
+            self.bitmaps[col] = {
+                valor: np.packbits(codigos == codigo)
+                for codigo, valor in enumerate(valores)
+            }
+
+        if columna_coordenadas in df.columns:
+            self.con_coordenadas = np.packbits(df[columna_coordenadas].notna().to_numpy())
+        else:
+            self.con_coordenadas = self.todas
+        self.sin_coordenadas = self.negar(self.con_coordenadas)
+
+    def negar(self, bitmap):
+        """Devuelve el complemento de un bitmap (sin activar los bits de relleno)."""
+        return ~bitmap & self.todas
+
+    def mascara(self, columna, valores):
+        """
+        Devuelve el bitmap de las filas cuya `columna` es alguno de `valores`.
+
+        Args:
+            columna: Columna indexada
+            valores: Valor único o lista de valores (los que no existen no aportan filas)
+
+        Returns:
+            Bitmap empaquetado (np.uint8)
+        """
+        if isinstance(valores, str) or not hasattr(valores, '__iter__'):
+            valores = [valores]
+        resultado = np.zeros_like(self.todas)
+        for valor in valores:
+            bitmap = self.bitmaps[columna].get(valor)
+            if bitmap is not None:
+                resultado |= bitmap
+        return resultado
+
+    def valores(self, columna, bitmap=None):
+        """
+        Devuelve los valores de `columna` presentes en las filas de `bitmap`, ordenados.
+
+        Args:
+            columna: Columna indexada
+            bitmap: Filas a considerar (None = todas)
+
+        Returns:
+            Lista de valores no nulos
+        """
+        if bitmap is None:
+            return list(self.bitmaps[columna])
+        return [valor for valor, bits in self.bitmaps[columna].items() if (bits & bitmap).any()]
+
+    def contar(self, bitmap):
+        """Devuelve la cantidad de filas activas en un bitmap."""
+        return int(np.unpackbits(bitmap, count=self.filas).sum())
+
+    def seleccionar(self, df: pd.DataFrame, bitmap):
+        """
+        Devuelve las filas de `df` activas en `bitmap`, por posición.
+
+        Args:
+            df: DataFrame indexado (mismo orden de filas que al construir el índice)
+            bitmap: Filas a seleccionar
+
+        Returns:
+            DataFrame con las filas seleccionadas (el mismo `df` si están todas)
+        """
+        if np.array_equal(bitmap, self.todas):
+            return df
+        posiciones = np.flatnonzero(np.unpackbits(bitmap, count=self.filas))
+        return df.iloc[posiciones]
+
+def _ordenados(serie: pd.Series):
+    """Devuelve los valores no nulos distintos de una serie, ordenados."""
+    return sorted(pd.unique(serie.dropna()))
+
+class OpcionesFiltros:
+    """
+    Opciones ordenadas de los selectbox/multiselect de una tabla y mapas de
+    dependencia entre filtros (ej: departamento → localidades).
+
+    Las listas devueltas son compartidas: no deben modificarse.
+    """
+
+    def __init__(self, df: pd.DataFrame, columnas, dependencias=()):
+        """
+        Args:
+            df: DataFrame del que salen las opciones
+            columnas: Columnas con opciones independientes
+            dependencias: Pares (columna padre, columna hija); para cada valor del padre
+                se guardan los valores de la hija que aparecen con él
+        """
+        self._valores = {col: _ordenados(df[col]) for col in columnas if col in df.columns}
+        self._dependientes = {}
+        for padre, hijo in dependencias:
+            if padre not in df.columns or hijo not in df.columns:
+                continue
+            pares = df[[padre, hijo]].dropna().drop_duplicates()
+            self._dependientes[(padre, hijo)] = {
+                valor: sorted(grupo.tolist())
+                for valor, grupo in pares.groupby(padre, sort=False, observed=True)[hijo]
+            }
+
+    def valores(self, columna):
+        """Devuelve las opciones de `columna` (lista vacía si no existe)."""
+        return self._valores.get(columna, [])
+
+    def dependientes(self, padre, hijo, valor):
+        """Devuelve los valores de `hijo` que aparecen con `padre == valor`."""
+        return self._dependientes.get((padre, hijo), {}).get(valor, [])
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def opciones_filtros(token, _df, columnas, dependencias=()):
+    """
+    Devuelve las opciones de filtro de una tabla, calculadas una vez por `token`.
+
+    Args:
+        token: Versión del dataset (y, si corresponde, estado de filtros) que identifica a `_df`
+        _df: DataFrame del que salen las opciones (no se hashea)
+        columnas: Tupla de columnas con opciones independientes
+        dependencias: Tupla de pares (padre, hija), ver OpcionesFiltros
+
+    Returns:
+        OpcionesFiltros compartido, de solo lectura
+    """
+    return OpcionesFiltros(_df, columnas, dependencias)
@@ -3,6 +3,8 @@
 Diccionarios globales de tooltips para KPIs de todo el proyecto.
 Incluye tanto descripciones técnicas (categorías de estados) como semánticas (explicaciones amigables).
 """
+import numpy as np
+import pandas as pd
 
 # Diccionario técnico: lista de estados por KPI
 ESTADO_CATEGORIAS = {
@@ -15,6 +17,50 @@ ESTADO_CATEGORIAS = {
     "PAGOS GESTIONADOS" : ["IMPAGO DESISTIDO", "FINALIZADO", "PAGADO", "PRE-FINALIZADO", "CON PLAN DE CUOTAS", "CON PLAN DE CUOTAS CON IMPAGOS", "MOROSO ENTRE 3 Y 4 MESES", "MOROSO >= 5 MESES", "PAGO EMITIDO", "IMPAGO"]
 }
 
+# Categorías que agrupan estados de otras categorías (no son excluyentes)
+CATEGORIAS_AGREGADAS = ["PAGOS GESTIONADOS"]
+
+# Búsqueda inversa estado -> categoría, precompilada una sola vez.
+# Cada estado va a la primera categoría excluyente que lo contiene.
+CATEGORIA_POR_ESTADO = {}
+for _categoria, _estados in ESTADO_CATEGORIAS.items():
+    if _categoria in CATEGORIAS_AGREGADAS:
+        continue
+    for _estado in _estados:
+        CATEGORIA_POR_ESTADO.setdefault(_estado, _categoria)
+
+def categorizar_estados(estados, default='Otros'):
+    """
+    Asigna la categoría de cada estado de préstamo en una sola pasada vectorizada.
+
+    Se resuelve la búsqueda solo sobre los estados distintos y luego se expande
+    con los códigos de factorize.
+
+    Args:
+        estados: Serie con valores de N_ESTADO_PRESTAMO
+        default: Categoría para estados no contemplados en ESTADO_CATEGORIAS
+
+    Returns:
+        Serie de categorías con el mismo índice que `estados`
+    """
+    codigos, unicos = pd.factorize(estados)
+    categorias_unicas = np.array([CATEGORIA_POR_ESTADO.get(estado, default) for estado in unicos] + [default], dtype=object)
+    # Los nulos tienen código -1, que apunta al default agregado al final
+    return pd.Series(categorias_unicas[codigos], index=estados.index, name='CATEGORIA')
+
+def estados_de_categorias(categorias):
+    """
+    Devuelve el conjunto de estados que abarcan las categorías indicadas
+    (incluidas las agregadas, como PAGOS GESTIONADOS).
+
+    Args:
+        categorias: Lista de nombres de categoría
+
+    Returns:
+        set con los valores de N_ESTADO_PRESTAMO correspondientes
+    """
+    return {estado for categoria in categorias for estado in ESTADO_CATEGORIAS.get(categoria, [])}
+
 # Diccionario semántico: explicación amigable para cada KPI
 TOOLTIPS_DESCRIPTIVOS = {
     "En Evaluación": "Formularios en proceso de evaluación técnica o administrativa (CREADO, EVALUACIÓN TÉCNICA, COMENZADO)",
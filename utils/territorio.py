@@ -0,0 +1,183 @@
+# utils/territorio.py
+"""
+Dimensión territorial compartida por los tableros: departamentos válidos de la
+provincia, su nombre canónico y la zona a la que pertenecen.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+from utils.data_cleaning import normalizar_coordenadas, clean_thousand_separator, convert_decimal_separator
+
+# Departamentos válidos de la provincia; el resto se agrupa como 'OTROS'
+DEPARTAMENTOS_VALIDOS = [
+    "CAPITAL", "CALAMUCHITA", "COLON", "CRUZ DEL EJE", "GENERAL ROCA", "GENERAL SAN MARTIN",
+    "ISCHILIN", "JUAREZ CELMAN", "MARCOS JUAREZ", "MINAS", "POCHO", "PRESIDENTE ROQUE SAENZ PEÑA",
+    "PUNILLA", "RIO CUARTO", "RIO PRIMERO", "RIO SECO", "RIO SEGUNDO", "SAN ALBERTO", "SAN JAVIER",
+    "SAN JUSTO", "SANTA MARIA", "SOBREMONTE", "TERCERO ARRIBA", "TOTORAL", "TULUMBA", "UNION"
+]
+DEPARTAMENTO_OTROS = 'OTROS'
+
+# Departamentos de la zona norte, oeste y sur (zona favorecida)
+ZONAS_FAVORECIDAS = [
+    'PRESIDENTE ROQUE SAENZ PEÑA', 'GENERAL ROCA', 'RIO SECO', 'TULUMBA',
+    'POCHO', 'SAN JAVIER', 'SAN ALBERTO', 'MINAS', 'CRUZ DEL EJE',
+    'TOTORAL', 'SOBREMONTE', 'ISCHILIN'
+]
+ZONA_FAVORECIDA = 'ZONA NOC Y SUR'
+ZONA_REGULAR = 'ZONA REGULAR'
+
+# Dimensión de departamentos indexada por código (posición en DEPARTAMENTOS_VALIDOS;
+# el último código corresponde a 'OTROS')
+DIM_DEPARTAMENTOS = pd.DataFrame({
+    'N_DEPARTAMENTO': DEPARTAMENTOS_VALIDOS + [DEPARTAMENTO_OTROS],
+    'ZONA': [ZONA_FAVORECIDA if depto in ZONAS_FAVORECIDAS else ZONA_REGULAR
+             for depto in DEPARTAMENTOS_VALIDOS + [DEPARTAMENTO_OTROS]],
+}).rename_axis('CODIGO_DEPARTAMENTO')
+CODIGO_OTROS = len(DEPARTAMENTOS_VALIDOS)
+
+_NOMBRES = DIM_DEPARTAMENTOS['N_DEPARTAMENTO'].to_numpy(dtype=object)
+_ZONAS = DIM_DEPARTAMENTOS['ZONA'].to_numpy(dtype=object)
+
+def codigos_departamento(departamentos: pd.Series) -> np.ndarray:
+    """
+    Devuelve el código de DIM_DEPARTAMENTOS de cada departamento.
+
+    Args:
+        departamentos: Serie con nombres de departamento
+
+    Returns:
+        Array de enteros; los departamentos no válidos (o nulos) reciben CODIGO_OTROS
+    """
+    codigos = pd.Categorical(departamentos, categories=DEPARTAMENTOS_VALIDOS).codes.astype(np.int64)
+    codigos[codigos < 0] = CODIGO_OTROS
+    return codigos
+
+def adjuntar_territorio(df: pd.DataFrame, normalizar_departamento=True, corregir_capital=True,
+                        id_localidad_capital=None) -> pd.DataFrame:
+    """
+    Adjunta la dimensión territorial a una tabla con N_DEPARTAMENTO.
+
+    El cruce se hace por códigos categóricos: un único pasaje vectorizado sobre las
+    filas y un indexado posicional en DIM_DEPARTAMENTOS, sin apply por fila.
+    No modifica `df`: las columnas corregidas se arman completas y se asignan sobre
+    un DataFrame nuevo, así que es seguro aunque `df` sea una copia superficial de
+    una tabla cacheada y copy-on-write esté desactivado.
+
+    Args:
+        df: DataFrame con la columna N_DEPARTAMENTO
+        normalizar_departamento: Si es True, los departamentos no válidos pasan a 'OTROS'
+        corregir_capital: Si es True, la localidad de CAPITAL pasa a 'CORDOBA'
+        id_localidad_capital: ID_LOCALIDAD a asignar a CAPITAL (None = no se modifica)
+
+    Returns:
+        DataFrame nuevo con N_DEPARTAMENTO normalizado y la columna ZONA
+    """
+    if df is None or 'N_DEPARTAMENTO' not in df.columns:
+        return df
+
+    codigos = codigos_departamento(df['N_DEPARTAMENTO'])
+    nuevas = {'ZONA': _ZONAS[codigos]}
+    if normalizar_departamento:
+        nuevas['N_DEPARTAMENTO'] = _NOMBRES[codigos]
+
+    if corregir_capital and 'N_LOCALIDAD' in df.columns:
+        capital_mask = codigos == DEPARTAMENTOS_VALIDOS.index('CAPITAL')
+        nuevas['N_LOCALIDAD'] = df['N_LOCALIDAD'].mask(capital_mask, 'CORDOBA')
+        if id_localidad_capital is not None and 'ID_LOCALIDAD' in df.columns:
+            nuevas['ID_LOCALIDAD'] = df['ID_LOCALIDAD'].mask(capital_mask, id_localidad_capital)
+
+    return df.assign(**nuevas)
+
+# Atributos de la tabla de localidades (circuitos electorales) que se tipan como enteros
+COLUMNAS_ID_LOCALIDADES = ['ID_GOBIERNO_LOCAL', 'ID_DEPARTAMENTO']
+
+# Dimensiones de localidades ya construidas, por versión del archivo de origen
+_MAX_DIMENSIONES_CACHEADAS = 4
+_dimensiones_localidades = {}
+_lock_dimensiones = threading.Lock()
+
+def _construir_dimension_localidades(df_localidades: pd.DataFrame) -> pd.DataFrame:
+    """Limpia, tipa, deduplica e indexa la tabla de localidades (ver dimension_localidades)."""
+    # Separadores de miles y decimales, para que todos los tableros usen la misma tipificación
+    dim = convert_decimal_separator(clean_thousand_separator(df_localidades)).copy(deep=False)
+    dim['ID_LOCALIDAD'] = pd.to_numeric(dim['ID_LOCALIDAD'], errors='coerce').astype('Int64')
+    dim = dim[dim['ID_LOCALIDAD'].notna()].drop_duplicates(subset='ID_LOCALIDAD', keep='first')
+
+    for col in COLUMNAS_ID_LOCALIDADES:
+        if col in dim.columns:
+            dim[col] = pd.to_numeric(dim[col], errors='coerce').astype('Int64')
+
+    # Coordenadas limpias (ya normalizadas en la carga; se revalidan por si no pasaron por ella)
+    dim, _ = normalizar_coordenadas(dim)
+
+    return dim.set_index('ID_LOCALIDAD')
+
+def dimension_localidades(df_localidades: pd.DataFrame):
+    """
+    Devuelve la tabla canónica de localidades indexada por ID_LOCALIDAD (entero).
+
+    Se construye una sola vez por versión del archivo (df.attrs['version']):
+    columnas numéricas limpias de separadores de miles y decimales, claves enteras
+    únicas (se conserva la primera fila de cada ID), IDs de gobierno tipados como
+    Int64, coordenadas float64 validadas y el resto de los atributos electorales tal
+    como vienen. El resultado es compartido y de solo lectura.
+
+    Args:
+        df_localidades: DataFrame crudo de 'LOCALIDAD CIRCUITO ELECTORAL GEO Y ELECTORES - USAR.txt'
+            (tal como lo devuelve la carga; la limpieza se hace aquí)
+
+    Returns:
+        DataFrame indexado por ID_LOCALIDAD, o None si no hay datos
+    """
+    if df_localidades is None or df_localidades.empty or 'ID_LOCALIDAD' not in df_localidades.columns:
+        return None
+
+    version = df_localidades.attrs.get('version')
+    if version is None:
+        return _construir_dimension_localidades(df_localidades)
+    with _lock_dimensiones:
+        dim = _dimensiones_localidades.get(version)
+    if dim is not None:
+        return dim
+
+    dim = _construir_dimension_localidades(df_localidades)
+    with _lock_dimensiones:
+        if version not in _dimensiones_localidades:
+            if len(_dimensiones_localidades) >= _MAX_DIMENSIONES_CACHEADAS:
+                _dimensiones_localidades.pop(next(iter(_dimensiones_localidades)))
+            _dimensiones_localidades[version] = dim
+        return _dimensiones_localidades[version]
+
+def adjuntar_localidades(df: pd.DataFrame, dim_localidades: pd.DataFrame, clave='ID_LOCALIDAD',
+                         columnas=None, sufijo='_circuito') -> pd.DataFrame:
+    """
+    Agrega atributos de la dimensión de localidades por búsqueda posicional.
+
+    Las claves de `df` se resuelven una vez contra el índice entero de la dimensión
+    (get_indexer) y cada columna se toma por posición; no se hace pd.merge ni se
+    duplican filas. Las claves sin localidad quedan con nulos.
+
+    Args:
+        df: DataFrame con la columna `clave`
+        dim_localidades: Tabla devuelta por dimension_localidades
+        clave: Columna de `df` con el ID de localidad
+        columnas: Columnas de la dimensión a agregar (None = todas)
+        sufijo: Sufijo para las columnas que ya existen en `df`
+
+    Returns:
+        DataFrame nuevo con las columnas agregadas
+    """
+    if df is None or dim_localidades is None or clave not in df.columns:
+        return df
+
+    claves = pd.to_numeric(df[clave], errors='coerce').astype('Int64')
+    posiciones = dim_localidades.index.get_indexer(claves)
+
+    columnas = [col for col in (columnas if columnas is not None else dim_localidades.columns) if col in dim_localidades.columns]
+    nuevas = {}
+    for col in columnas:
+        valores = dim_localidades[col].array.take(posiciones, allow_fill=True)
+        nombre = f"{col}{sufijo}" if col in df.columns else col
+        nuevas[nombre] = pd.Series(valores, index=df.index)
+    return df.assign(**nuevas)